@@ -5,11 +5,19 @@ from customer_routes import customer_bp
 from vehicle_routes import vehicle_bp
 from employee_routes import employee_bp
 from manager_routes import manager_bp
+from db_utils import close_request_connection, refresh_schema_catalog
+import compression
+import metrics
+import precompute
+from json_provider import AutoBaseJSONProvider
 from datetime import timedelta
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
 
+# Faster Decimal/date encoding (orjson when installed), see json_provider.py
+app.json = AutoBaseJSONProvider(app)
+
 # Optional: Add session timeout
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)
 
@@ -17,15 +25,31 @@ CORS(
     app,
     resources={r"/api/*": {"origins": "http://127.0.0.1:5500"}},
     supports_credentials=True,
-    allow_headers=["Content-Type", "Authorization"]
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+    expose_headers=["ETag"]
 )
 
+# Return each request's pooled DB connection when the request ends
+app.teardown_appcontext(close_request_connection)
+
+# Per-endpoint timings and status counts, scraped from /metrics
+metrics.init_app(app)
+
+# gzip/deflate for large bodies and streamed reports
+compression.init_app(app)
+
+# Background rebuilds of precomputed report tables
+precompute.init_app(app)
+
 # Register all blueprints
 app.register_blueprint(auth_bp, url_prefix="/api/auth")
 app.register_blueprint(customer_bp, url_prefix="/api/customer")
 app.register_blueprint(vehicle_bp, url_prefix="/api/vehicle")
 app.register_blueprint(employee_bp, url_prefix="/api/employee")
 app.register_blueprint(manager_bp, url_prefix="/api/manager")
+app.register_blueprint(metrics.metrics_bp)
 
 if __name__ == "__main__":
+    # Snapshot the schema once up front so metadata lookups never wait on INFORMATION_SCHEMA
+    refresh_schema_catalog()
     app.run(debug=True)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, session
 from dotenv import load_dotenv
-from database import get_db_connection
+from db_utils import execute_query, close_request_connection
+from credentials import check_password, CredentialsBusy
 
 load_dotenv()
 
@@ -22,72 +23,73 @@ def login():
     if user_type not in ['employee', 'customer', 'manager']:
         return jsonify({'error': 'Invalid user type'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    # Query the appropriate table based on user type
+    # Managers are stored in EmployeeAuth but must be verified as managers
+    if user_type in ('employee', 'manager'):
+        auth_table, id_field = 'EmployeeAuth', 'Employee_ID'
+    else:
+        auth_table, id_field = 'CustomerAuth', 'Customer_ID'
+    user = execute_query(f"SELECT * FROM {auth_table} WHERE Username = %s", (username,), fetch_one=True)
+
+    # Hand the connection back before verifying: a login waiting on the
+    # credentials pool must not hold a pooled connection other requests need.
+    # Queries below borrow one again.
+    close_request_connection()
 
+    # Verify on the credentials worker pool (an unknown user costs the same)
     try:
-        # Query the appropriate table based on user type
-        # Managers are stored in EmployeeAuth but must be verified as managers
-        if user_type in ('employee', 'manager'):
-            cursor.execute("SELECT * FROM EmployeeAuth WHERE Username = %s", (username,))
-            id_field = 'Employee_ID'
-        else:
-            cursor.execute("SELECT * FROM CustomerAuth WHERE Username = %s", (username,))
-            id_field = 'Customer_ID'
-
-        user = cursor.fetchone()
-
-        # Check if user exists and password matches
-        if user and user['Password_Hash'] == password:
-            # Create user session data
-            user_data = {
-                'username': username,
-                'user_type': user_type,
-                'id': user[id_field]
-            }
-            # If logging in as manager, verify the employee is actually a manager
-            if user_type == 'manager':
-                # Per project rules: if Employee.Mgr_ID is NULL then they are a manager
-                conn2 = get_db_connection()
-                cursor2 = conn2.cursor(dictionary=True)
-                try:
-                    cursor2.execute(
-                        "SELECT Mgr_ID FROM Employee WHERE ID = %s",
-                        (user[id_field],)
-                    )
-                    row = cursor2.fetchone()
-                    if not row:
-                        cursor2.close()
-                        conn2.close()
-                        return jsonify({'error': 'Manager record not found'}), 401
-
-                    mgr_id = row.get('Mgr_ID')
-                    is_manager = mgr_id is None
-                finally:
-                    cursor2.close()
-                    conn2.close()
-
-                if not is_manager:
-                    return jsonify({'error': 'Not authorized as manager'}), 401
-            
-            # Store in session
-            session.permanent = False
-            session['user'] = user_data
-            session.modified = True
-            
-            print(f"Login successful: {username} ({user_type})")
-            
-            return jsonify({
-                'message': 'Login successful',
-                'user': user_data
-            }), 200
-        else:
-            print(f"Login failed: {username} ({user_type})")
-            return jsonify({'error': 'Invalid credentials'}), 401
-
-    finally:
-        cursor.close()
-        conn.close()
+        password_ok, new_hash = check_password(password, user['Password_Hash'] if user else None)
+    except CredentialsBusy:
+        response = jsonify({'error': 'Too many login attempts in progress, try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    # Check if user exists and password matches
+    if user and password_ok:
+        if new_hash:
+            # Old cost settings or a plaintext row: store the current kind of hash
+            execute_query(
+                f"UPDATE {auth_table} SET Password_Hash = %s WHERE {id_field} = %s AND Password_Hash = %s",
+                (new_hash, user[id_field], user['Password_Hash'])
+            )
+
+        # Create user session data
+        user_data = {
+            'username': username,
+            'user_type': user_type,
+            'id': user[id_field]
+        }
+        # If logging in as manager, verify the employee is actually a manager
+        if user_type == 'manager':
+            # Per project rules: if Employee.Mgr_ID is NULL then they are a manager
+            row = execute_query(
+                "SELECT Mgr_ID FROM Employee WHERE ID = %s",
+                (user[id_field],),
+                fetch_one=True
+            )
+            if not row:
+                return jsonify({'error': 'Manager record not found'}), 401
+
+            mgr_id = row.get('Mgr_ID')
+            is_manager = mgr_id is None
+
+            if not is_manager:
+                return jsonify({'error': 'Not authorized as manager'}), 401
+        
+        # Store in session
+        session.permanent = False
+        session['user'] = user_data
+        session.modified = True
+        
+        print(f"Login successful: {username} ({user_type})")
+        
+        return jsonify({
+            'message': 'Login successful',
+            'user': user_data
+        }), 200
+    else:
+        print(f"Login failed: {username} ({user_type})")
+        return jsonify({'error': 'Invalid credentials'}), 401
 
 
 @auth_bp.route('/logout', methods=['POST'])
@@ -0,0 +1,67 @@
+"""Lookups of many rows by key in one query, for the batch endpoints
+(e.g. GET /api/employee/vehicles?vin=a,b,c).
+"""
+import os
+from db_utils import execute_query
+
+MAX_BATCH = int(os.getenv('API_MAX_BATCH', '200'))
+
+
+class BatchError(ValueError):
+    """Missing, malformed or too many keys in a batch request."""
+
+
+def parse_keys(args, name, convert=str, max_keys=MAX_BATCH):
+    """Keys from ?<name>=a,b,c (or repeated ?<name>=a&<name>=b), converted
+    and with duplicates dropped, in request order.
+    """
+    keys = []
+    seen = set()
+    for value in args.getlist(name):
+        for raw in value.split(','):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                key = convert(raw)
+            except (TypeError, ValueError):
+                raise BatchError(f"Invalid {name}: {raw}")
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+    if not keys:
+        raise BatchError(f"At least one {name} is required")
+    if len(keys) > max_keys:
+        raise BatchError(f"At most {max_keys} values of {name} per request")
+    return keys
+
+
+def _padded(keys):
+    # Round the list up to a power of two by repeating the last key, so a
+    # handful of IN (...) shapes cover every batch size and their prepared
+    # statements stay cached (see db_utils._prepared_cursor)
+    size = 1
+    while size < len(keys):
+        size *= 2
+    return list(keys) + [keys[-1]] * (size - len(keys))
+
+
+def normalized_key(key):
+    """`key` as the case-insensitive collations of the tables compare it."""
+    return key.casefold() if isinstance(key, str) else key
+
+
+def fetch_by_keys(select, column, keys, order_by=None):
+    """Run `select` (a SELECT ... FROM ... with no WHERE) for the rows whose
+    `column` is one of `keys`, ordered by `column` and then `order_by`.
+    Returns (rows, missing keys).
+    """
+    params = _padded(keys)
+    placeholders = ', '.join(['%s'] * len(params))
+    key_name = column.split('.')[-1]
+    order = f"{column}, {order_by}" if order_by else column
+    rows = execute_query(f"{select} WHERE {column} IN ({placeholders}) ORDER BY {order}", params) or []
+    # Compare the way the IN (...) matched: the tables use case-insensitive
+    # collations, so ?vin=abc finds the ABC row
+    found = {normalized_key(row[key_name]) for row in rows}
+    return rows, [key for key in keys if normalized_key(key) not in found]
@@ -0,0 +1,86 @@
+"""gzip/deflate compression of API responses.
+
+Bodies of at least COMPRESS_MIN_BYTES are compressed when the client's
+Accept-Encoding allows it. Streamed responses (the large reports) are
+compressed chunk by chunk as they are produced, so they still stream.
+File downloads are left alone: they are already compressed or served with
+Range support, which needs the bytes as stored.
+"""
+import os
+import zlib
+from flask import request
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+    'text/html',
+}
+
+# Content-Encoding -> zlib wbits (gzip container, zlib container)
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+
+def choose_encoding(accept_encodings):
+    """Best of gzip/deflate the client accepts, or None. Ties go to gzip."""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding):
+    return zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, ENCODINGS[encoding])
+
+
+def _compress_stream(chunks, encoding):
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response, accept_encodings):
+    if response.status_code != 200 or response.direct_passthrough:
+        return response
+    if 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    # Whatever we send, caches must key it by Accept-Encoding
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        compressor = _compressor(encoding)
+        response.set_data(compressor.compress(body) + compressor.flush())
+
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request.accept_encodings)
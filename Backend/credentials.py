@@ -0,0 +1,161 @@
+"""Password hashing and verification for auth_routes.
+
+Hashes are stored as "<algorithm>$<cost>$<salt>$<hash>" (salt and hash in
+base64):
+
+    scrypt$16384,8,1$...$...
+    pbkdf2_sha256$600000$...$...
+
+The algorithm and cost for new hashes come from the AUTH_* settings. A
+stored hash made with other settings still verifies, and check_password()
+returns a replacement so the caller can store it (rehash on login).
+Values in no known format are legacy plaintext rows as loaded from the CSV
+data; they are accepted while AUTH_ALLOW_PLAINTEXT is on and replaced the
+same way.
+
+Each verification costs tens of milliseconds of CPU, so it runs on a pool
+of AUTH_WORKERS threads instead of the request thread, and at most
+AUTH_MAX_PENDING verifications are queued or running at once (including
+ones whose caller timed out); past that check_password() raises
+CredentialsBusy instead of tying up more request threads.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# hashlib.scrypt needs Python built against OpenSSL 1.1+
+AUTH_HASH_ALGORITHM = os.getenv('AUTH_HASH_ALGORITHM', 'scrypt' if hasattr(hashlib, 'scrypt') else 'pbkdf2_sha256')
+AUTH_SCRYPT_N = int(os.getenv('AUTH_SCRYPT_N', '16384'))
+AUTH_SCRYPT_R = int(os.getenv('AUTH_SCRYPT_R', '8'))
+AUTH_SCRYPT_P = int(os.getenv('AUTH_SCRYPT_P', '1'))
+AUTH_PBKDF2_ITERATIONS = int(os.getenv('AUTH_PBKDF2_ITERATIONS', '600000'))
+AUTH_ALLOW_PLAINTEXT = os.getenv('AUTH_ALLOW_PLAINTEXT', '1') == '1'
+AUTH_WORKERS = int(os.getenv('AUTH_WORKERS', str(min(4, os.cpu_count() or 1))))
+AUTH_MAX_PENDING = int(os.getenv('AUTH_MAX_PENDING', '64'))
+AUTH_VERIFY_TIMEOUT = float(os.getenv('AUTH_VERIFY_TIMEOUT', '10'))
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+class CredentialsBusy(Exception):
+    """Too many logins are already waiting for verification."""
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+
+def _b64decode(text):
+    return base64.b64decode(text.encode('ascii'))
+
+
+def _scrypt(password, salt, n, r, p):
+    # hashlib's default memory cap (32 MiB) is below what larger costs need
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p + 1024 * 1024, dklen=HASH_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=HASH_BYTES)
+
+
+def _current_cost():
+    if AUTH_HASH_ALGORITHM == 'scrypt':
+        return f"{AUTH_SCRYPT_N},{AUTH_SCRYPT_R},{AUTH_SCRYPT_P}"
+    if AUTH_HASH_ALGORITHM == 'pbkdf2_sha256':
+        return str(AUTH_PBKDF2_ITERATIONS)
+    raise ValueError(f"Unknown AUTH_HASH_ALGORITHM: {AUTH_HASH_ALGORITHM}")
+
+
+def _derive(algorithm, cost, password, salt):
+    if algorithm == 'scrypt':
+        n, r, p = (int(part) for part in cost.split(','))
+        return _scrypt(password, salt, n, r, p)
+    if algorithm == 'pbkdf2_sha256':
+        return _pbkdf2(password, salt, int(cost))
+    raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+
+
+def _parse(stored):
+    """(algorithm, cost, salt, hash) of a stored value, or None for plaintext."""
+    parts = (stored or '').split('$')
+    if len(parts) != 4 or parts[0] not in ('scrypt', 'pbkdf2_sha256'):
+        return None
+    try:
+        return parts[0], parts[1], _b64decode(parts[2]), _b64decode(parts[3])
+    except ValueError:
+        return None
+
+
+def hash_password(password):
+    """A new salted hash of `password` with the current settings."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    cost = _current_cost()
+    derived = _derive(AUTH_HASH_ALGORITHM, cost, password, salt)
+    return f"{AUTH_HASH_ALGORITHM}${cost}${_b64encode(salt)}${_b64encode(derived)}"
+
+
+def needs_rehash(stored):
+    parsed = _parse(stored)
+    return parsed is None or parsed[:2] != (AUTH_HASH_ALGORITHM, _current_cost())
+
+
+def verify_password(password, stored):
+    parsed = _parse(stored)
+    if parsed is None:
+        if not AUTH_ALLOW_PLAINTEXT or not stored:
+            return False
+        return hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+    algorithm, cost, salt, expected = parsed
+    return hmac.compare_digest(_derive(algorithm, cost, password, salt), expected)
+
+
+_dummy_hash = None
+
+
+def _verify_and_upgrade(password, stored):
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(8))
+    if stored is None or _parse(stored) is None:
+        # Unknown user or plaintext row: spend the same time as a real
+        # check, so response times don't reveal which usernames exist
+        verify_password(password, _dummy_hash)
+        if stored is None:
+            return False, None
+    if not verify_password(password, stored):
+        return False, None
+    return True, (hash_password(password) if needs_rehash(stored) else None)
+
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix='auth')
+_pending = threading.BoundedSemaphore(AUTH_MAX_PENDING)
+
+
+def check_password(password, stored):
+    """Verify `password` against `stored` (None for an unknown user) on the
+    worker pool. Returns (ok, new_hash): new_hash is a replacement to store
+    when the password was right but `stored` uses old settings or is
+    plaintext, otherwise None. Raises CredentialsBusy when the pool is
+    saturated or the check doesn't finish within AUTH_VERIFY_TIMEOUT.
+    """
+    if not _pending.acquire(blocking=False):
+        raise CredentialsBusy()
+    try:
+        future = _executor.submit(_verify_and_upgrade, password, stored)
+    except BaseException:
+        _pending.release()
+        raise
+    # The slot is freed when the job finishes or is cancelled, not when
+    # this caller stops waiting, so abandoned jobs still count as pending
+    future.add_done_callback(lambda _: _pending.release())
+    try:
+        return future.result(timeout=AUTH_VERIFY_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        raise CredentialsBusy()
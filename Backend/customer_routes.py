@@ -1,5 +1,10 @@
 from flask import Blueprint, jsonify, session, request
 from db_utils import execute_query
+from responses import conditional, with_etag, rows_payload
+from batch import parse_keys, fetch_by_keys, BatchError
+from pagination import as_int
+from includes import (EMPLOYEE_DETAILS_SELECT, SALES_ORDER_INCLUDES, SERVICE_ORDER_INCLUDES,
+                      parse_includes, embed_includes, IncludeError)
 import datetime
 
 customer_bp = Blueprint('customer', __name__)
@@ -27,7 +32,7 @@ def get_customer_vehicles():
             return jsonify({'error': 'Failed to fetch vehicles'}), 500
         
         print(f"Fetched {len(vehicles)} vehicles for customer {customer_id}")
-        return jsonify({'vehicles': vehicles}), 200
+        return jsonify({'vehicles': rows_payload(vehicles)}), 200
         
     except Exception as e:
         print(f"Error in get_customer_vehicles: {str(e)}")
@@ -97,6 +102,11 @@ def get_my_sales_orders():
     user = session.get('user')
     if not user or user.get('user_type') != 'customer':
         return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        include = parse_includes(request.args, SALES_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
     
     customer_id = user.get('id')
     
@@ -107,6 +117,8 @@ def get_my_sales_orders():
                 so.Sales_Date,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
+                so.Sales_Employee_ID,
                 e.Name as Sales_Employee_Name,
                 v.Make,
                 v.Model,
@@ -123,9 +135,9 @@ def get_my_sales_orders():
         
         if sales_orders is not None:
             print(f"Fetched {len(sales_orders)} sales orders for customer {customer_id}")
-            return jsonify({'sales_orders': sales_orders}), 200
+            return jsonify({'sales_orders': rows_payload(embed_includes(sales_orders, include, SALES_ORDER_INCLUDES))}), 200
         else:
-            return jsonify({'sales_orders': []}), 200
+            return jsonify({'sales_orders': rows_payload([])}), 200
             
     except Exception as e:
         print(f"Error in get_my_sales_orders: {str(e)}")
@@ -139,11 +151,7 @@ def get_employee_details(employee_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        query = """
-            SELECT ID, Name, Email, Phone
-            FROM Employee
-            WHERE ID = %s
-        """
+        query = EMPLOYEE_DETAILS_SELECT + "WHERE ID = %s"
         
         employee = execute_query(query, (employee_id,), fetch_one=True)
         
@@ -158,6 +166,34 @@ def get_employee_details(employee_id):
         return jsonify({'error': 'Failed to fetch employee details'}), 500
 
 
+@customer_bp.route('/employees', methods=['GET'])
+def get_employees_details():
+    """Contact details of several employees in one request.
+    Query param: id=1,2,3 (at most API_MAX_BATCH)
+    """
+    user = session.get('user')
+    if not user or user.get('user_type') != 'customer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        employee_ids = parse_keys(request.args, 'id', as_int)
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    etag, not_modified = conditional(('Employee',))
+    if not_modified:
+        return not_modified
+
+    try:
+        employees, missing = fetch_by_keys(EMPLOYEE_DETAILS_SELECT, 'ID', employee_ids)
+        print(f"Fetched details for {len(employees)} of {len(employee_ids)} employees")
+        return with_etag(jsonify({'employees': rows_payload(employees), 'missing': missing}), etag), 200
+
+    except Exception as e:
+        print(f"Error in get_employees_details: {str(e)}")
+        return jsonify({'error': 'Failed to fetch employee details'}), 500
+
+
 @customer_bp.route('/info', methods=['PUT'])
 def update_customer_info():
     user = session.get('user')
@@ -222,6 +258,11 @@ def get_my_service_records():
     user = session.get('user')
     if not user or user.get('user_type') != 'customer':
         return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        include = parse_includes(request.args, SERVICE_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
     
     customer_id = user.get('id')
     
@@ -234,6 +275,8 @@ def get_my_service_records():
                 so.Service_Status,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
+                so.Service_Advisor_ID,
                 v.Make,
                 v.Model,
                 v.Year,
@@ -249,9 +292,9 @@ def get_my_service_records():
         
         if service_orders is not None:
             print(f"Fetched {len(service_orders)} service records for customer {customer_id}")
-            return jsonify({'service_orders': service_orders}), 200
+            return jsonify({'service_orders': rows_payload(embed_includes(service_orders, include, SERVICE_ORDER_INCLUDES))}), 200
         else:
-            return jsonify({'service_orders': []}), 200
+            return jsonify({'service_orders': rows_payload([])}), 200
             
     except Exception as e:
         print(f"Error in get_my_service_records: {str(e)}")
@@ -310,7 +353,7 @@ def get_vehicles_due_service():
                         due_vehicles.append(vehicle)
         
         print(f"Found {len(due_vehicles)} vehicles due for service for customer {customer_id}")
-        return jsonify({'due_vehicles': due_vehicles}), 200
+        return jsonify({'due_vehicles': rows_payload(due_vehicles)}), 200
         
     except Exception as e:
         print(f"Error in get_vehicles_due_service: {str(e)}")
@@ -1,6 +1,10 @@
 from flask import Blueprint
 import mysql.connector
+from mysql.connector import errors
 import os
+import threading
+import time
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,7 +16,233 @@ db_config = {
     'database': os.getenv('DB_NAME'),
 }
 
+pool_config = {
+    'size': int(os.getenv('DB_POOL_SIZE', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '5')),
+    'recycle': float(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', '1') not in ('0', 'false', 'False'),
+}
+
+# Prepared statements kept open per pooled connection (0 disables them)
+STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '64'))
+
 auth_bp = Blueprint('auth', __name__)
 
-def get_db_connection():
-    return mysql.connector.connect(**db_config)
\ No newline at end of file
+
+class PoolTimeoutError(errors.PoolError):
+    """Raised when no connection could be borrowed within the timeout."""
+
+
+class PooledConnection:
+    """A borrowed connection. Behaves like the underlying MySQL connection,
+    except that close() hands it back to the pool instead of disconnecting.
+
+    `statements` is an LRU of prepared cursors keyed by SQL text that lives
+    as long as the underlying connection, across borrows.
+    """
+
+    def __init__(self, pool, raw, created_at, statements):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self.statements = statements
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise errors.OperationalError("Connection has been returned to the pool")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created_at, self.statements)
+
+    def discard(self):
+        """Close the underlying connection instead of returning it, e.g. when
+        it was left mid-result and can't safely be reused.
+        """
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created_at, self.statements, discard=True)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool.
+
+    Connections are opened lazily up to `size`. Borrowers wait at most
+    `timeout` seconds for a free connection. Idle connections older than
+    `recycle` seconds are replaced, and with `pre_ping` every connection is
+    checked with a ping before it is handed out.
+    """
+
+    def __init__(self, config, size=10, timeout=5.0, recycle=1800.0, pre_ping=True):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        self._borrowed = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.config)
+        with self._cond:
+            self._created += 1
+        return raw, time.monotonic(), OrderedDict()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, raw, created_at, statements):
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._ping_failures += 1
+                return False
+        return True
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        entry = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a database connection "
+                            f"(pool size {self.size})"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        # Health checks and new connections happen outside the lock
+        try:
+            if entry is not None and not self._is_healthy(*entry):
+                self._discard(entry[0])
+                entry = None
+            if entry is None:
+                entry = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._borrowed += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        return PooledConnection(self, *entry)
+
+    def _release(self, raw, created_at, statements, discard=False):
+        healthy = not discard
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if healthy and raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((raw, created_at, statements))
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if not healthy:
+            self._discard(raw)
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'borrowed_total': self._borrowed,
+                'timeouts_total': self._timeouts,
+                'created_total': self._created,
+                'recycled_total': self._recycled,
+                'ping_failures_total': self._ping_failures,
+                'borrow_wait_avg_ms': round(self._wait_total / self._borrowed * 1000, 3) if self._borrowed else 0.0,
+                'borrow_wait_max_ms': round(self._wait_max * 1000, 3),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Statements outside db_utils.transaction() commit on their own
+                _pool = ConnectionPool(dict(db_config, autocommit=True), **pool_config)
+    return _pool
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
+def get_db_connection(timeout=None):
+    return get_pool().acquire(timeout)
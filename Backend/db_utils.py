@@ -1,24 +1,34 @@
-from database import get_db_connection
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from flask import g, has_app_context
+from database import get_db_connection, STATEMENT_CACHE_SIZE
+from schema_catalog import catalog
+from metrics import observe_query, observe_connection_wait
+from result_cache import cache
+
+# Tables that triggers change when a row of the key table is written
+# (Database/Migrations/0004_vehicle_availability.sql, 0005_sales_rollups.sql,
+# 0009_customer_delete_availability.sql)
+TRIGGER_WRITES = {
+    'SalesOrder': ('Vehicle', 'SalesDailyRollup', 'SalesEmployeeRollup'),
+    'Vehicle': ('SalesDailyRollup', 'SalesEmployeeRollup'),
+    'Customer': ('Vehicle', 'SalesDailyRollup', 'SalesEmployeeRollup'),
+    'Employee': ('SalesEmployeeRollup',),
+}
+
+_WRITE_STATEMENT = re.compile(
+    r"^\s*(INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
 
 def get_primary_key(table_name):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT COLUMN_NAME
-            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
-            WHERE TABLE_NAME = %s
-              AND CONSTRAINT_NAME = 'PRIMARY'
-        """
-        
-        cursor.execute(query, (table_name,))
-        result = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
-        
-        return result['COLUMN_NAME'] if result else None
+        table = catalog.table(table_name)
+        if table and table['primary_key']:
+            return table['primary_key'][0]
+        return None
         
     except Exception as e:
         print(f"Error getting primary key for {table_name}: {str(e)}")
@@ -27,6 +37,10 @@ def get_primary_key(table_name):
 
 def get_all_tables(database_name):
     try:
+        if database_name == catalog.database():
+            return catalog.tables()
+
+        # Another schema than the one we're connected to: not cached
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -83,23 +97,8 @@ def get_table_data(table_name, where_clause=None, where_params=None, order_by=No
 
 def get_table_columns(table_name):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_NAME = %s
-            ORDER BY ORDINAL_POSITION
-        """
-        
-        cursor.execute(query, (table_name,))
-        columns = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return columns
+        table = catalog.table(table_name)
+        return [dict(column) for column in table['columns']] if table else []
         
     except Exception as e:
         print(f"Error getting columns for {table_name}: {str(e)}")
@@ -108,54 +107,325 @@ def get_table_columns(table_name):
 
 def get_foreign_keys(table_name):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
-            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
-            WHERE TABLE_SCHEMA = DATABASE() 
-            AND TABLE_NAME = %s
-            AND REFERENCED_TABLE_NAME IS NOT NULL
-        """
-        
-        cursor.execute(query, (table_name,))
-        foreign_keys = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return foreign_keys
+        table = catalog.table(table_name)
+        return [dict(fk) for fk in table['foreign_keys']] if table else []
         
     except Exception as e:
         print(f"Error getting foreign keys for {table_name}: {str(e)}")
         return []
 
 
-def execute_query(query, params=None, fetch_one=False):
+def get_indexes(table_name):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+        table = catalog.table(table_name)
+        if not table:
+            return {}
+        return {
+            name: {'unique': index['unique'], 'columns': list(index['columns'])}
+            for name, index in table['indexes'].items()
+        }
         
+    except Exception as e:
+        print(f"Error getting indexes for {table_name}: {str(e)}")
+        return {}
+
+
+def refresh_schema_catalog():
+    return catalog.refresh()
+
+
+def get_request_connection():
+    """Return the connection bound to the current Flask request, borrowing
+    one from the pool on first use. Released by close_request_connection().
+    """
+    if 'db_conn' not in g:
+        g.db_conn = _acquire_connection()
+        g.db_tx_depth = 0
+    return g.db_conn
+
+
+def close_request_connection(exc=None):
+    """Teardown handler: roll back anything left open and return the
+    request's connection to the pool. Also called mid-request to give the
+    connection back before a long wait; the next query borrows another.
+    """
+    conn = g.pop('db_conn', None)
+    g.pop('db_tx_depth', None)
+    if conn is None:
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except Exception as e:
+        print(f"Error rolling back request connection: {str(e)}")
+    finally:
+        conn.close()
+
+
+def _fk_children(table_name):
+    # Rows in these tables are deleted or nulled by ON DELETE actions
+    children = set()
+    pending = [table_name]
+    while pending:
+        parent = pending.pop()
+        for name in catalog.tables():
+            table = catalog.table(name)
+            refs = {fk['REFERENCED_TABLE_NAME'] for fk in table['foreign_keys']}
+            if parent in refs and name not in children:
+                children.add(name)
+                pending.append(name)
+    return children
+
+
+def written_tables(query):
+    """Tables whose contents change when `query` runs: its target table,
+    tables touched by its triggers and, for deletes, tables that reference
+    it through foreign keys. Empty for anything but INSERT/REPLACE/UPDATE/DELETE.
+    """
+    generation = catalog.generation()
+    if not generation:
+        # No schema snapshot, so no foreign keys: don't remember this answer
+        return _written_tables.__wrapped__(query, generation)
+    return _written_tables(query, generation)
+
+
+@lru_cache(maxsize=512)
+def _written_tables(query, generation):
+    # Keyed on the catalog generation, so a reload (e.g. after a migration
+    # adds a foreign key) recomputes the cascades
+    match = _WRITE_STATEMENT.match(query)
+    if not match:
+        return ()
+    table = match.group(2)
+    tables = {table, *TRIGGER_WRITES.get(table, ())}
+    if match.group(1).upper().startswith('DELETE'):
+        for child in _fk_children(table):
+            tables.add(child)
+            tables.update(TRIGGER_WRITES.get(child, ()))
+    return tuple(sorted(tables))
+
+
+def _record_write(query, rowcount):
+    """Bump the version of every table `query` changed, once its change is
+    visible to other connections: now under autocommit, or when the
+    enclosing transaction() commits.
+    """
+    if rowcount == 0:
+        return
+    try:
+        tables = written_tables(query)
+    except Exception as e:
+        print(f"Error finding tables written by query: {str(e)}")
+        return
+    if not tables:
+        return
+    if in_transaction():
+        g.db_tx_writes.update(tables)
+    else:
+        cache.invalidate(*tables)
+
+
+def in_transaction():
+    return has_app_context() and g.get('db_tx_depth', 0) > 0
+
+
+@contextmanager
+def transaction():
+    """Group several execute_query calls into one transaction on the
+    request's connection. Commits once on success, rolls back if anything
+    inside raises. Nested blocks join the outer transaction.
+    """
+    conn = get_request_connection()
+    if g.db_tx_depth > 0:
+        g.db_tx_depth += 1
+        try:
+            yield conn
+        finally:
+            g.db_tx_depth -= 1
+        return
+
+    conn.start_transaction()
+    g.db_tx_depth = 1
+    g.db_tx_writes = set()
+    try:
+        yield conn
+        conn.commit()
+        if g.db_tx_writes:
+            cache.invalidate(*sorted(g.db_tx_writes))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        g.db_tx_depth = 0
+        g.pop('db_tx_writes', None)
+
+
+def _acquire_connection():
+    started = time.perf_counter()
+    conn = get_db_connection()
+    observe_connection_wait(time.perf_counter() - started)
+    return conn
+
+
+def _borrow_connection():
+    # Inside a request all queries share one connection; scripts get their own
+    if has_app_context():
+        return get_request_connection(), False
+    return _acquire_connection(), True
+
+
+def _prepared_cursor(conn, query):
+    """Return (sql, cursor): a prepared cursor for `query` cached on this
+    pooled connection, creating it on first use. `sql` is the exact string
+    object the cursor was first executed with; mysql.connector only skips
+    re-preparing when it is handed that same object again.
+    """
+    statements = conn.statements
+    cached = statements.get(query)
+    if cached is not None:
+        statements.move_to_end(query)
+        return cached
+
+    cached = statements[query] = (query, conn.cursor(prepared=True, dictionary=True))
+    if len(statements) > STATEMENT_CACHE_SIZE:
+        _, (_, evicted) = statements.popitem(last=False)
+        evicted.close()
+    return cached
+
+
+def _evict_prepared(conn, query):
+    cached = conn.statements.pop(query, None)
+    if cached is not None:
+        try:
+            cached[1].close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def _run_statement(conn, query, params):
+    """Execute `query` and yield its cursor. Parameterized statements run as
+    server-side prepared statements that stay open on the connection, so
+    repeats skip parsing and use the binary protocol; the rest go over the
+    text protocol on a throwaway cursor.
+    """
+    if params and STATEMENT_CACHE_SIZE > 0 and hasattr(conn, 'statements'):
+        sql, cursor = _prepared_cursor(conn, query)
+        try:
+            cursor.execute(sql, tuple(params))
+            yield cursor
+        except Exception:
+            # Don't keep a statement around in an unknown state
+            _evict_prepared(conn, query)
+            raise
+        return
+
+    cursor = conn.cursor(dictionary=True)
+    try:
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
-            
-        if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
-            conn.commit()
-
-        if fetch_one:
-            result = cursor.fetchone()
-        else:
-            result = cursor.fetchall()
-        
+        yield cursor
+    finally:
         cursor.close()
-        conn.close()
-        
+
+
+def execute_query(query, params=None, fetch_one=False):
+    started = None
+    try:
+        conn, owned = _borrow_connection()
+
+        try:
+            started = time.perf_counter()
+            with _run_statement(conn, query, params) as cursor:
+                # Connections autocommit, so writes outside transaction() are
+                # already durable here and simply return no rows
+                if not cursor.with_rows:
+                    result = None if fetch_one else []
+                    rows = max(cursor.rowcount, 0)
+                    _record_write(query, cursor.rowcount)
+                elif fetch_one:
+                    result = cursor.fetchone()
+                    rows = 1 + len(cursor.fetchall()) if result else 0
+                else:
+                    result = cursor.fetchall()
+                    rows = len(result)
+        finally:
+            if owned:
+                conn.close()
+
+        observe_query(query, time.perf_counter() - started, rows)
         return result
 
-        
     except Exception as e:
         print(f"Error executing query: {str(e)}")
-        return None if fetch_one else []
\ No newline at end of file
+        if started is not None:
+            observe_query(query, time.perf_counter() - started, error=True)
+        # Let the transaction roll back instead of committing partial work
+        if in_transaction():
+            raise
+        return None if fetch_one else []
+
+
+def execute_write(query, params=None):
+    """Run an INSERT/UPDATE/DELETE and return (rowcount, lastrowid).
+
+    Unlike execute_query, errors are always raised so callers can tell a
+    conflict (e.g. a duplicate key) from success.
+    """
+    conn, owned = _borrow_connection()
+    started = time.perf_counter()
+    try:
+        with _run_statement(conn, query, params) as cursor:
+            result = cursor.rowcount, cursor.lastrowid
+        _record_write(query, result[0])
+        observe_query(query, time.perf_counter() - started, max(result[0], 0))
+        return result
+    except Exception:
+        observe_query(query, time.perf_counter() - started, error=True)
+        raise
+    finally:
+        if owned:
+            conn.close()
+
+
+def stream_query(query, params=None, chunk_size=1000):
+    """Yield rows one at a time from an unbuffered cursor, pulling
+    `chunk_size` rows from the server per fetch. Unlike execute_query the
+    result is never held in memory as a whole.
+
+    Uses its own pooled connection (not the request's), held until the
+    generator is exhausted or closed.
+    """
+    conn = _acquire_connection()
+    cursor = conn.cursor(dictionary=True)
+    finished = False
+    # Covers the whole stream, including time spent waiting on the client
+    started = time.perf_counter()
+    count = 0
+    try:
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            count += len(rows)
+            yield from rows
+        finished = True
+    except Exception:
+        observe_query(query, time.perf_counter() - started, error=True)
+        raise
+    finally:
+        if finished:
+            observe_query(query, time.perf_counter() - started, count)
+            cursor.close()
+            conn.close()
+        else:
+            # Stopped mid-result: draining the rest could take longer than
+            # reconnecting, so drop the connection instead
+            conn.discard()
@@ -1,29 +1,66 @@
-from flask import Blueprint, jsonify, session
+from flask import Blueprint, jsonify, session, request
 from db_utils import execute_query
+from pagination import fetch_page, PaginationError, as_int, as_date, as_prefix
+from responses import conditional, with_etag, rows_payload
+from batch import parse_keys, fetch_by_keys, BatchError
+from includes import (CUSTOMER_DETAILS_SELECT, VEHICLE_DETAILS_SELECT, SALES_ORDER_INCLUDES,
+                      SERVICE_ORDER_INCLUDES, parse_includes, embed_includes, IncludeError)
 
 employee_bp = Blueprint('employee', __name__)
 
+# Tables each list reads, for its ETag
+EMPLOYEES_TABLES = ('Employee',)
+SALES_ORDERS_TABLES = ('SalesOrder', 'Customer', 'Employee', 'Vehicle')
+
+# Query-string filters of /sales_orders
+SALES_ORDER_FILTERS = {
+    'order_id': ("so.ID = %s", as_int),
+    'customer_id': ("so.Customer_ID = %s", as_int),
+    'customer_name': ("c.Name LIKE %s", as_prefix),
+    'employee_id': ("so.Sales_Employee_ID = %s", as_int),
+    'vin': ("so.Vehicle_VIN = %s", str),
+    'date_from': ("so.Sales_Date >= %s", as_date),
+    'date_to': ("so.Sales_Date <= %s", as_date),
+}
+
+# One row per service order, for ?include= (the default shape has a row per part used)
+SERVICE_ORDER_SELECT = """
+    SELECT so.ID, so.Customer_ID, so.Service_Advisor_ID, so.Vehicle_VIN,
+           so.Date_From, so.Date_To, so.Service_Status, so.Price
+    FROM ServiceOrder so
+"""
+
 @employee_bp.route('/employees', methods=['GET'])
 def get_employees():
     user = session.get('user')
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
+
+    etag, not_modified = conditional(EMPLOYEES_TABLES)
+    if not_modified:
+        return not_modified
     
     try:
-        query = """
+        employees, next_cursor = fetch_page(
+            """
             SELECT ID, Name, Email, Phone, Gender, Hire_Date, End_Date, Address
             FROM Employee
-            ORDER BY ID
-        """
-
-        employees = execute_query(query)
-
-        if employees:
-            print("Fetched all employees")
-            return jsonify({'employees': employees}), 200
+            """,
+            sort_keys=[('ID', 'ID', False)],
+            args=request.args,
+            filters={
+                'name': ("Name LIKE %s", as_prefix),
+            },
+        )
+
+        if employees or request.args.get('cursor'):
+            print(f"Fetched {len(employees)} employees")
+            return with_etag(jsonify({'employees': rows_payload(employees), 'next': next_cursor}), etag), 200
         else:
             return jsonify({'error': 'Employees not found'}), 404
-            
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_employees: {str(e)}")
         return jsonify({'error': 'Failed to fetch employees'}), 500
@@ -34,14 +71,25 @@ def get_sales_orders():
     user = session.get('user')
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        include = parse_includes(request.args, SALES_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
+
+    etag, not_modified = conditional(SALES_ORDERS_TABLES)
+    if not_modified:
+        return not_modified
     
     try:
-        query = """
+        sales_orders, next_cursor = fetch_page(
+            """
             SELECT 
                 so.ID,
                 so.Sales_Date,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
                 so.Sales_Employee_ID,
                 c.Name as Customer_Name,
                 e.Name as Sales_Employee_Name,
@@ -52,17 +100,22 @@ def get_sales_orders():
             JOIN Customer c ON so.Customer_ID = c.ID
             LEFT JOIN Employee e ON so.Sales_Employee_ID = e.ID
             LEFT JOIN Vehicle v ON so.Vehicle_VIN = v.VIN
-            ORDER BY so.ID DESC
-        """
-
-        sales_orders = execute_query(query)
-
-        if sales_orders:
-            print("Fetched all sales orders")
-            return jsonify({'sales_orders': sales_orders}), 200
+            """,
+            sort_keys=[('so.ID', 'ID', True)],
+            args=request.args,
+            filters=SALES_ORDER_FILTERS,
+        )
+
+        # No match for a filter is an empty page, not a missing list
+        filtered = any(request.args.get(name) for name in SALES_ORDER_FILTERS)
+        if sales_orders or filtered or request.args.get('cursor'):
+            print(f"Fetched {len(sales_orders)} sales orders")
+            return with_etag(jsonify({'sales_orders': rows_payload(embed_includes(sales_orders, include, SALES_ORDER_INCLUDES)), 'next': next_cursor}), etag), 200
         else:
             return jsonify({'error': 'Sales orders not found'}), 404
-            
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_sales_orders: {str(e)}")
         return jsonify({'error': 'Failed to fetch sales orders'}), 500
@@ -73,6 +126,11 @@ def get_my_sales_orders():
     user = session.get('user')
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        include = parse_includes(request.args, SALES_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
     
     employee_id = user.get('id')
     
@@ -83,6 +141,8 @@ def get_my_sales_orders():
                 so.Sales_Date,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
+                so.Sales_Employee_ID,
                 c.Name as Customer_Name,
                 v.Make,
                 v.Model,
@@ -98,9 +158,9 @@ def get_my_sales_orders():
         
         if sales_orders is not None:
             print(f"Fetched {len(sales_orders)} sales orders for employee {employee_id}")
-            return jsonify({'sales_orders': sales_orders}), 200
+            return jsonify({'sales_orders': rows_payload(embed_includes(sales_orders, include, SALES_ORDER_INCLUDES))}), 200
         else:
-            return jsonify({'sales_orders': []}), 200
+            return jsonify({'sales_orders': rows_payload([])}), 200
             
     except Exception as e:
         print(f"Error in get_my_sales_orders: {str(e)}")
@@ -136,11 +196,7 @@ def get_customer_details(customer_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        query = """
-            SELECT ID, Name, Email, Phone, Address, Gender, Registration_Date, Closure_Date
-            FROM Customer
-            WHERE ID = %s
-        """
+        query = CUSTOMER_DETAILS_SELECT + "WHERE ID = %s"
         
         customer = execute_query(query, (customer_id,), fetch_one=True)
         
@@ -162,11 +218,7 @@ def get_vehicle_details(vin):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        query = """
-            SELECT VIN, Make, Model, Color, Year, Mileage, Price
-            FROM Vehicle
-            WHERE VIN = %s
-        """
+        query = VEHICLE_DETAILS_SELECT + "WHERE VIN = %s"
         
         vehicle = execute_query(query, (vin,), fetch_one=True)
         
@@ -181,12 +233,73 @@ def get_vehicle_details(vin):
         return jsonify({'error': 'Failed to fetch vehicle details'}), 500
 
 
+@employee_bp.route('/customers', methods=['GET'])
+def get_customers_details():
+    """Details of several customers in one request.
+    Query param: id=1,2,3 (at most API_MAX_BATCH)
+    """
+    user = session.get('user')
+    if not user or user.get('user_type') not in ('employee', 'manager'):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        customer_ids = parse_keys(request.args, 'id', as_int)
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    etag, not_modified = conditional(('Customer',))
+    if not_modified:
+        return not_modified
+
+    try:
+        customers, missing = fetch_by_keys(CUSTOMER_DETAILS_SELECT, 'ID', customer_ids)
+        print(f"Fetched details for {len(customers)} of {len(customer_ids)} customers")
+        return with_etag(jsonify({'customers': rows_payload(customers), 'missing': missing}), etag), 200
+
+    except Exception as e:
+        print(f"Error in get_customers_details: {str(e)}")
+        return jsonify({'error': 'Failed to fetch customer details'}), 500
+
+
+@employee_bp.route('/vehicles', methods=['GET'])
+def get_vehicles_details():
+    """Details of several vehicles in one request.
+    Query param: vin=VIN1,VIN2 (at most API_MAX_BATCH)
+    """
+    user = session.get('user')
+    if not user or user.get('user_type') not in ('employee', 'customer', 'manager'):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        vins = parse_keys(request.args, 'vin')
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    etag, not_modified = conditional(('Vehicle',))
+    if not_modified:
+        return not_modified
+
+    try:
+        vehicles, missing = fetch_by_keys(VEHICLE_DETAILS_SELECT, 'VIN', vins)
+        print(f"Fetched details for {len(vehicles)} of {len(vins)} vehicles")
+        return with_etag(jsonify({'vehicles': rows_payload(vehicles), 'missing': missing}), etag), 200
+
+    except Exception as e:
+        print(f"Error in get_vehicles_details: {str(e)}")
+        return jsonify({'error': 'Failed to fetch vehicle details'}), 500
+
+
 @employee_bp.route('/sales/vehicle/<vin>', methods=['GET'])
 def get_sales_by_vehicle(vin):
     user = session.get('user')
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
 
+    try:
+        include = parse_includes(request.args, SALES_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         query = """
             SELECT 
@@ -194,6 +307,8 @@ def get_sales_by_vehicle(vin):
                 so.Sales_Date,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
+                so.Sales_Employee_ID,
                 c.Name as customer_name,
                 e.Name as sales_employee_name
             FROM SalesOrder so
@@ -204,7 +319,7 @@ def get_sales_by_vehicle(vin):
         """
 
         rows = execute_query(query, (vin,))
-        return jsonify({'sales_orders': rows or []}), 200
+        return jsonify({'sales_orders': rows_payload(embed_includes(rows, include, SALES_ORDER_INCLUDES))}), 200
 
     except Exception as e:
         print(f"Error in get_sales_by_vehicle: {str(e)}")
@@ -217,6 +332,11 @@ def get_sales_by_customer(customer_id):
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
 
+    try:
+        include = parse_includes(request.args, SALES_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         query = """
             SELECT 
@@ -224,6 +344,8 @@ def get_sales_by_customer(customer_id):
                 so.Sales_Date,
                 so.Price,
                 so.Vehicle_VIN,
+                so.Customer_ID,
+                so.Sales_Employee_ID,
                 e.Name as sales_employee_name,
                 v.Make,
                 v.Model,
@@ -236,7 +358,7 @@ def get_sales_by_customer(customer_id):
         """
 
         rows = execute_query(query, (customer_id,))
-        return jsonify({'sales_orders': rows or []}), 200
+        return jsonify({'sales_orders': rows_payload(embed_includes(rows, include, SALES_ORDER_INCLUDES))}), 200
 
     except Exception as e:
         print(f"Error in get_sales_by_customer: {str(e)}")
@@ -249,6 +371,11 @@ def get_service_by_vehicle(vin):
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
 
+    try:
+        include = parse_includes(request.args, SERVICE_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         query = """
             SELECT 
@@ -274,8 +401,11 @@ def get_service_by_vehicle(vin):
             ORDER BY so.Date_From DESC, so.ID DESC
         """
 
+        if include:
+            query = SERVICE_ORDER_SELECT + "WHERE so.Vehicle_VIN = %s ORDER BY so.Date_From DESC, so.ID DESC"
+
         rows = execute_query(query, (vin,))
-        return jsonify({'service_orders': rows or []}), 200
+        return jsonify({'service_orders': rows_payload(embed_includes(rows, include, SERVICE_ORDER_INCLUDES))}), 200
 
     except Exception as e:
         print(f"Error in get_service_by_vehicle: {str(e)}")
@@ -288,6 +418,11 @@ def get_service_by_customer(customer_id):
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
 
+    try:
+        include = parse_includes(request.args, SERVICE_ORDER_INCLUDES)
+    except IncludeError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         query = """
             SELECT 
@@ -315,8 +450,11 @@ def get_service_by_customer(customer_id):
             ORDER BY so.Date_From DESC, so.ID DESC
         """
 
+        if include:
+            query = SERVICE_ORDER_SELECT + "WHERE so.Customer_ID = %s ORDER BY so.Date_From DESC, so.ID DESC"
+
         rows = execute_query(query, (customer_id,))
-        return jsonify({'service_orders': rows or []}), 200
+        return jsonify({'service_orders': rows_payload(embed_includes(rows, include, SERVICE_ORDER_INCLUDES))}), 200
 
     except Exception as e:
         print(f"Error in get_service_by_customer: {str(e)}")
@@ -329,7 +467,6 @@ def report_part_shortage():
     if not user or user.get('user_type') not in ('employee', 'manager'):
         return jsonify({'error': 'Unauthorized'}), 401
 
-    from flask import request
     body = request.json or {}
     threshold = body.get('threshold', 5)
 
@@ -350,7 +487,7 @@ def report_part_shortage():
 
         print(f"Part shortage report by user {user.get('username')} (threshold={threshold}): {len(rows or [])} items")
 
-        return jsonify({'shortages': rows or [], 'threshold': threshold}), 200
+        return jsonify({'shortages': rows_payload(rows), 'threshold': threshold}), 200
 
     except Exception as e:
         print(f"Error in report_part_shortage: {str(e)}")
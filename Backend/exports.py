@@ -0,0 +1,165 @@
+"""Background export jobs for large reports.
+
+A job runs one report query on a worker thread, streaming rows from an
+unbuffered cursor (db_utils.stream_query) straight into a file, so neither
+the rows nor a request worker are held while it runs. Clients poll the
+job and download the finished file.
+
+Jobs are kept in memory in the process that accepted them; finished files
+are deleted EXPORT_TTL seconds after the job completes.
+"""
+import csv
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from db_utils import stream_query
+from json_provider import json_default
+
+EXPORT_DIR = os.getenv('EXPORT_DIR') or os.path.join(tempfile.gettempdir(), 'autobase_exports')
+EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '2'))
+EXPORT_TTL = float(os.getenv('EXPORT_TTL', '3600'))
+
+# format -> (file extension, download mimetype)
+FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'ndjson.gz': ('ndjson.gz', 'application/gzip'),
+}
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class ExportError(ValueError):
+    """Unknown report or format."""
+
+
+def _write_csv(path, rows, progress):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+            progress()
+
+
+def _write_ndjson_gz(path, rows, progress):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, default=json_default, separators=(',', ':')))
+            f.write('\n')
+            progress()
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'ndjson.gz': _write_ndjson_gz,
+}
+
+
+class ExportJob:
+    def __init__(self, report, fmt, query, owner):
+        self.id = uuid.uuid4().hex
+        self.report = report
+        self.format = fmt
+        self.query = query
+        self.owner = owner
+        self.status = QUEUED
+        self.rows = 0
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def filename(self):
+        extension, _ = FORMATS[self.format]
+        return f"{self.report}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.created_at))}.{extension}"
+
+    @property
+    def mimetype(self):
+        return FORMATS[self.format][1]
+
+    @property
+    def path(self):
+        return os.path.join(EXPORT_DIR, f"{self.id}.{FORMATS[self.format][0]}")
+
+    def to_dict(self):
+        size = os.path.getsize(self.path) if self.status == DONE and os.path.exists(self.path) else None
+        return {
+            'id': self.id,
+            'report': self.report,
+            'format': self.format,
+            'status': self.status,
+            'rows': self.rows,
+            'bytes': size,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ExportManager:
+    def __init__(self, workers=EXPORT_WORKERS, ttl=EXPORT_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, report, fmt, query, owner=None):
+        if fmt not in FORMATS:
+            raise ExportError(f"Unknown export format: {fmt}")
+        self.expire()
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        job = ExportJob(report, fmt, query, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        # Write under a temporary name so a download never sees a partial file
+        partial = job.path + '.part'
+
+        def progress():
+            job.rows += 1
+
+        try:
+            WRITERS[job.format](partial, stream_query(job.query), progress)
+            os.replace(partial, job.path)
+            job.status = DONE
+        except Exception as e:
+            print(f"Error in export {job.id} ({job.report}): {str(e)}")
+            job.error = 'Export failed'
+            job.status = FAILED
+            if os.path.exists(partial):
+                os.remove(partial)
+        finally:
+            job.finished_at = time.time()
+
+    def expire(self):
+        """Forget finished jobs older than the TTL and delete their files."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            if os.path.exists(job.path):
+                os.remove(job.path)
+
+
+exports = ExportManager()
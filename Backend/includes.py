@@ -0,0 +1,125 @@
+"""Related records embedded in order rows with ?include=vehicle,customer,...
+
+Each requested relation is loaded with one batched IN (...) query keyed by
+the parent rows (batch.fetch_by_keys) and attached in Python, so asking for
+several relations never multiplies rows the way joining them would.
+"""
+from batch import fetch_by_keys, normalized_key
+
+# Keys per IN (...) query when embedding into a long list
+CHUNK_SIZE = 1000
+
+CUSTOMER_DETAILS_SELECT = """
+    SELECT ID, Name, Email, Phone, Address, Gender, Registration_Date, Closure_Date
+    FROM Customer
+"""
+EMPLOYEE_DETAILS_SELECT = """
+    SELECT ID, Name, Email, Phone
+    FROM Employee
+"""
+VEHICLE_DETAILS_SELECT = """
+    SELECT VIN, Make, Model, Color, Year, Mileage, Price
+    FROM Vehicle
+"""
+SERVICE_LINES_SELECT = """
+    SELECT ID, Service_Order_ID, Service_Type, Labor_Hours, Labor_Rate
+    FROM ServiceLine
+"""
+SERVICE_LINE_PARTS_SELECT = """
+    SELECT slup.Service_Line_ID, slup.Part_ID, p.Name, p.Price, slup.Quantity
+    FROM ServiceLineUsePart slup
+    JOIN Part p ON p.ID = slup.Part_ID
+"""
+
+
+class IncludeError(ValueError):
+    """Unknown relation in ?include=."""
+
+
+class Relation:
+    """Rows of `select` whose `remote_column` equals the parent's `local_key`:
+    one record (or None), or with `many` a list of them. With `within`, the
+    parents are the records already embedded under that name.
+    """
+
+    def __init__(self, local_key, select, remote_column, many=False, within=None, order_by=None):
+        self.local_key = local_key
+        self.select = select
+        self.remote_column = remote_column
+        self.many = many
+        self.within = within
+        self.order_by = order_by
+
+    def load(self, keys):
+        remote_key = self.remote_column.split('.')[-1]
+        found = {}
+        for start in range(0, len(keys), CHUNK_SIZE):
+            rows, _ = fetch_by_keys(self.select, self.remote_column, keys[start:start + CHUNK_SIZE],
+                                    order_by=self.order_by)
+            # Keyed the way IN (...) matched, so a VIN that differs only in
+            # case still finds its record
+            for row in rows:
+                if self.many:
+                    found.setdefault(normalized_key(row[remote_key]), []).append(row)
+                else:
+                    found[normalized_key(row[remote_key])] = row
+        return found
+
+    def attach(self, parents, name):
+        keys = list({
+            normalized_key(parent[self.local_key]): parent[self.local_key]
+            for parent in parents if parent.get(self.local_key) is not None
+        }.values())
+        found = self.load(keys) if keys else {}
+        for parent in parents:
+            record = found.get(normalized_key(parent.get(self.local_key)))
+            parent[name] = (record or []) if self.many else record
+
+
+SALES_ORDER_INCLUDES = {
+    'vehicle': Relation('Vehicle_VIN', VEHICLE_DETAILS_SELECT, 'VIN'),
+    'customer': Relation('Customer_ID', CUSTOMER_DETAILS_SELECT, 'ID'),
+    'employee': Relation('Sales_Employee_ID', EMPLOYEE_DETAILS_SELECT, 'ID'),
+}
+
+# In the order they are loaded: parts are embedded in each line
+SERVICE_ORDER_INCLUDES = {
+    'vehicle': Relation('Vehicle_VIN', VEHICLE_DETAILS_SELECT, 'VIN'),
+    'customer': Relation('Customer_ID', CUSTOMER_DETAILS_SELECT, 'ID'),
+    'employee': Relation('Service_Advisor_ID', EMPLOYEE_DETAILS_SELECT, 'ID'),
+    'lines': Relation('ID', SERVICE_LINES_SELECT, 'Service_Order_ID', many=True, order_by='ID'),
+    'parts': Relation('ID', SERVICE_LINE_PARTS_SELECT, 'slup.Service_Line_ID', many=True,
+                      within='lines', order_by='slup.Part_ID'),
+}
+
+
+def parse_includes(args, relations):
+    """Relation names from ?include=a,b, in loading order. Relations
+    embedded within another one bring it along (parts -> lines).
+    """
+    requested = set()
+    for value in args.getlist('include'):
+        for name in value.split(','):
+            name = name.strip()
+            if not name:
+                continue
+            if name not in relations:
+                raise IncludeError(f"Unknown include: {name} (expected {', '.join(relations)})")
+            requested.add(name)
+            while relations[name].within:
+                name = relations[name].within
+                requested.add(name)
+    return [name for name in relations if name in requested]
+
+
+def embed_includes(rows, names, relations):
+    """Attach each relation in `names` to `rows` (in place) and return them."""
+    rows = rows or []
+    for name in names:
+        relation = relations[name]
+        if relation.within:
+            parents = [child for row in rows for child in row[relation.within]]
+        else:
+            parents = rows
+        relation.attach(parents, name)
+    return rows
@@ -0,0 +1,68 @@
+"""JSON encoding for API responses.
+
+Report rows are mostly Decimals and dates straight from the database, which
+Flask's default provider converts one value at a time through Python
+callbacks. This provider uses orjson when it is installed (`pip install
+orjson`), and the standard library otherwise; both give the same output:
+
+- Decimal  -> string, as before ("1234.50"), so no precision is lost
+- date     -> ISO 8601 ("2024-03-01"), datetime -> "2024-03-01T09:30:00"
+- keys keep the column order of the query instead of being sorted
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+def json_default(value):
+    """Encoding of the values JSON has no type for; exports.py uses it too."""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        # MySQL TIME columns come back as timedelta
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class AutoBaseJSONProvider(JSONProvider):
+    """Compact JSON (no whitespace) for jsonify() and request.get_json()."""
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj):
+        if orjson is not None:
+            # Dates and datetimes are encoded natively, in isoformat() form
+            return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=json_default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Skip the bytes -> str -> bytes round trip of the base class
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
@@ -0,0 +1,98 @@
+"""Login throughput benchmark for the credentials subsystem.
+
+Runs many concurrent logins through credentials.check_password() (the same
+call auth_routes.login makes) against stored hashes made with the current
+AUTH_* settings, and reports throughput, latency and how many were turned
+away as busy. Needs no database:
+
+    python login_benchmark.py --clients 64 --logins 500
+    AUTH_SCRYPT_N=32768 AUTH_WORKERS=8 python login_benchmark.py
+
+Use it to pick a cost that keeps login latency acceptable at the expected
+peak, and AUTH_WORKERS / AUTH_MAX_PENDING for the machine.
+"""
+import argparse
+import secrets
+import threading
+import time
+
+import credentials
+
+
+def run(clients, logins, users, wrong_ratio):
+    print(f"Algorithm: {credentials.AUTH_HASH_ALGORITHM} ({credentials._current_cost()}), "
+          f"workers: {credentials.AUTH_WORKERS}, max pending: {credentials.AUTH_MAX_PENDING}")
+
+    started = time.perf_counter()
+    accounts = []
+    for _ in range(users):
+        password = secrets.token_urlsafe(12)
+        accounts.append((password, credentials.hash_password(password)))
+    print(f"Hash: {(time.perf_counter() - started) / users * 1000:.1f}ms per password")
+
+    results = {'ok': 0, 'rejected': 0, 'busy': 0, 'wrong': 0, 'error': 0}
+    latencies = []
+    lock = threading.Lock()
+    next_login = iter(range(logins))
+    start_gate = threading.Barrier(clients)
+
+    def client():
+        start_gate.wait()
+        while True:
+            with lock:
+                i = next(next_login, None)
+            if i is None:
+                return
+            password, stored = accounts[i % len(accounts)]
+            should_pass = (i % 100) >= wrong_ratio * 100
+            if not should_pass:
+                password += 'x'
+            began = time.perf_counter()
+            try:
+                ok, _ = credentials.check_password(password, stored)
+                if ok != should_pass:
+                    outcome = 'wrong'
+                else:
+                    outcome = 'ok' if ok else 'rejected'
+            except credentials.CredentialsBusy:
+                outcome = 'busy'
+            except Exception as e:
+                print(f"Login {i} failed: {str(e)}")
+                outcome = 'error'
+            with lock:
+                results[outcome] += 1
+                if outcome in ('ok', 'rejected', 'wrong'):
+                    latencies.append(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    completed = len(latencies)
+    print(f"Clients: {clients}, logins: {logins}")
+    print(f"Elapsed: {elapsed:.3f}s, throughput: {completed / elapsed:.1f} logins/s")
+    if latencies:
+        print(f"Latency p50: {latencies[completed // 2] * 1000:.1f}ms, "
+              f"p99: {latencies[max(int(completed * 0.99) - 1, 0)] * 1000:.1f}ms")
+    print(f"Accepted: {results['ok']}, rejected: {results['rejected']}, "
+          f"busy: {results['busy']}, wrong outcome: {results['wrong']}, errors: {results['error']}")
+
+    ok = results['wrong'] == 0 and results['error'] == 0
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--wrong-ratio', type=float, default=0.1,
+                        help="share of logins that use a wrong password")
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.clients, args.logins, args.users, args.wrong_ratio) else 1)
@@ -1,8 +1,90 @@
-from flask import Blueprint, jsonify, request, session
-from db_utils import execute_query
+import datetime
+from flask import Blueprint, jsonify, request, send_file, session
+from db_utils import execute_query, stream_query
+from responses import stream_json_response, conditional, with_etag, rows_payload
+from pagination import fetch_page, PaginationError, as_int, as_date, as_prefix
+from result_cache import cache
+from exports import exports, ExportError, FORMATS as EXPORT_FORMATS
+import precompute
+import service_analytics
 
 manager_bp = Blueprint('manager', __name__)
 
+# Tables each result reads; a write to any of them invalidates its cache
+# entry and changes its ETag
+SALES_BY_DATE_TABLES = ('SalesDailyRollup',)
+SALES_BY_EMPLOYEE_TABLES = ('SalesEmployeeRollup', 'Employee')
+SERVICE_SUMMARY_TABLES = ('ServiceOrder', 'ServiceLine', 'ServiceLineUsePart', 'Part', 'Employee')
+PARTS_USAGE_TABLES = ('Part', 'ServiceLineUsePart')
+CUSTOMER_VEHICLES_TABLES = ('Customer', 'CustomerOwnVehicle', 'ServiceOrder')
+WAITING_VEHICLES_TABLES = ('Customer', 'ServiceOrder', 'ServiceLine', 'ServiceLineUsePart', 'Part')
+EMPLOYEE_PERFORMANCE_TABLES = ('EmployeePerformance', 'Employee')
+
+
+# Report queries, shared by the report endpoints and exports
+CUSTOMER_VEHICLES_QUERY = """
+    SELECT 
+        C.ID AS 'Customer ID',
+        C.Name AS 'Customer Name',
+        COUNT(DISTINCT COV.Vehicle_VIN) AS 'Vehicle Amount',
+        COUNT(DISTINCT SO.ID) AS 'Service Times'
+    FROM Customer C
+    LEFT JOIN CustomerOwnVehicle COV ON C.ID = COV.Customer_ID
+    LEFT JOIN ServiceOrder SO ON C.ID = SO.Customer_ID
+    GROUP BY C.ID, C.Name
+    ORDER BY C.ID
+"""
+
+WAITING_VEHICLES_QUERY = """
+    SELECT 
+        C.ID AS 'Customer ID',
+        C.Name AS 'Customer Name',
+        SO.Vehicle_VIN AS 'Vehicle VIN',
+        SO.Service_Status AS 'Status',
+        P.ID AS 'Part ID',
+        P.Name AS 'Part Name',
+        SLUP.Quantity AS 'Quantity',
+        P.Stock AS 'Stock'
+    FROM Customer C
+    JOIN ServiceOrder SO ON C.ID = SO.Customer_ID
+    JOIN ServiceLine SL ON SO.ID = SL.Service_Order_ID
+    JOIN ServiceLineUsePart SLUP ON SL.ID = SLUP.Service_Line_ID
+    JOIN Part P ON SLUP.Part_ID = P.ID
+    WHERE SO.Service_Status = 'WAITING'
+    ORDER BY C.ID, SO.Vehicle_VIN
+"""
+
+SALES_BY_DATE_QUERY = """
+    SELECT 
+        Sales_Date AS 'Date',
+        Total_Sales AS 'Total Sales',
+        Order_Count AS 'Order Count'
+    FROM SalesDailyRollup
+    WHERE Order_Count > 0
+    ORDER BY Sales_Date
+"""
+
+# Reports that can be exported with POST /exports
+EXPORT_REPORTS = {
+    'customer-vehicles': CUSTOMER_VEHICLES_QUERY,
+    'waiting-vehicles': WAITING_VEHICLES_QUERY,
+    'sales-by-date': SALES_BY_DATE_QUERY,
+}
+
+DEFAULT_REPORT_CITY = 'Seattle'
+
+
+def _report_period(args):
+    """(date_from, date_to) from ?date_from=&date_to= or ?year=, defaulting
+    to the current year. Raises ValueError for bad or reversed values.
+    """
+    year = int(args.get('year') or datetime.date.today().year)
+    date_from = as_date(args['date_from']) if args.get('date_from') else datetime.date(year, 1, 1)
+    date_to = as_date(args['date_to']) if args.get('date_to') else datetime.date(year, 12, 31)
+    if date_from > date_to:
+        raise ValueError('date_from is after date_to')
+    return date_from, date_to
+
 
 def _require_manager():
     user = session.get('user')
@@ -15,40 +97,44 @@ def _require_manager():
 def sales_aggregate():
     """Aggregate sales data by date or by employee.
     Query param: by=date|employee (default=date)
+    Reads the rollup tables kept current by triggers (migration 0005).
     """
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
     by = request.args.get('by', 'date')
 
+    etag, not_modified = conditional(SALES_BY_EMPLOYEE_TABLES if by == 'employee' else SALES_BY_DATE_TABLES)
+    if not_modified:
+        return not_modified
+
     try:
         if by == 'employee':
             query = """
                 SELECT 
                     e.ID as employee_id, 
                     e.Name as employee_name,
-                    SUM(so.Price) as total_sales, 
-                    COUNT(*) as order_count
-                FROM SalesOrder so
-                JOIN Employee e ON so.Sales_Employee_ID = e.ID
-                WHERE so.Sales_Employee_ID IS NOT NULL
-                GROUP BY e.ID, e.Name
+                    r.Total_Sales as total_sales, 
+                    r.Order_Count as order_count
+                FROM SalesEmployeeRollup r
+                JOIN Employee e ON r.Employee_ID = e.ID
+                WHERE r.Order_Count > 0
                 ORDER BY total_sales DESC
             """
             res = execute_query(query)
-            return jsonify({'by': 'employee', 'data': res or []}), 200
+            return with_etag(jsonify({'by': 'employee', 'data': rows_payload(res)}), etag), 200
         else:
             query = """
                 SELECT 
                     Sales_Date as date,
-                    SUM(Price) as total_sales,
-                    COUNT(*) as order_count
-                FROM SalesOrder
-                GROUP BY Sales_Date
+                    Total_Sales as total_sales,
+                    Order_Count as order_count
+                FROM SalesDailyRollup
+                WHERE Order_Count > 0
                 ORDER BY Sales_Date DESC
             """
             res = execute_query(query)
-            return jsonify({'by': 'date', 'data': res or []}), 200
+            return with_etag(jsonify({'by': 'date', 'data': rows_payload(res)}), etag), 200
 
     except Exception as e:
         print(f"Error in sales_aggregate: {str(e)}")
@@ -63,46 +149,16 @@ def service_summary():
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
-    by = request.args.get('by', 'date')
+    etag, not_modified = conditional(SERVICE_SUMMARY_TABLES)
+    if not_modified:
+        return not_modified
+
+    # Aggregate by service advisor (employee assigned to service order) or by service order date
+    by = 'employee' if request.args.get('by') == 'employee' else 'date'
 
     try:
-        if by == 'employee':
-            # Aggregate by service advisor (employee assigned to service order)
-            query = """
-                SELECT 
-                    e.ID as employee_id, 
-                    e.Name as employee_name,
-                    SUM(so.Price) as service_revenue,
-                    COALESCE(SUM(sl.Labor_Hours), 0) as labor_hours,
-                    COALESCE(SUM(p.Price * slup.Quantity), 0) as parts_cost
-                FROM ServiceOrder so
-                JOIN Employee e ON so.Service_Advisor_ID = e.ID
-                LEFT JOIN ServiceLine sl ON so.ID = sl.Service_Order_ID
-                LEFT JOIN ServiceLineUsePart slup ON sl.ID = slup.Service_Line_ID
-                LEFT JOIN Part p ON slup.Part_ID = p.ID
-                WHERE so.Service_Advisor_ID IS NOT NULL
-                GROUP BY e.ID, e.Name
-                ORDER BY service_revenue DESC
-            """
-            res = execute_query(query)
-            return jsonify({'by': 'employee', 'data': res or []}), 200
-        else:
-            # Aggregate by service order date
-            query = """
-                SELECT 
-                    so.Date_From as date,
-                    SUM(so.Price) as service_revenue,
-                    COALESCE(SUM(sl.Labor_Hours), 0) as labor_hours,
-                    COALESCE(SUM(p.Price * slup.Quantity), 0) as parts_cost
-                FROM ServiceOrder so
-                LEFT JOIN ServiceLine sl ON so.ID = sl.Service_Order_ID
-                LEFT JOIN ServiceLineUsePart slup ON sl.ID = slup.Service_Line_ID
-                LEFT JOIN Part p ON slup.Part_ID = p.ID
-                GROUP BY so.Date_From
-                ORDER BY so.Date_From DESC
-            """
-            res = execute_query(query)
-            return jsonify({'by': 'date', 'data': res or []}), 200
+        res = service_analytics.service_summary(by)
+        return with_etag(jsonify({'by': by, 'data': rows_payload(res)}), etag), 200
 
     except Exception as e:
         print(f"Error in service_summary: {str(e)}")
@@ -111,12 +167,19 @@ def service_summary():
 
 @manager_bp.route('/parts/usage', methods=['GET'])
 def parts_usage():
-    """Return all parts with usage and stock info."""
+    """Return parts with usage and stock info, one page at a time.
+    Query params: limit, cursor, name (prefix), max_stock
+    """
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
+    etag, not_modified = conditional(PARTS_USAGE_TABLES)
+    if not_modified:
+        return not_modified
+
     try:
-        query = """
+        res, next_cursor = cache.get_or_compute('parts_usage', PARTS_USAGE_TABLES, lambda: fetch_page(
+            """
             SELECT 
                 p.ID, 
                 p.Name, 
@@ -125,12 +188,19 @@ def parts_usage():
                 COALESCE(SUM(slup.Quantity), 0) as times_used
             FROM Part p
             LEFT JOIN ServiceLineUsePart slup ON p.ID = slup.Part_ID
-            GROUP BY p.ID, p.Name, p.Price, p.Stock
-            ORDER BY p.Name
-        """
-        res = execute_query(query)
-        return jsonify({'data': res or []}), 200
-
+            """,
+            sort_keys=[('p.Name', 'Name', False), ('p.ID', 'ID', False)],
+            args=request.args,
+            filters={
+                'name': ("p.Name LIKE %s", as_prefix),
+                'max_stock': ("p.Stock <= %s", as_int),
+            },
+            group_by="p.ID, p.Name, p.Price, p.Stock",
+        ), args=request.args)
+        return with_etag(jsonify({'data': rows_payload(res), 'next': next_cursor}), etag), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in parts_usage: {str(e)}")
         return jsonify({'error': 'Failed to fetch parts usage'}), 500
@@ -264,21 +334,14 @@ def customer_vehicles_report():
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
+    etag, not_modified = conditional(CUSTOMER_VEHICLES_TABLES)
+    if not_modified:
+        return not_modified
+
     try:
-        query = """
-            SELECT 
-                C.ID AS 'Customer ID',
-                C.Name AS 'Customer Name',
-                COUNT(DISTINCT COV.Vehicle_VIN) AS 'Vehicle Amount',
-                COUNT(DISTINCT SO.ID) AS 'Service Times'
-            FROM Customer C
-            LEFT JOIN CustomerOwnVehicle COV ON C.ID = COV.Customer_ID
-            LEFT JOIN ServiceOrder SO ON C.ID = SO.Customer_ID
-            GROUP BY C.ID, C.Name
-            ORDER BY C.ID
-        """
-        res = execute_query(query)
-        return jsonify({'data': res or []}), 200
+        rows = cache.stream('customer_vehicles_report', CUSTOMER_VEHICLES_TABLES,
+                            lambda: stream_query(CUSTOMER_VEHICLES_QUERY))
+        return with_etag(stream_json_response(rows), etag)
 
     except Exception as e:
         print(f"Error in customer_vehicles_report: {str(e)}")
@@ -291,27 +354,14 @@ def waiting_vehicles_report():
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
+    etag, not_modified = conditional(WAITING_VEHICLES_TABLES)
+    if not_modified:
+        return not_modified
+
     try:
-        query = """
-            SELECT 
-                C.ID AS 'Customer ID',
-                C.Name AS 'Customer Name',
-                SO.Vehicle_VIN AS 'Vehicle VIN',
-                SO.Service_Status AS 'Status',
-                P.ID AS 'Part ID',
-                P.Name AS 'Part Name',
-                SLUP.Quantity AS 'Quantity',
-                P.Stock AS 'Stock'
-            FROM Customer C
-            JOIN ServiceOrder SO ON C.ID = SO.Customer_ID
-            JOIN ServiceLine SL ON SO.ID = SL.Service_Order_ID
-            JOIN ServiceLineUsePart SLUP ON SL.ID = SLUP.Service_Line_ID
-            JOIN Part P ON SLUP.Part_ID = P.ID
-            WHERE SO.Service_Status = 'WAITING'
-            ORDER BY C.ID, SO.Vehicle_VIN
-        """
-        res = execute_query(query)
-        return jsonify({'data': res or []}), 200
+        rows = cache.stream('waiting_vehicles_report', WAITING_VEHICLES_TABLES,
+                            lambda: stream_query(WAITING_VEHICLES_QUERY))
+        return with_etag(stream_json_response(rows), etag)
 
     except Exception as e:
         print(f"Error in waiting_vehicles_report: {str(e)}")
@@ -320,33 +370,99 @@ def waiting_vehicles_report():
 
 @manager_bp.route('/reports/employee-performance', methods=['GET'])
 def employee_performance_report():
-    """Complex Report 3: Employee performance with Seattle customer count"""
+    """Complex Report 3: Employee performance with customer count for one city
+    Query params: year (default: this year) or date_from/date_to, city (default: Seattle)
+    Served from the EmployeePerformance table, see precompute.py.
+    """
     if not _require_manager():
         return jsonify({'error': 'Unauthorized'}), 401
 
     try:
-        query = """
-            SELECT 
-                E.ID AS 'Employee ID',
-                E.Name AS 'Employee Name',
-                COUNT(SO.ID) AS 'Vehicle Sold',
-                (SELECT COUNT(DISTINCT SO2.ID)
-                 FROM SalesOrder SO2
-                 JOIN Customer C2 ON SO2.Customer_ID = C2.ID
-                 WHERE SO2.Sales_Employee_ID = E.ID
-                 AND SO2.Sales_Date >= '2024-01-01'
-                 AND SO2.Sales_Date <= '2024-12-31'
-                 AND C2.Address LIKE '%Seattle%') AS 'Seattle Customers'
-            FROM Employee E
-            LEFT JOIN SalesOrder SO ON E.ID = SO.Sales_Employee_ID
-            WHERE SO.Sales_Date >= '2024-01-01' 
-            AND SO.Sales_Date <= '2024-12-31'
-            GROUP BY E.ID, E.Name
-            ORDER BY COUNT(SO.ID) DESC
-        """
-        res = execute_query(query)
-        return jsonify({'data': res or []}), 200
+        date_from, date_to = _report_period(request.args)
+    except ValueError:
+        return jsonify({'error': 'Invalid year or date range'}), 400
+    city = request.args.get('city', '').strip() or DEFAULT_REPORT_CITY
+
+    etag, not_modified = conditional(EMPLOYEE_PERFORMANCE_TABLES)
+    if not_modified:
+        return not_modified
+
+    try:
+        res = cache.get_or_compute('employee_performance_report', EMPLOYEE_PERFORMANCE_TABLES,
+                                   lambda: precompute.employee_performance(date_from, date_to, city),
+                                   args=request.args)
+        return with_etag(jsonify({
+            'data': rows_payload(res),
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'city': city,
+        }), etag), 200
 
     except Exception as e:
         print(f"Error in employee_performance_report: {str(e)}")
-        return jsonify({'error': 'Failed to generate employee performance report'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to generate employee performance report'}), 500
+
+
+@manager_bp.route('/exports', methods=['POST'])
+def create_export():
+    """Start a background export of a full report.
+    Body: {"report": "customer-vehicles|waiting-vehicles|sales-by-date",
+           "format": "csv|ndjson.gz"}
+    Poll GET /exports/<id> until status is done, then download the file.
+    """
+    if not _require_manager():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.get_json(silent=True) or {}
+    report = data.get('report')
+    fmt = data.get('format', 'csv')
+
+    if report not in EXPORT_REPORTS:
+        return jsonify({'error': 'Unknown report', 'reports': sorted(EXPORT_REPORTS)}), 400
+
+    try:
+        job = exports.submit(report, fmt, EXPORT_REPORTS[report], owner=session['user'].get('id'))
+        return jsonify({'job': job.to_dict()}), 202
+
+    except ExportError as e:
+        return jsonify({'error': str(e), 'formats': sorted(EXPORT_FORMATS)}), 400
+    except Exception as e:
+        print(f"Error in create_export: {str(e)}")
+        return jsonify({'error': 'Failed to start export'}), 500
+
+
+def _own_export(job_id):
+    job = exports.get(job_id)
+    if job is None or job.owner != session['user'].get('id'):
+        return None
+    return job
+
+
+@manager_bp.route('/exports/<job_id>', methods=['GET'])
+def get_export(job_id):
+    """Status of an export job: queued, running, done or failed."""
+    if not _require_manager():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    job = _own_export(job_id)
+    if job is None:
+        return jsonify({'error': 'Export not found'}), 404
+    return jsonify({'job': job.to_dict()}), 200
+
+
+@manager_bp.route('/exports/<job_id>/download', methods=['GET'])
+def download_export(job_id):
+    """Download a finished export. Supports Range requests, so interrupted
+    downloads of large files can resume.
+    """
+    if not _require_manager():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    job = _own_export(job_id)
+    if job is None:
+        return jsonify({'error': 'Export not found'}), 404
+    if job.status != 'done':
+        return jsonify({'error': 'Export not ready', 'job': job.to_dict()}), 409
+
+    return send_file(job.path, mimetype=job.mimetype, as_attachment=True,
+                     download_name=job.filename, conditional=True)
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from flask import Blueprint, Response, g, has_request_context, request
+from database import get_pool_stats
+
+metrics_bp = Blueprint('metrics', __name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv('DB_SLOW_QUERY_MS', '200')) / 1000
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _format_labels(self.labels, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                inf = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[len(self.buckets)]}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]}")
+                lines.append(f"{self.name}_count{labels} {series[len(self.buckets)]}")
+        return lines
+
+
+http_request_seconds = Histogram(
+    'autobase_http_request_duration_seconds', 'Time spent handling a request.',
+    ('endpoint', 'method'))
+http_requests = Counter(
+    'autobase_http_requests_total', 'Requests handled, by response status.',
+    ('endpoint', 'method', 'status'))
+db_query_seconds = Histogram(
+    'autobase_db_query_duration_seconds', 'Time spent executing a query and reading its rows.',
+    ('endpoint', 'query'))
+db_query_rows = Histogram(
+    'autobase_db_query_rows', 'Rows returned or affected per query.',
+    ('endpoint', 'query'), buckets=ROW_BUCKETS)
+db_query_errors = Counter(
+    'autobase_db_query_errors_total', 'Queries that raised an error.',
+    ('endpoint', 'query'))
+db_slow_queries = Counter(
+    'autobase_db_slow_queries_total', 'Queries slower than DB_SLOW_QUERY_MS.',
+    ('endpoint', 'query'))
+db_connection_wait_seconds = Histogram(
+    'autobase_db_connection_wait_seconds', 'Time spent waiting to borrow a pooled connection.',
+    ('endpoint',))
+
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query):
+    """Normalize SQL so queries differing only in literals, placeholders,
+    IN-list length or whitespace share one fingerprint. Returns
+    (query_id, normalized_sql).
+    """
+    sql = re.sub(r"--[^\n]*", " ", query)
+    sql = re.sub(r"/\*.*?\*/", " ", sql, flags=re.S)
+    sql = re.sub(r"'(?:[^'\\]|\\.|'')*'", "?", sql)
+    sql = re.sub(r"%\(\w+\)s|%s", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\s+", " ", sql).strip()
+    sql = re.sub(r"IN \((?:\?, ?)*\?\)", "IN (...)", sql, flags=re.I)
+    query_id = hashlib.sha1(sql.encode()).hexdigest()[:12]
+    with _fingerprints_lock:
+        _fingerprints[query_id] = sql
+    return query_id, sql
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or 'unknown'
+    return 'none'
+
+
+def observe_query(query, seconds, rows=0, error=False):
+    query_id, sql = fingerprint(query)
+    endpoint = _endpoint()
+    db_query_seconds.observe(seconds, endpoint, query_id)
+    if error:
+        db_query_errors.inc(endpoint, query_id)
+    else:
+        db_query_rows.observe(rows, endpoint, query_id)
+    if seconds >= SLOW_QUERY_SECONDS:
+        db_slow_queries.inc(endpoint, query_id)
+        print(f"Slow query ({seconds * 1000:.1f}ms) in {endpoint} [{query_id}]: {sql}")
+
+
+def observe_connection_wait(seconds):
+    db_connection_wait_seconds.observe(seconds, _endpoint())
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _after_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unknown'
+        http_request_seconds.observe(time.perf_counter() - started, endpoint, request.method)
+        http_requests.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def _render_pool():
+    lines = []
+    stats = get_pool_stats()
+    gauges = ('size', 'open', 'idle', 'in_use', 'waiting')
+    counters = ('borrowed_total', 'timeouts_total', 'created_total', 'recycled_total', 'ping_failures_total')
+    for key in gauges:
+        lines.append(f"# TYPE autobase_db_pool_{key} gauge")
+        lines.append(f"autobase_db_pool_{key} {stats[key]}")
+    for key in counters:
+        lines.append(f"# TYPE autobase_db_pool_{key} counter")
+        lines.append(f"autobase_db_pool_{key} {stats[key]}")
+    return lines
+
+
+def _render_fingerprints():
+    lines = [
+        "# HELP autobase_db_query_info Normalized SQL for each query fingerprint.",
+        "# TYPE autobase_db_query_info gauge",
+    ]
+    with _fingerprints_lock:
+        for query_id, sql in sorted(_fingerprints.items()):
+            lines.append(f'autobase_db_query_info{{query="{query_id}",sql="{_escape(sql)}"}} 1')
+    return lines
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of request, query and pool metrics."""
+    lines = []
+    for metric in (http_request_seconds, http_requests, db_query_seconds, db_query_rows,
+                   db_query_errors, db_slow_queries, db_connection_wait_seconds):
+        lines.extend(metric.render())
+    lines.extend(_render_pool())
+    lines.extend(_render_fingerprints())
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,132 @@
+import base64
+import datetime
+import decimal
+import json
+from db_utils import execute_query
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class PaginationError(ValueError):
+    """Bad limit, cursor or filter value in the query string."""
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, key_count):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise PaginationError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != key_count:
+        raise PaginationError('Invalid cursor')
+    return values
+
+
+def parse_limit(value):
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('Invalid limit')
+    if limit < 1:
+        raise PaginationError('Invalid limit')
+    return min(limit, MAX_LIMIT)
+
+
+# Converters for filter values taken from the query string
+def as_int(value):
+    return int(value)
+
+
+def as_decimal(value):
+    return decimal.Decimal(value)
+
+
+def as_date(value):
+    return datetime.date.fromisoformat(value)
+
+
+def as_prefix(value):
+    # For LIKE filters; escape wildcards so the value only matches as a prefix
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+
+def _keyset_condition(sort_keys, after):
+    """(a, b, c) strictly after (x, y, z) in the given sort order, expanded
+    into an OR chain so MySQL can use a range scan on a matching index.
+    """
+    clauses = []
+    params = []
+    for i, (column, _, descending) in enumerate(sort_keys):
+        parts = []
+        for prev_column, _, _ in sort_keys[:i]:
+            parts.append(f"{prev_column} = %s")
+        parts.append(f"{column} {'<' if descending else '>'} %s")
+        params.extend(after[:i + 1])
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def fetch_page(select, sort_keys, args, filters=None, where=None, params=(), group_by=None):
+    """Run one page of a list query using keyset pagination.
+
+    `select` is the query up to (but not including) WHERE. `sort_keys` is a
+    list of (sql_expression, result_column, descending) tuples; together
+    they must be unique and non-null per row, so end with the primary key.
+    `filters` maps query-string argument names to (sql_condition, converter)
+    pairs, applied only when the argument is present. `where` and `params`
+    are fixed conditions that always apply.
+
+    Reads `limit` and `cursor` from `args` and returns (rows, next_cursor);
+    next_cursor is None on the last page.
+    """
+    limit = parse_limit(args.get('limit'))
+    conditions = list(where or [])
+    values = list(params)
+
+    for name, (condition, convert) in (filters or {}).items():
+        raw = args.get(name)
+        if raw in (None, ''):
+            continue
+        try:
+            values.append(convert(raw))
+        except (ValueError, decimal.InvalidOperation):
+            raise PaginationError(f'Invalid value for {name}')
+        conditions.append(condition)
+
+    token = args.get('cursor')
+    if token:
+        after = decode_cursor(token, len(sort_keys))
+        condition, keyset_params = _keyset_condition(sort_keys, after)
+        conditions.append(condition)
+        values.extend(keyset_params)
+
+    query = select
+    if conditions:
+        query += "\nWHERE " + "\n  AND ".join(conditions)
+    if group_by:
+        query += f"\nGROUP BY {group_by}"
+    query += "\nORDER BY " + ", ".join(
+        f"{column} {'DESC' if descending else 'ASC'}" for column, _, descending in sort_keys
+    )
+    # One extra row tells us whether another page exists
+    query += "\nLIMIT %s"
+    values.append(limit + 1)
+
+    rows = execute_query(query, tuple(values))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[key] for _, key, _ in sort_keys])
+
+    return rows, next_cursor
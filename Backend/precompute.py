@@ -0,0 +1,136 @@
+"""Report tables rebuilt in the background.
+
+A scheduler thread wakes every DB_PRECOMPUTE_INTERVAL seconds and rebuilds
+each precomputed table whose source tables have been written since its
+last build (per the version counters db_utils keeps, see result_cache), or
+that is older than DB_PRECOMPUTE_MAX_AGE, which covers writes made outside
+the API. Each rebuild runs in one transaction, so readers see either the
+old contents or the new ones.
+"""
+import os
+import threading
+import time
+from db_utils import execute_query, transaction
+from result_cache import cache
+
+PRECOMPUTE_INTERVAL = float(os.getenv('DB_PRECOMPUTE_INTERVAL', '30'))
+PRECOMPUTE_MAX_AGE = float(os.getenv('DB_PRECOMPUTE_MAX_AGE', '900'))
+
+# Second comma-separated part of "street, city, state, country, zip"
+CITY_EXPR = "COALESCE(TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(c.Address, ',', 2), ',', -1)), '')"
+
+
+class PrecomputedTable:
+    def __init__(self, name, sources, statements):
+        self.name = name
+        self.sources = tuple(sources)
+        self.statements = statements
+        self.built_versions = None
+        self.built_at = None
+
+    def is_stale(self):
+        if self.built_at is None:
+            return True
+        if time.monotonic() - self.built_at > PRECOMPUTE_MAX_AGE:
+            return True
+        return cache.versions(self.sources) != self.built_versions
+
+    def rebuild(self):
+        # Read before rebuilding: a write that lands meanwhile triggers another round
+        versions = cache.versions(self.sources)
+        started = time.perf_counter()
+        with transaction():
+            for statement in self.statements:
+                execute_query(statement)
+        self.built_versions = versions
+        self.built_at = time.monotonic()
+        print(f"Rebuilt {self.name} in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+EMPLOYEE_PERFORMANCE = PrecomputedTable(
+    'EmployeePerformance',
+    sources=('SalesOrder', 'Customer'),
+    statements=(
+        "DELETE FROM EmployeePerformance",
+        f"""
+        INSERT INTO EmployeePerformance (Sales_Date, Employee_ID, City, Order_Count)
+        SELECT so.Sales_Date, so.Sales_Employee_ID, {CITY_EXPR} AS City, COUNT(*)
+        FROM SalesOrder so
+        LEFT JOIN Customer c ON c.ID = so.Customer_ID
+        WHERE so.Sales_Employee_ID IS NOT NULL
+        GROUP BY so.Sales_Date, so.Sales_Employee_ID, City
+        """,
+    ),
+)
+
+TABLES = (EMPLOYEE_PERFORMANCE,)
+
+
+def employee_performance(date_from, date_to, city):
+    """Sales per employee between two dates (inclusive), and how many of
+    them went to customers in `city`. Employees with no sales in the range
+    are left out.
+    """
+    query = """
+        SELECT
+            e.ID AS 'Employee ID',
+            e.Name AS 'Employee Name',
+            CAST(SUM(ep.Order_Count) AS SIGNED) AS 'Vehicle Sold',
+            CAST(SUM(CASE WHEN ep.City = %s THEN ep.Order_Count ELSE 0 END) AS SIGNED) AS 'City Customers'
+        FROM EmployeePerformance ep
+        JOIN Employee e ON e.ID = ep.Employee_ID
+        WHERE ep.Sales_Date BETWEEN %s AND %s
+        GROUP BY e.ID, e.Name
+        ORDER BY SUM(ep.Order_Count) DESC, e.ID
+    """
+    return execute_query(query, (city, date_from, date_to)) or []
+
+
+class Scheduler(threading.Thread):
+    def __init__(self, app, tables=TABLES, interval=PRECOMPUTE_INTERVAL):
+        super().__init__(name='precompute-scheduler', daemon=True)
+        self.app = app
+        self.tables = tables
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        for table in self.tables:
+            try:
+                if table.is_stale():
+                    # App context: a request-style connection and transaction()
+                    with self.app.app_context():
+                        table.rebuild()
+            except Exception as e:
+                print(f"Error rebuilding {table.name}: {str(e)}")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _start_scheduler(app):
+    global _scheduler
+    if _scheduler is not None:
+        return
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(app)
+            _scheduler.start()
+
+
+def init_app(app):
+    """Start the scheduler with the first request, so it runs only in
+    processes that serve requests (not e.g. the debug reloader's watcher).
+    """
+    @app.before_request
+    def start_precompute_scheduler():
+        _start_scheduler(app)
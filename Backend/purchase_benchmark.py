@@ -0,0 +1,131 @@
+"""Concurrency benchmark for purchases.purchase_vehicle().
+
+Creates a handful of throwaway vehicles, lets many buyers race for them in
+parallel, then checks that no vehicle was sold twice and reports throughput.
+The rows it creates are removed afterwards. Point it at a development
+database (same .env as the API):
+
+    python purchase_benchmark.py --buyers 200 --vehicles 20
+"""
+import argparse
+import threading
+import time
+import uuid
+
+import database
+from app import app
+from db_utils import execute_query
+from purchases import purchase_vehicle, VehicleUnavailableError
+
+VIN_PREFIX = 'BENCH'
+
+
+def create_vehicles(count):
+    vins = [VIN_PREFIX + uuid.uuid4().hex[:12].upper() for _ in range(count)]
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO Vehicle (VIN, Make, Model, Color, Year, Mileage, Price)
+            VALUES (%s, 'Bench', 'Mark', 'Gray', 2020, '0', 10000.00)
+            """,
+            [(vin,) for vin in vins]
+        )
+    finally:
+        cursor.close()
+        conn.close()
+    return vins
+
+
+def remove_vehicles(vins):
+    # SalesOrder and CustomerOwnVehicle rows cascade from Vehicle
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(vins))
+        cursor.execute(f"DELETE FROM Vehicle WHERE VIN IN ({placeholders})", tuple(vins))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run(buyers, vehicle_count):
+    customers = [row['ID'] for row in execute_query("SELECT ID FROM Customer ORDER BY ID LIMIT %s", (buyers,))]
+    if not customers:
+        raise SystemExit("No customers in the database to buy with.")
+
+    vins = create_vehicles(vehicle_count)
+    results = {'sold': 0, 'conflict': 0, 'error': 0}
+    latencies = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(buyers)
+
+    def buyer(i):
+        customer_id = customers[i % len(customers)]
+        vin = vins[i % len(vins)]
+        start_gate.wait()
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                purchase_vehicle(customer_id, vin, 10000)
+                outcome = 'sold'
+            except VehicleUnavailableError:
+                outcome = 'conflict'
+            except Exception as e:
+                print(f"Buyer {i} failed: {str(e)}")
+                outcome = 'error'
+        with lock:
+            results[outcome] += 1
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=buyer, args=(i,)) for i in range(buyers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        placeholders = ', '.join(['%s'] * len(vins))
+        double_sales = execute_query(f"""
+            SELECT Vehicle_VIN, COUNT(*) AS orders
+            FROM SalesOrder
+            WHERE Vehicle_VIN IN ({placeholders})
+            GROUP BY Vehicle_VIN
+            HAVING COUNT(*) > 1
+        """, tuple(vins))
+        sold = execute_query(f"""
+            SELECT COUNT(*) AS sold
+            FROM Vehicle
+            WHERE VIN IN ({placeholders}) AND Is_Available = 0
+        """, tuple(vins), fetch_one=True)['sold']
+    finally:
+        remove_vehicles(vins)
+
+    latencies.sort()
+    print(f"Buyers: {buyers}, vehicles: {vehicle_count}, pool size: {database.get_pool().size}")
+    print(f"Elapsed: {elapsed:.3f}s, throughput: {buyers / elapsed:.1f} purchase attempts/s")
+    print(f"Latency p50: {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+    print(f"Sold: {results['sold']}, conflicts: {results['conflict']}, errors: {results['error']}")
+    print(f"Vehicles marked sold: {sold}, double sales: {len(double_sales)}")
+    print(f"Pool: {database.get_pool_stats()}")
+
+    ok = not double_sales and results['sold'] == sold == min(vehicle_count, buyers)
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buyers', type=int, default=128)
+    parser.add_argument('--vehicles', type=int, default=10)
+    parser.add_argument('--pool-size', type=int, default=32)
+    args = parser.parse_args()
+
+    database.pool_config['size'] = args.pool_size
+    # Buyers queue for connections; don't time out while they wait their turn
+    database.pool_config['timeout'] = 60
+    raise SystemExit(0 if run(args.buyers, args.vehicles) else 1)
@@ -0,0 +1,64 @@
+from mysql.connector import errors, errorcode
+from db_utils import execute_query, execute_write, transaction
+
+# Lock conflicts worth retrying the whole purchase for
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+MAX_ATTEMPTS = 3
+
+
+class VehicleNotFoundError(Exception):
+    """No vehicle with the given VIN."""
+
+
+class VehicleUnavailableError(Exception):
+    """The vehicle has already been sold."""
+
+
+def _purchase_once(customer_id, vin, price):
+    with transaction():
+        # Reserve the VIN. The row lock makes concurrent buyers of the same
+        # vehicle queue here; once we commit they match 0 rows.
+        reserved, _ = execute_write(
+            "UPDATE Vehicle SET Is_Available = 0 WHERE VIN = %s AND Is_Available = 1",
+            (vin,)
+        )
+        if reserved != 1:
+            exists = execute_query("SELECT VIN FROM Vehicle WHERE VIN = %s", (vin,), fetch_one=True)
+            if not exists:
+                raise VehicleNotFoundError(vin)
+            raise VehicleUnavailableError(vin)
+
+        # Sales_Employee_ID is NULL initially, can be assigned later
+        _, sales_order_id = execute_write(
+            """
+            INSERT INTO SalesOrder (Customer_ID, Sales_Employee_ID, Vehicle_VIN, Sales_Date, Price)
+            VALUES (%s, NULL, %s, CURDATE(), %s)
+            """,
+            (customer_id, vin, price)
+        )
+        execute_write(
+            "INSERT INTO CustomerOwnVehicle (Customer_ID, Vehicle_VIN) VALUES (%s, %s)",
+            (customer_id, vin)
+        )
+    return sales_order_id
+
+
+def purchase_vehicle(customer_id, vin, price):
+    """Sell a vehicle to a customer: reserve the VIN, create the sales order
+    and record ownership in one transaction on one connection.
+
+    Returns the new sales order ID. Raises VehicleNotFoundError or
+    VehicleUnavailableError; no rows are written in either case.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return _purchase_once(customer_id, vin, price)
+        except errors.IntegrityError as e:
+            # CustomerOwnVehicle.Vehicle_VIN is unique: someone already owns it
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise VehicleUnavailableError(vin)
+            raise
+        except errors.DatabaseError as e:
+            if e.errno not in RETRYABLE_ERRORS or attempt == MAX_ATTEMPTS:
+                raise
+            print(f"Retrying purchase of {vin} after lock conflict (attempt {attempt}): {str(e)}")
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import time
+from flask import Response, current_app, request, session, stream_with_context
+from result_cache import cache
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# ETags also roll over this often (seconds), so data changed outside the
+# API (e.g. by the data pipeline) is picked up eventually
+ETAG_MAX_AGE = int(os.getenv('ETAG_MAX_AGE', '300'))
+
+# Rows per chunk written to the socket
+ROWS_PER_CHUNK = 500
+
+
+def wants_ndjson():
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def wants_columns():
+    return request.args.get('format') == 'columns'
+
+
+def columnar(rows):
+    """`[{"a": 1, "b": 2}, ...]` -> `{"columns": ["a", "b"], "rows": [[1, 2], ...]}`.
+    Rows must share one set of keys, as rows of one query do.
+    """
+    rows = rows or []
+    columns = list(rows[0].keys()) if rows else []
+    return {'columns': columns, 'rows': [list(row.values()) for row in rows]}
+
+
+def rows_payload(rows):
+    """A list of rows as sent by list/report endpoints: as-is, or in the
+    compact columnar form when the client asks with ?format=columns.
+    """
+    if wants_columns():
+        return columnar(rows)
+    return rows or []
+
+
+def stream_json_response(rows, key='data', ndjson=None):
+    """Stream an iterable of rows (e.g. from db_utils.stream_query) as
+    `{"<key>": [row, ...]}`, or as newline-delimited JSON when the client
+    asks for it with ?format=ndjson or Accept: application/x-ndjson, or as
+    `{"<key>": {"columns": [...], "rows": [[...], ...]}}` with ?format=columns.
+
+    The first row is read before the response starts, so a failing query
+    still raises inside the route and can be turned into a 500.
+    """
+    if ndjson is None:
+        ndjson = wants_ndjson()
+
+    rows = iter(rows)
+    first = next(rows, None)
+    dumps = current_app.json.dumps
+    columns = not ndjson and wants_columns()
+
+    if columns:
+        head = '{' + dumps(key) + ':{"columns":' + dumps(list(first.keys()) if first else []) + ',"rows":['
+        tail = ']}}'
+        encode = lambda row: dumps(list(row.values()))
+    else:
+        head = '{' + dumps(key) + ':['
+        tail = ']}'
+        encode = dumps
+
+    def generate_ndjson():
+        if first is None:
+            return
+        buffer = [dumps(first)]
+        for row in rows:
+            buffer.append(dumps(row))
+            if len(buffer) >= ROWS_PER_CHUNK:
+                yield '\n'.join(buffer) + '\n'
+                buffer = []
+        if buffer:
+            yield '\n'.join(buffer) + '\n'
+
+    def generate_array():
+        yield head
+        if first is not None:
+            buffer = [encode(first)]
+            for row in rows:
+                # Flush before adding, so the final chunk is never empty
+                if len(buffer) >= ROWS_PER_CHUNK:
+                    yield ','.join(buffer) + ','
+                    buffer = []
+                buffer.append(encode(row))
+            yield ','.join(buffer)
+        yield tail
+
+    if ndjson:
+        return Response(stream_with_context(generate_ndjson()), mimetype=NDJSON_MIMETYPE)
+    return Response(stream_with_context(generate_array()), mimetype='application/json')
+
+
+def table_etag(tables):
+    """ETag for the current GET, derived from the version counters of the
+    tables its response is built from (see result_cache), the URL and the
+    logged-in user. Computing it runs no query.
+    """
+    user = session.get('user') or {}
+    parts = [
+        cache.epoch,
+        str(int(time.time() // ETAG_MAX_AGE)),
+        request.full_path,
+        f"{user.get('user_type')}:{user.get('id')}",
+        ','.join(f"{table}={version}" for table, version in zip(tables, cache.versions(tables))),
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:24]
+
+
+def conditional(tables):
+    """Return (etag, response). `response` is a ready 304 when the client's
+    If-None-Match already names the current ETag, so the route can return
+    it without querying; otherwise None, and the route should build its
+    response and pass it through with_etag().
+    """
+    etag = table_etag(tables)
+    if request.if_none_match.contains_weak(etag):
+        return etag, with_etag(Response(status=304), etag)
+    return etag, None
+
+
+def with_etag(response, etag):
+    # Weak: the same data may be sent with a different encoding
+    response.set_etag(etag, weak=True)
+    # Let clients keep the body but check back with us before reusing it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
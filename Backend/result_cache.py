@@ -0,0 +1,220 @@
+"""Cache for heavy report results, invalidated by writes to the tables
+they read.
+
+Each table has a version counter. An entry is stored together with the
+versions of the tables it depends on, taken before its query ran, and is
+only served while all of them are unchanged. db_utils calls invalidate()
+with the tables each write changed, which bumps those counters, so exactly
+the entries that read one of them go stale; everything else stays cached.
+The same counters back the ETags set by responses.conditional().
+
+Entries live in an in-process LRU with a TTL (LocalBackend). Set
+RESULT_CACHE_URL=redis://... to share entries and table versions between
+API processes instead (needs the `redis` package).
+"""
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+DEFAULT_TTL = float(os.getenv('RESULT_CACHE_TTL', '300'))
+MAX_ENTRIES = int(os.getenv('RESULT_CACHE_SIZE', '256'))
+# Streamed results longer than this are passed through without caching
+MAX_ROWS = int(os.getenv('RESULT_CACHE_MAX_ROWS', '50000'))
+
+
+class LocalBackend:
+    """In-process LRU with per-entry expiry. Table versions are kept apart
+    from the entries so eviction can never reset one.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Versions restart at 0 with the process; the epoch tells them apart
+        self.epoch = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Same interface as LocalBackend, shared by every process pointing at
+    the same Redis. Expiry is left to Redis; eviction to its maxmemory policy.
+    """
+
+    def __init__(self, url, prefix='autobase:cache:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.client.set(self.prefix + 'epoch', uuid.uuid4().hex, nx=True)
+        self.epoch = self.client.get(self.prefix + 'epoch').decode()
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + 'entry:' + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + 'entry:' + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    def versions(self, tables):
+        if not tables:
+            return ()
+        raw = self.client.mget([self.prefix + 'version:' + table for table in tables])
+        return tuple(int(value) if value is not None else 0 for value in raw)
+
+    def bump(self, tables):
+        pipe = self.client.pipeline()
+        for table in tables:
+            pipe.incr(self.prefix + 'version:' + table)
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + 'entry:*'):
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(self.prefix + 'entry:*'))
+
+
+def _cacheable(value):
+    """execute_query returns [] when a query fails, and fetch_page wraps
+    that in ([], None); don't pin either."""
+    if isinstance(value, tuple):
+        return bool(value) and bool(value[0])
+    return bool(value)
+
+
+class ResultCache:
+    def __init__(self, backend, ttl=DEFAULT_TTL, max_rows=MAX_ROWS):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(endpoint, args=None):
+        if not args:
+            return endpoint
+        items = args.items(multi=True) if hasattr(args, 'getlist') else args.items()
+        return endpoint + '?' + urlencode(sorted(items))
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _lookup(self, key, versions):
+        entry = self.backend.get(key)
+        hit = entry is not None and entry[0] == versions
+        self._count(hit)
+        return entry[1] if hit else None
+
+    def get_or_compute(self, endpoint, tables, compute, args=None, ttl=None):
+        """Return the cached result for endpoint + args, or call compute()
+        and cache what it returns. `tables` are the tables compute() reads.
+        """
+        tables = tuple(tables)
+        key = self.key(endpoint, args)
+        # Versions are read before the query runs, so a write that lands
+        # while it runs leaves the new entry already stale
+        versions = self.backend.versions(tables)
+        value = self._lookup(key, versions)
+        if value is None:
+            value = compute()
+            if _cacheable(value):
+                self.backend.set(key, (versions, value), ttl or self.ttl)
+        return value
+
+    def stream(self, endpoint, tables, produce, args=None, ttl=None):
+        """Like get_or_compute() for a row iterator (e.g. from
+        db_utils.stream_query): a hit replays the cached rows, a miss
+        streams produce() through and caches the rows once it is exhausted,
+        unless there were more than max_rows of them.
+        """
+        tables = tuple(tables)
+        key = self.key(endpoint, args)
+        versions = self.backend.versions(tables)
+        rows = self._lookup(key, versions)
+        if rows is not None:
+            return iter(rows)
+        return self._tee(key, versions, produce(), ttl or self.ttl)
+
+    def _tee(self, key, versions, rows, ttl):
+        kept = []
+        for row in rows:
+            if kept is not None:
+                kept.append(row)
+                if len(kept) > self.max_rows:
+                    kept = None
+            yield row
+        if kept is not None:
+            self.backend.set(key, (versions, kept), ttl)
+
+    def versions(self, tables):
+        """Current version counters of `tables`, in the same order."""
+        return self.backend.versions(tuple(tables))
+
+    @property
+    def epoch(self):
+        return self.backend.epoch
+
+    def invalidate(self, *tables):
+        """Mark every entry that depends on any of `tables` stale."""
+        if tables:
+            self.backend.bump(tables)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self.backend), 'hits': self._hits, 'misses': self._misses}
+
+
+def _make_backend():
+    url = os.getenv('RESULT_CACHE_URL')
+    if url:
+        return RedisBackend(url)
+    return LocalBackend()
+
+
+cache = ResultCache(_make_backend())
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from database import get_db_connection
+
+# Bumped by the migration runner; a change here means the snapshot is stale
+SCHEMA_VERSION_QUERY = "SELECT MAX(version) AS version FROM schema_migrations"
+
+
+class SchemaCatalog:
+    """In-memory snapshot of the current database's schema.
+
+    The whole catalog (tables, columns, primary keys, foreign keys and
+    indexes) is read from INFORMATION_SCHEMA in four queries and then served
+    from memory. Every `check_interval` seconds the schema version is
+    compared against the snapshot and the catalog reloads if it changed.
+    """
+
+    def __init__(self, check_interval=60.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def _read_version(self, cursor):
+        try:
+            cursor.execute(SCHEMA_VERSION_QUERY)
+            row = cursor.fetchone()
+            return row['version'] if row else None
+        except Exception:
+            # No migrations table yet
+            return None
+
+    def _read_schema(self, cursor):
+        cursor.execute("SELECT DATABASE() AS db")
+        database = cursor.fetchone()['db']
+
+        tables = {}
+        cursor.execute("""
+            SELECT TABLE_NAME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME
+        """, (database,))
+        for row in cursor.fetchall():
+            tables[row['TABLE_NAME']] = {
+                'columns': [],
+                'primary_key': [],
+                'foreign_keys': [],
+                'indexes': {},
+            }
+
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """, (database,))
+        for row in cursor.fetchall():
+            table = tables.get(row.pop('TABLE_NAME'))
+            if table is not None:
+                table['columns'].append(row)
+
+        cursor.execute("""
+            SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME,
+                   REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+        """, (database,))
+        for row in cursor.fetchall():
+            table = tables.get(row['TABLE_NAME'])
+            if table is None:
+                continue
+            if row['CONSTRAINT_NAME'] == 'PRIMARY':
+                table['primary_key'].append(row['COLUMN_NAME'])
+            elif row['REFERENCED_TABLE_NAME'] is not None:
+                table['foreign_keys'].append({
+                    'COLUMN_NAME': row['COLUMN_NAME'],
+                    'REFERENCED_TABLE_NAME': row['REFERENCED_TABLE_NAME'],
+                    'REFERENCED_COLUMN_NAME': row['REFERENCED_COLUMN_NAME'],
+                })
+
+        cursor.execute("""
+            SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """, (database,))
+        for row in cursor.fetchall():
+            table = tables.get(row['TABLE_NAME'])
+            if table is None:
+                continue
+            index = table['indexes'].setdefault(row['INDEX_NAME'], {
+                'unique': not row['NON_UNIQUE'],
+                'columns': [],
+            })
+            index['columns'].append(row['COLUMN_NAME'])
+
+        return {'database': database, 'tables': tables}
+
+    def load(self):
+        """(Re)read the whole schema. Returns False if the database could
+        not be reached; the previous snapshot, if any, is kept.
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True, buffered=True)
+            try:
+                version = self._read_version(cursor)
+                snapshot = self._read_schema(cursor)
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            print(f"Error loading schema catalog: {str(e)}")
+            return False
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._version = version
+            self._generation += 1
+            self._checked_at = time.monotonic()
+        print(f"Loaded schema catalog: {len(snapshot['tables'])} tables (version {version})")
+        return True
+
+    def refresh(self):
+        return self.load()
+
+    def _check_version(self):
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            self._checked_at = time.monotonic()
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True, buffered=True)
+            try:
+                version = self._read_version(cursor)
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            print(f"Error checking schema version: {str(e)}")
+            return
+
+        if version != self._version:
+            self.load()
+
+    def snapshot(self):
+        if self._snapshot is None:
+            self.load()
+        elif self.check_interval is not None:
+            self._check_version()
+        return self._snapshot
+
+    def generation(self):
+        """Number of snapshots loaded so far, 0 while there is none. Caches
+        of values derived from the schema are keyed on it.
+        """
+        return self._generation if self.snapshot() else 0
+
+    def database(self):
+        snapshot = self.snapshot()
+        return snapshot['database'] if snapshot else None
+
+    def table(self, table_name):
+        snapshot = self.snapshot()
+        if not snapshot:
+            return None
+        return snapshot['tables'].get(table_name)
+
+    def tables(self):
+        snapshot = self.snapshot()
+        return list(snapshot['tables']) if snapshot else []
+
+
+catalog = SchemaCatalog(check_interval=float(os.getenv('DB_CATALOG_CHECK_INTERVAL', '60')))
@@ -0,0 +1,74 @@
+"""Service revenue, labor and parts totals without join fan-out.
+
+Joining ServiceOrder straight through ServiceLine and ServiceLineUsePart
+repeats each order once per line/part row, so SUM(so.Price) over that join
+over-counts revenue and the intermediate result grows with line history.
+Here labor and parts are first reduced to one row per service order in
+separate passes, then joined back to ServiceOrder 1:1 and grouped by the
+requested dimension. Every pass reads each row once.
+"""
+from db_utils import execute_query
+
+# One row per service order: total labor hours on its lines
+LABOR_PER_ORDER = """
+    SELECT Service_Order_ID, SUM(Labor_Hours) AS labor_hours
+    FROM ServiceLine
+    WHERE Service_Order_ID IS NOT NULL
+    GROUP BY Service_Order_ID
+"""
+
+# One row per service order: cost of the parts used on its lines
+PARTS_PER_ORDER = """
+    SELECT sl.Service_Order_ID, SUM(p.Price * slup.Quantity) AS parts_cost
+    FROM ServiceLineUsePart slup
+    JOIN ServiceLine sl ON sl.ID = slup.Service_Line_ID
+    JOIN Part p ON p.ID = slup.Part_ID
+    WHERE sl.Service_Order_ID IS NOT NULL
+    GROUP BY sl.Service_Order_ID
+"""
+
+# by -> (select columns, extra joins, group by, order by)
+DIMENSIONS = {
+    'date': (
+        "so.Date_From as date",
+        "",
+        "so.Date_From",
+        "so.Date_From DESC",
+    ),
+    'employee': (
+        "e.ID as employee_id, e.Name as employee_name",
+        "JOIN Employee e ON so.Service_Advisor_ID = e.ID",
+        "e.ID, e.Name",
+        "service_revenue DESC",
+    ),
+}
+
+
+def build_summary_query(by):
+    select, joins, group_by, order_by = DIMENSIONS[by]
+    return f"""
+        SELECT
+            {select},
+            SUM(so.Price) as service_revenue,
+            COALESCE(SUM(labor.labor_hours), 0) as labor_hours,
+            COALESCE(SUM(parts.parts_cost), 0) as parts_cost
+        FROM ServiceOrder so
+        {joins}
+        LEFT JOIN ({LABOR_PER_ORDER}) AS labor ON labor.Service_Order_ID = so.ID
+        LEFT JOIN ({PARTS_PER_ORDER}) AS parts ON parts.Service_Order_ID = so.ID
+        GROUP BY {group_by}
+        ORDER BY {order_by}
+    """
+
+
+# Built once so the SQL text is stable for the statement cache and metrics
+SUMMARY_QUERIES = {by: build_summary_query(by) for by in DIMENSIONS}
+
+
+def service_summary(by='date'):
+    """Return service revenue, labor hours and parts cost grouped by
+    `by` ('date' or 'employee'). Raises ValueError for any other value.
+    """
+    if by not in SUMMARY_QUERIES:
+        raise ValueError(f"Unknown service summary dimension: {by}")
+    return execute_query(SUMMARY_QUERIES[by]) or []
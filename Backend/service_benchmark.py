@@ -0,0 +1,163 @@
+"""Benchmark for service_analytics.service_summary().
+
+Adds throwaway service orders with many lines (1M lines by default), then
+times the per-order pre-aggregated summary against the old single join
+through ServiceLine and ServiceLineUsePart, and checks the summary's totals
+against totals computed table by table. The rows it creates are removed
+afterwards. Point it at a development database (same .env as the API):
+
+    python service_benchmark.py --orders 100000 --lines-per-order 10
+"""
+import argparse
+import time
+
+import database
+from app import app
+from db_utils import execute_query
+from service_analytics import SUMMARY_QUERIES
+
+BENCH_STATUS = 'BENCH'
+
+# The query service_summary used before: revenue repeats once per line/part row
+FAN_OUT_QUERY = """
+    SELECT
+        so.Date_From as date,
+        SUM(so.Price) as service_revenue,
+        COALESCE(SUM(sl.Labor_Hours), 0) as labor_hours,
+        COALESCE(SUM(p.Price * slup.Quantity), 0) as parts_cost
+    FROM ServiceOrder so
+    LEFT JOIN ServiceLine sl ON so.ID = sl.Service_Order_ID
+    LEFT JOIN ServiceLineUsePart slup ON sl.ID = slup.Service_Line_ID
+    LEFT JOIN Part p ON slup.Part_ID = p.ID
+    GROUP BY so.Date_From
+    ORDER BY so.Date_From DESC
+"""
+
+# Ground truth, one table at a time
+TOTALS_QUERIES = {
+    'service_revenue': "SELECT COALESCE(SUM(Price), 0) AS total FROM ServiceOrder",
+    'labor_hours': """
+        SELECT COALESCE(SUM(sl.Labor_Hours), 0) AS total
+        FROM ServiceLine sl
+        JOIN ServiceOrder so ON so.ID = sl.Service_Order_ID
+    """,
+    'parts_cost': """
+        SELECT COALESCE(SUM(p.Price * slup.Quantity), 0) AS total
+        FROM ServiceLineUsePart slup
+        JOIN ServiceLine sl ON sl.ID = slup.Service_Line_ID
+        JOIN ServiceOrder so ON so.ID = sl.Service_Order_ID
+        JOIN Part p ON p.ID = slup.Part_ID
+    """,
+}
+
+
+def create_service_history(orders, lines_per_order):
+    """Generate the rows server-side with a recursive CTE; sending a
+    million rows from Python would dominate the setup time.
+    """
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION cte_max_recursion_depth = %s", (max(orders, lines_per_order) + 1,))
+        cursor.execute("SELECT MIN(ID) FROM Employee")
+        advisor_id = cursor.fetchone()[0]
+        cursor.execute("SELECT MIN(ID) FROM Part")
+        part_id = cursor.fetchone()[0]
+        if part_id is None:
+            raise SystemExit("No parts in the database to use on service lines.")
+
+        cursor.execute("""
+            INSERT INTO ServiceOrder (Service_Advisor_ID, Date_From, Date_To, Service_Status, Price)
+            WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            SELECT %s, CURDATE() - INTERVAL MOD(n, 365) DAY, CURDATE(), %s, 250.00
+            FROM seq
+        """, (orders, advisor_id, BENCH_STATUS))
+        cursor.execute("""
+            INSERT INTO ServiceLine (Service_Order_ID, Service_Type, Labor_Hours, Labor_Rate)
+            WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            SELECT so.ID, 'Bench', 1.50, 100.00
+            FROM ServiceOrder so
+            JOIN seq
+            WHERE so.Service_Status = %s
+        """, (lines_per_order, BENCH_STATUS))
+        cursor.execute("""
+            INSERT INTO ServiceLineUsePart (Service_Line_ID, Part_ID, Quantity)
+            SELECT sl.ID, %s, 2
+            FROM ServiceLine sl
+            JOIN ServiceOrder so ON so.ID = sl.Service_Order_ID
+            WHERE so.Service_Status = %s
+        """, (part_id, BENCH_STATUS))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def remove_service_history():
+    # ServiceLine and ServiceLineUsePart rows cascade from ServiceOrder
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM ServiceOrder WHERE Service_Status = %s", (BENCH_STATUS,))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def timed(query, repeat):
+    best = None
+    rows = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = execute_query(query)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def column_total(rows, key):
+    return sum(row[key] or 0 for row in rows)
+
+
+def run(orders, lines_per_order, repeat, fan_out):
+    started = time.perf_counter()
+    create_service_history(orders, lines_per_order)
+    print(f"Created {orders} orders, {orders * lines_per_order} lines in {time.perf_counter() - started:.1f}s")
+
+    try:
+        with app.app_context():
+            expected = {key: execute_query(q, fetch_one=True)['total'] for key, q in TOTALS_QUERIES.items()}
+            line_count = execute_query("SELECT COUNT(*) AS n FROM ServiceLine", fetch_one=True)['n']
+
+            ok = True
+            for by, query in SUMMARY_QUERIES.items():
+                elapsed, rows = timed(query, repeat)
+                print(f"Summary by {by}: {elapsed:.3f}s for {len(rows)} groups "
+                      f"({line_count / elapsed:,.0f} service lines/s)")
+                if by == 'date':
+                    for key, total in expected.items():
+                        got = column_total(rows, key)
+                        match = got == total
+                        ok = ok and match
+                        print(f"  {key}: {got} (expected {total}) {'ok' if match else 'MISMATCH'}")
+
+            if fan_out:
+                elapsed, rows = timed(FAN_OUT_QUERY, repeat)
+                revenue = column_total(rows, 'service_revenue')
+                print(f"Old fan-out join: {elapsed:.3f}s, service_revenue {revenue} "
+                      f"({revenue / expected['service_revenue']:.1f}x the real total)")
+    finally:
+        remove_service_history()
+
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--lines-per-order', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per query; the best time is reported')
+    parser.add_argument('--skip-fan-out', action='store_true', help="don't time the old join")
+    args = parser.parse_args()
+
+    raise SystemExit(0 if run(args.orders, args.lines_per_order, args.repeat, not args.skip_fan_out) else 1)
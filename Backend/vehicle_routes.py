@@ -1,27 +1,43 @@
 from flask import Blueprint, jsonify, session, request
-from db_utils import execute_query
+from purchases import purchase_vehicle, VehicleNotFoundError, VehicleUnavailableError
+from pagination import fetch_page, PaginationError, as_int, as_decimal
+from responses import rows_payload
 
 vehicle_bp = Blueprint('vehicle', __name__)
 
 @vehicle_bp.route('/vehicles', methods=['GET'])
 def get_vehicles():
-    """Get all vehicles that haven't been sold yet"""
+    """Get vehicles that haven't been sold yet, one page at a time.
+    Query params: limit, cursor, make, model, year, min_price, max_price
+    """
     try:
-        query = """
+        vehicles, next_cursor = fetch_page(
+            """
             SELECT v.VIN, v.Make, v.Model, v.Color, v.Year, v.Mileage, v.Price
             FROM Vehicle v
-            WHERE v.VIN NOT IN (SELECT Vehicle_VIN FROM SalesOrder)
-            ORDER BY v.Make, v.Model, v.Year
-        """
-
-        vehicles = execute_query(query)
+            """,
+            sort_keys=[
+                ('v.Make', 'Make', False),
+                ('v.Model', 'Model', False),
+                ('v.Year', 'Year', False),
+                ('v.VIN', 'VIN', False),
+            ],
+            args=request.args,
+            filters={
+                'make': ("v.Make = %s", str),
+                'model': ("v.Model = %s", str),
+                'year': ("v.Year = %s", as_int),
+                'min_price': ("v.Price >= %s", as_decimal),
+                'max_price': ("v.Price <= %s", as_decimal),
+            },
+            where=["v.Is_Available = 1"],
+        )
         
-        if vehicles:
-            print(f"Fetched {len(vehicles)} available vehicles")
-            return jsonify({'vehicle': vehicles}), 200
-        else:
-            return jsonify({'vehicle': []}), 200
+        print(f"Fetched {len(vehicles)} available vehicles")
+        return jsonify({'vehicle': rows_payload(vehicles), 'next': next_cursor}), 200
             
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_vehicles: {str(e)}")
         return jsonify({'error': 'Failed to fetch vehicles'}), 500
@@ -43,40 +59,15 @@ def buy_vehicle(vin):
         return jsonify({'error': 'Price is required'}), 400
 
     try:
-        # Check if vehicle exists and is not already sold
-        check_query = """
-            SELECT VIN, Price 
-            FROM Vehicle 
-            WHERE VIN = %s AND VIN NOT IN (SELECT Vehicle_VIN FROM SalesOrder)
-        """
-        vehicle = execute_query(check_query, (vin,), fetch_one=True)
-        
-        if not vehicle:
-            return jsonify({'error': 'Vehicle not available for purchase'}), 404
-        
-        # Create sales order (Sales_Employee_ID is NULL initially, can be assigned later)
-        insert_query = """
-            INSERT INTO SalesOrder (Customer_ID, Sales_Employee_ID, Vehicle_VIN, Sales_Date, Price) 
-            VALUES (%s, NULL, %s, CURDATE(), %s)
-        """
-        result = execute_query(insert_query, (customer_id, vin, price))
-        
-        if result is False:
-            return jsonify({'error': 'Failed to create sales order'}), 500
-        
-        # Add vehicle to customer's owned vehicles
-        ownership_query = """
-            INSERT INTO CustomerOwnVehicle (Customer_ID, Vehicle_VIN) 
-            VALUES (%s, %s)
-        """
-        ownership_result = execute_query(ownership_query, (customer_id, vin))
-        
-        if ownership_result is False:
-            return jsonify({'error': 'Failed to assign vehicle ownership'}), 500
-        
+        sales_order_id = purchase_vehicle(customer_id, vin, price)
+
         print(f"Customer {customer_id} purchased vehicle {vin}")
-        return jsonify({'message': 'Vehicle purchased successfully!'}), 200
-        
+        return jsonify({'message': 'Vehicle purchased successfully!', 'sales_order_id': sales_order_id}), 200
+
+    except VehicleNotFoundError:
+        return jsonify({'error': 'Vehicle not found'}), 404
+    except VehicleUnavailableError:
+        return jsonify({'error': 'Vehicle not available for purchase'}), 409
     except Exception as e:
         print(f"Error buying vehicle: {str(e)}")
         return jsonify({'error': 'Failed to complete purchase'}), 500
\ No newline at end of file
@@ -0,0 +1,25 @@
+-- Bring the tables created by autobasedb.sql in line with the columns in
+-- Database/AutoBase/*.csv and the columns the backend routes query.
+-- Safe to run against a database that was already patched by hand: the
+-- migration runner skips statements whose change is already in place.
+
+-- Employee: managers are referenced by ID, not SSN
+ALTER TABLE Employee RENAME COLUMN Mgr_SSN TO Mgr_ID;
+ALTER TABLE Employee MODIFY COLUMN Mgr_ID INT NULL;
+
+-- SalesOrder: who bought what, and who sold it (NULL until assigned)
+ALTER TABLE SalesOrder ADD COLUMN Customer_ID INT NULL AFTER ID;
+ALTER TABLE SalesOrder ADD COLUMN Sales_Employee_ID INT NULL AFTER Customer_ID;
+ALTER TABLE SalesOrder ADD COLUMN Vehicle_VIN VARCHAR(17) NULL AFTER Sales_Employee_ID;
+
+-- ServiceOrder: customer, advisor and vehicle, plus the status column name the routes use
+ALTER TABLE ServiceOrder RENAME COLUMN ServiceStatus TO Service_Status;
+ALTER TABLE ServiceOrder ADD COLUMN Customer_ID INT NULL AFTER ID;
+ALTER TABLE ServiceOrder ADD COLUMN Service_Advisor_ID INT NULL AFTER Customer_ID;
+ALTER TABLE ServiceOrder ADD COLUMN Vehicle_VIN VARCHAR(17) NULL AFTER Service_Advisor_ID;
+
+-- ServiceLine: owning service order
+ALTER TABLE ServiceLine ADD COLUMN Service_Order_ID INT NULL AFTER ID;
+
+-- ServiceLineUsePart: how many of each part a line used
+ALTER TABLE ServiceLineUsePart ADD COLUMN Quantity INT NOT NULL DEFAULT 1;
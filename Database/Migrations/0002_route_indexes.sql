@@ -0,0 +1,40 @@
+-- Secondary indexes for the queries in Backend/*_routes.py.
+-- InnoDB appends the primary key to every secondary index, so an index on
+-- (a, b) already serves ORDER BY a, b, <pk> without a filesort.
+
+-- customer/my_sales_orders, employee/sales/customer: WHERE Customer_ID ORDER BY Sales_Date DESC, ID DESC
+CREATE INDEX idx_salesorder_customer ON SalesOrder (Customer_ID, Sales_Date, ID);
+-- employee/my_sales_orders, reports/employee-performance, sales/aggregate?by=employee
+CREATE INDEX idx_salesorder_employee ON SalesOrder (Sales_Employee_ID, Sales_Date, ID);
+-- employee/sales/vehicle, vehicle availability checks
+CREATE INDEX idx_salesorder_vin ON SalesOrder (Vehicle_VIN);
+-- sales/aggregate?by=date: covering, no table lookups
+CREATE INDEX idx_salesorder_date ON SalesOrder (Sales_Date, Price);
+
+-- customer/my_service_records, employee/service/customer, reports/customer-vehicles
+CREATE INDEX idx_serviceorder_customer ON ServiceOrder (Customer_ID, Date_From, ID);
+-- employee/service/vehicle, customer/vehicles_due_service
+CREATE INDEX idx_serviceorder_vin ON ServiceOrder (Vehicle_VIN, Date_From, ID);
+-- service/summary?by=employee
+CREATE INDEX idx_serviceorder_advisor ON ServiceOrder (Service_Advisor_ID, Price);
+-- reports/waiting-vehicles
+CREATE INDEX idx_serviceorder_status ON ServiceOrder (Service_Status, Customer_ID);
+-- service/summary?by=date
+CREATE INDEX idx_serviceorder_date ON ServiceOrder (Date_From, Price);
+
+-- Joins from ServiceOrder to its lines
+CREATE INDEX idx_serviceline_order ON ServiceLine (Service_Order_ID, Labor_Hours);
+
+-- Joins from ServiceLine to parts, and parts/usage totals per part
+CREATE INDEX idx_slup_line ON ServiceLineUsePart (Service_Line_ID, Part_ID, Quantity);
+CREATE INDEX idx_slup_part ON ServiceLineUsePart (Part_ID, Quantity);
+
+-- customer/vehicles, customer/vehicle/<vin>
+CREATE INDEX idx_cov_customer ON CustomerOwnVehicle (Customer_ID, Vehicle_VIN);
+
+-- vehicle/vehicles: ORDER BY Make, Model, Year, VIN (keyset pagination)
+CREATE INDEX idx_vehicle_listing ON Vehicle (Make, Model, Year);
+
+-- manager/parts/usage: ORDER BY Name, ID; employee/parts/report_shortage: WHERE Stock <= ?
+CREATE INDEX idx_part_name ON Part (Name);
+CREATE INDEX idx_part_stock ON Part (Stock);
@@ -0,0 +1,33 @@
+-- Foreign keys for the columns added in 0001. Created after 0002 so each
+-- constraint reuses the composite index instead of adding its own.
+
+ALTER TABLE SalesOrder
+    ADD CONSTRAINT fk_salesorder_customer FOREIGN KEY (Customer_ID) REFERENCES Customer(ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE;
+ALTER TABLE SalesOrder
+    ADD CONSTRAINT fk_salesorder_employee FOREIGN KEY (Sales_Employee_ID) REFERENCES Employee(ID)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE;
+ALTER TABLE SalesOrder
+    ADD CONSTRAINT fk_salesorder_vehicle FOREIGN KEY (Vehicle_VIN) REFERENCES Vehicle(VIN)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE;
+
+ALTER TABLE ServiceOrder
+    ADD CONSTRAINT fk_serviceorder_customer FOREIGN KEY (Customer_ID) REFERENCES Customer(ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE;
+ALTER TABLE ServiceOrder
+    ADD CONSTRAINT fk_serviceorder_advisor FOREIGN KEY (Service_Advisor_ID) REFERENCES Employee(ID)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE;
+ALTER TABLE ServiceOrder
+    ADD CONSTRAINT fk_serviceorder_vehicle FOREIGN KEY (Vehicle_VIN) REFERENCES Vehicle(VIN)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE;
+
+ALTER TABLE ServiceLine
+    ADD CONSTRAINT fk_serviceline_order FOREIGN KEY (Service_Order_ID) REFERENCES ServiceOrder(ID)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE;
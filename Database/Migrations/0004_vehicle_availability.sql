@@ -0,0 +1,40 @@
+-- Keep each vehicle's availability on the Vehicle row itself so the public
+-- listing and the purchase check are index lookups instead of
+-- VIN NOT IN (SELECT Vehicle_VIN FROM SalesOrder) over all sales history.
+
+ALTER TABLE Vehicle ADD COLUMN Is_Available TINYINT(1) NOT NULL DEFAULT 1;
+
+-- vehicle/vehicles: WHERE Is_Available = 1 ORDER BY Make, Model, Year, VIN
+CREATE INDEX idx_vehicle_available ON Vehicle (Is_Available, Make, Model, Year);
+DROP INDEX idx_vehicle_listing ON Vehicle;
+
+-- Backfill from existing sales (also the statement to rebuild the column by hand)
+UPDATE Vehicle v
+SET v.Is_Available = NOT EXISTS (SELECT 1 FROM SalesOrder so WHERE so.Vehicle_VIN = v.VIN);
+
+-- Kept in sync by the database for every writer: the API, the data
+-- pipeline and manual fixes alike
+
+-- Sales order created: the vehicle is sold
+CREATE TRIGGER trg_salesorder_insert_availability
+AFTER INSERT ON SalesOrder
+FOR EACH ROW
+    UPDATE Vehicle SET Is_Available = 0 WHERE VIN = NEW.Vehicle_VIN;
+
+-- Sales order cancelled: the vehicle is back on sale unless another order still holds it
+CREATE TRIGGER trg_salesorder_delete_availability
+AFTER DELETE ON SalesOrder
+FOR EACH ROW
+    UPDATE Vehicle
+    SET Is_Available = 1
+    WHERE VIN = OLD.Vehicle_VIN
+      AND NOT EXISTS (SELECT 1 FROM SalesOrder WHERE Vehicle_VIN = OLD.Vehicle_VIN);
+
+-- Sales order moved to another vehicle: recompute both (no-op for any other update)
+CREATE TRIGGER trg_salesorder_update_availability
+AFTER UPDATE ON SalesOrder
+FOR EACH ROW
+    UPDATE Vehicle
+    SET Is_Available = NOT EXISTS (SELECT 1 FROM SalesOrder so WHERE so.Vehicle_VIN = Vehicle.VIN)
+    WHERE NOT (OLD.Vehicle_VIN <=> NEW.Vehicle_VIN)
+      AND VIN IN (OLD.Vehicle_VIN, NEW.Vehicle_VIN);
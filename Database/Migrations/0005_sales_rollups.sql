@@ -0,0 +1,164 @@
+-- Pre-aggregated sales totals for the manager dashboard, so
+-- manager/sales/aggregate reads one row per day or per employee instead of
+-- grouping the whole SalesOrder table on every load.
+
+CREATE TABLE IF NOT EXISTS SalesDailyRollup (
+    Sales_Date DATE PRIMARY KEY,
+    Total_Sales DECIMAL(14,2) NOT NULL DEFAULT 0,
+    Order_Count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS SalesEmployeeRollup (
+    Employee_ID INT PRIMARY KEY,
+    Total_Sales DECIMAL(14,2) NOT NULL DEFAULT 0,
+    Order_Count INT NOT NULL DEFAULT 0
+);
+
+-- Kept in sync by the database for every writer, like Vehicle.Is_Available
+-- (0004). Rows whose count drops to 0 are left in place and filtered on read.
+
+-- Sales order created
+CREATE TRIGGER trg_salesorder_insert_daily_rollup
+AFTER INSERT ON SalesOrder
+FOR EACH ROW
+    INSERT INTO SalesDailyRollup (Sales_Date, Total_Sales, Order_Count)
+    VALUES (NEW.Sales_Date, NEW.Price, 1)
+    ON DUPLICATE KEY UPDATE
+        Total_Sales = SalesDailyRollup.Total_Sales + VALUES(Total_Sales),
+        Order_Count = SalesDailyRollup.Order_Count + VALUES(Order_Count);
+
+CREATE TRIGGER trg_salesorder_insert_employee_rollup
+AFTER INSERT ON SalesOrder
+FOR EACH ROW
+    INSERT INTO SalesEmployeeRollup (Employee_ID, Total_Sales, Order_Count)
+    SELECT NEW.Sales_Employee_ID, NEW.Price, 1
+    FROM DUAL
+    WHERE NEW.Sales_Employee_ID IS NOT NULL
+    ON DUPLICATE KEY UPDATE
+        Total_Sales = SalesEmployeeRollup.Total_Sales + VALUES(Total_Sales),
+        Order_Count = SalesEmployeeRollup.Order_Count + VALUES(Order_Count);
+
+-- Sales order deleted
+CREATE TRIGGER trg_salesorder_delete_daily_rollup
+AFTER DELETE ON SalesOrder
+FOR EACH ROW
+    UPDATE SalesDailyRollup
+    SET Total_Sales = Total_Sales - OLD.Price,
+        Order_Count = Order_Count - 1
+    WHERE Sales_Date = OLD.Sales_Date;
+
+CREATE TRIGGER trg_salesorder_delete_employee_rollup
+AFTER DELETE ON SalesOrder
+FOR EACH ROW
+    UPDATE SalesEmployeeRollup
+    SET Total_Sales = Total_Sales - OLD.Price,
+        Order_Count = Order_Count - 1
+    WHERE Employee_ID = OLD.Sales_Employee_ID;
+
+-- Sales order repriced, redated or reassigned (e.g. employee/sales_orders/assign):
+-- take the old values out and put the new ones in; no-op for any other update
+CREATE TRIGGER trg_salesorder_update_daily_rollup
+AFTER UPDATE ON SalesOrder
+FOR EACH ROW
+    INSERT INTO SalesDailyRollup (Sales_Date, Total_Sales, Order_Count)
+    SELECT delta.Sales_Date, delta.Total_Sales, delta.Order_Count
+    FROM (
+        SELECT OLD.Sales_Date AS Sales_Date, -OLD.Price AS Total_Sales, -1 AS Order_Count
+        UNION ALL
+        SELECT NEW.Sales_Date, NEW.Price, 1
+    ) AS delta
+    WHERE NOT (OLD.Sales_Date <=> NEW.Sales_Date AND OLD.Price <=> NEW.Price)
+    ON DUPLICATE KEY UPDATE
+        Total_Sales = SalesDailyRollup.Total_Sales + VALUES(Total_Sales),
+        Order_Count = SalesDailyRollup.Order_Count + VALUES(Order_Count);
+
+CREATE TRIGGER trg_salesorder_update_employee_rollup
+AFTER UPDATE ON SalesOrder
+FOR EACH ROW
+    INSERT INTO SalesEmployeeRollup (Employee_ID, Total_Sales, Order_Count)
+    SELECT delta.Employee_ID, delta.Total_Sales, delta.Order_Count
+    FROM (
+        SELECT OLD.Sales_Employee_ID AS Employee_ID, -OLD.Price AS Total_Sales, -1 AS Order_Count
+        UNION ALL
+        SELECT NEW.Sales_Employee_ID, NEW.Price, 1
+    ) AS delta
+    WHERE delta.Employee_ID IS NOT NULL
+      AND NOT (OLD.Sales_Employee_ID <=> NEW.Sales_Employee_ID AND OLD.Price <=> NEW.Price)
+    ON DUPLICATE KEY UPDATE
+        Total_Sales = SalesEmployeeRollup.Total_Sales + VALUES(Total_Sales),
+        Order_Count = SalesEmployeeRollup.Order_Count + VALUES(Order_Count);
+
+-- Foreign key actions (0003) don't fire triggers, so sales orders removed
+-- by deleting their vehicle or customer, or unassigned by deleting their
+-- employee, are taken out of the rollups from the parent row's side
+
+CREATE TRIGGER trg_vehicle_delete_daily_rollup
+BEFORE DELETE ON Vehicle
+FOR EACH ROW
+    UPDATE SalesDailyRollup r
+    JOIN (
+        SELECT Sales_Date, SUM(Price) AS Total_Sales, COUNT(*) AS Order_Count
+        FROM SalesOrder
+        WHERE Vehicle_VIN = OLD.VIN
+        GROUP BY Sales_Date
+    ) AS gone ON gone.Sales_Date = r.Sales_Date
+    SET r.Total_Sales = r.Total_Sales - gone.Total_Sales,
+        r.Order_Count = r.Order_Count - gone.Order_Count;
+
+CREATE TRIGGER trg_vehicle_delete_employee_rollup
+BEFORE DELETE ON Vehicle
+FOR EACH ROW
+    UPDATE SalesEmployeeRollup r
+    JOIN (
+        SELECT Sales_Employee_ID, SUM(Price) AS Total_Sales, COUNT(*) AS Order_Count
+        FROM SalesOrder
+        WHERE Vehicle_VIN = OLD.VIN AND Sales_Employee_ID IS NOT NULL
+        GROUP BY Sales_Employee_ID
+    ) AS gone ON gone.Sales_Employee_ID = r.Employee_ID
+    SET r.Total_Sales = r.Total_Sales - gone.Total_Sales,
+        r.Order_Count = r.Order_Count - gone.Order_Count;
+
+CREATE TRIGGER trg_customer_delete_daily_rollup
+BEFORE DELETE ON Customer
+FOR EACH ROW
+    UPDATE SalesDailyRollup r
+    JOIN (
+        SELECT Sales_Date, SUM(Price) AS Total_Sales, COUNT(*) AS Order_Count
+        FROM SalesOrder
+        WHERE Customer_ID = OLD.ID
+        GROUP BY Sales_Date
+    ) AS gone ON gone.Sales_Date = r.Sales_Date
+    SET r.Total_Sales = r.Total_Sales - gone.Total_Sales,
+        r.Order_Count = r.Order_Count - gone.Order_Count;
+
+CREATE TRIGGER trg_customer_delete_employee_rollup
+BEFORE DELETE ON Customer
+FOR EACH ROW
+    UPDATE SalesEmployeeRollup r
+    JOIN (
+        SELECT Sales_Employee_ID, SUM(Price) AS Total_Sales, COUNT(*) AS Order_Count
+        FROM SalesOrder
+        WHERE Customer_ID = OLD.ID AND Sales_Employee_ID IS NOT NULL
+        GROUP BY Sales_Employee_ID
+    ) AS gone ON gone.Sales_Employee_ID = r.Employee_ID
+    SET r.Total_Sales = r.Total_Sales - gone.Total_Sales,
+        r.Order_Count = r.Order_Count - gone.Order_Count;
+
+CREATE TRIGGER trg_employee_delete_employee_rollup
+BEFORE DELETE ON Employee
+FOR EACH ROW
+    DELETE FROM SalesEmployeeRollup WHERE Employee_ID = OLD.ID;
+
+-- Backfill from existing sales (same statements as rebuild_sales_rollups.sql)
+DELETE FROM SalesDailyRollup;
+INSERT INTO SalesDailyRollup (Sales_Date, Total_Sales, Order_Count)
+SELECT Sales_Date, SUM(Price), COUNT(*)
+FROM SalesOrder
+GROUP BY Sales_Date;
+
+DELETE FROM SalesEmployeeRollup;
+INSERT INTO SalesEmployeeRollup (Employee_ID, Total_Sales, Order_Count)
+SELECT Sales_Employee_ID, SUM(Price), COUNT(*)
+FROM SalesOrder
+WHERE Sales_Employee_ID IS NOT NULL
+GROUP BY Sales_Employee_ID;
@@ -0,0 +1,29 @@
+-- Precomputed sales counts per employee, day and customer city for
+-- manager/reports/employee-performance. Any date range and city is a range
+-- scan over this table instead of a correlated subquery per employee with
+-- LIKE '%city%' over Customer.Address.
+--
+-- Refreshed in the background by the API (Backend/precompute.py), so it can
+-- lag new sales by up to DB_PRECOMPUTE_INTERVAL seconds.
+
+CREATE TABLE IF NOT EXISTS EmployeePerformance (
+    Sales_Date DATE NOT NULL,
+    Employee_ID INT NOT NULL,
+    -- Second comma-separated part of Customer.Address ("street, city, state, ...")
+    City VARCHAR(100) NOT NULL,
+    Order_Count INT NOT NULL,
+    PRIMARY KEY (Sales_Date, Employee_ID, City)
+);
+
+-- Initial fill (the refresh job runs the same statements)
+DELETE FROM EmployeePerformance;
+INSERT INTO EmployeePerformance (Sales_Date, Employee_ID, City, Order_Count)
+SELECT
+    so.Sales_Date,
+    so.Sales_Employee_ID,
+    COALESCE(TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(c.Address, ',', 2), ',', -1)), '') AS City,
+    COUNT(*)
+FROM SalesOrder so
+LEFT JOIN Customer c ON c.ID = so.Customer_ID
+WHERE so.Sales_Employee_ID IS NOT NULL
+GROUP BY so.Sales_Date, so.Sales_Employee_ID, City;
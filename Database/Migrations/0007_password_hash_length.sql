@@ -0,0 +1,6 @@
+-- Room for salted KDF hashes written by Backend/credentials.py, e.g.
+-- "scrypt$16384,8,1$<salt>$<hash>" (about 90 characters). Existing
+-- plaintext values are replaced with hashes as users log in.
+
+ALTER TABLE EmployeeAuth MODIFY COLUMN Password_Hash VARCHAR(255) NOT NULL;
+ALTER TABLE CustomerAuth MODIFY COLUMN Password_Hash VARCHAR(255) NOT NULL;
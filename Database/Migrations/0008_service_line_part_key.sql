@@ -0,0 +1,5 @@
+-- ServiceLineUsePart: one row per part on a service line. Gives the link
+-- table the key incremental loads upsert by (Run.py --incremental), and
+-- serves the part lookups by service line.
+
+ALTER TABLE ServiceLineUsePart ADD PRIMARY KEY (Service_Line_ID, Part_ID);
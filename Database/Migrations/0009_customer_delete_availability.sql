@@ -0,0 +1,22 @@
+-- Deleting a customer removes their sales orders through
+-- fk_salesorder_customer ON DELETE CASCADE, and foreign key actions don't
+-- fire triggers, so trg_salesorder_delete_availability (0004) never sees
+-- them. Put those vehicles back on sale before the cascade, the way the
+-- trg_customer_delete_* triggers of 0005 adjust the rollups.
+
+-- Unless an order of another customer still holds the vehicle
+CREATE TRIGGER trg_customer_delete_availability
+BEFORE DELETE ON Customer
+FOR EACH ROW
+    UPDATE Vehicle v
+    SET v.Is_Available = 1
+    WHERE v.VIN IN (SELECT Vehicle_VIN FROM SalesOrder WHERE Customer_ID = OLD.ID)
+      AND NOT EXISTS (
+          SELECT 1 FROM SalesOrder so
+          WHERE so.Vehicle_VIN = v.VIN AND NOT (so.Customer_ID <=> OLD.ID)
+      );
+
+-- Vehicles left unavailable by customers deleted before this trigger existed
+UPDATE Vehicle v
+SET v.Is_Available = NOT EXISTS (SELECT 1 FROM SalesOrder so WHERE so.Vehicle_VIN = v.VIN)
+WHERE v.Is_Available = 0;
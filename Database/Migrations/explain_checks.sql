@@ -0,0 +1,108 @@
+-- Hot route queries, with sample values, checked with EXPLAIN by
+-- Migrator.explain_checks(). None of these should show type = ALL
+-- (a full table scan) once the migrations are applied.
+
+-- customer/vehicles
+SELECT v.*
+FROM Vehicle v
+JOIN CustomerOwnVehicle cov ON cov.Vehicle_VIN = v.VIN
+WHERE cov.Customer_ID = 1
+ORDER BY v.Year DESC, v.Make, v.Model;
+
+-- customer/my_sales_orders
+SELECT so.ID, so.Sales_Date, so.Price, so.Vehicle_VIN, e.Name, v.Make, v.Model, v.Year, v.Color
+FROM SalesOrder so
+LEFT JOIN Employee e ON so.Sales_Employee_ID = e.ID
+LEFT JOIN Vehicle v ON so.Vehicle_VIN = v.VIN
+WHERE so.Customer_ID = 1
+ORDER BY so.Sales_Date DESC, so.ID DESC;
+
+-- customer/my_service_records
+SELECT so.ID, so.Date_From, so.Date_To, so.Service_Status, so.Price, so.Vehicle_VIN, v.Make, v.Model, v.Year, e.Name
+FROM ServiceOrder so
+JOIN Vehicle v ON so.Vehicle_VIN = v.VIN
+LEFT JOIN Employee e ON so.Service_Advisor_ID = e.ID
+WHERE so.Customer_ID = 1
+ORDER BY so.Date_From DESC, so.ID DESC;
+
+-- customer/vehicles_due_service
+SELECT v.VIN, v.Make, v.Model, v.Year, MAX(so.Date_From)
+FROM Vehicle v
+JOIN CustomerOwnVehicle cov ON cov.Vehicle_VIN = v.VIN
+LEFT JOIN ServiceOrder so ON so.Vehicle_VIN = v.VIN AND so.Customer_ID = 1
+WHERE cov.Customer_ID = 1
+GROUP BY v.VIN, v.Make, v.Model, v.Year;
+
+-- employee/my_sales_orders
+SELECT so.ID, so.Sales_Date, so.Price, so.Vehicle_VIN, c.Name, v.Make, v.Model, v.Year
+FROM SalesOrder so
+JOIN Customer c ON so.Customer_ID = c.ID
+LEFT JOIN Vehicle v ON so.Vehicle_VIN = v.VIN
+WHERE so.Sales_Employee_ID = 1
+ORDER BY so.Sales_Date DESC, so.ID DESC;
+
+-- employee/sales_orders (first page)
+SELECT so.ID, so.Sales_Date, so.Price, so.Vehicle_VIN, so.Sales_Employee_ID, c.Name, e.Name, v.Make, v.Model, v.Year
+FROM SalesOrder so
+JOIN Customer c ON so.Customer_ID = c.ID
+LEFT JOIN Employee e ON so.Sales_Employee_ID = e.ID
+LEFT JOIN Vehicle v ON so.Vehicle_VIN = v.VIN
+ORDER BY so.ID DESC
+LIMIT 101;
+
+-- employee/sales/vehicle
+SELECT so.ID, so.Sales_Date, so.Price, so.Vehicle_VIN, c.Name, e.Name
+FROM SalesOrder so
+LEFT JOIN Customer c ON so.Customer_ID = c.ID
+LEFT JOIN Employee e ON so.Sales_Employee_ID = e.ID
+WHERE so.Vehicle_VIN = '9df8f694-0675-446'
+ORDER BY so.Sales_Date DESC, so.ID DESC;
+
+-- employee/service/customer
+SELECT so.ID, so.Date_From, sl.Service_Type, p.Name, slup.Quantity
+FROM ServiceOrder so
+LEFT JOIN Customer c ON so.Customer_ID = c.ID
+LEFT JOIN Employee e ON so.Service_Advisor_ID = e.ID
+LEFT JOIN ServiceLine sl ON so.ID = sl.Service_Order_ID
+LEFT JOIN ServiceLineUsePart slup ON sl.ID = slup.Service_Line_ID
+LEFT JOIN Part p ON slup.Part_ID = p.ID
+WHERE so.Customer_ID = 1
+ORDER BY so.Date_From DESC, so.ID DESC;
+
+-- employee/service/vehicle
+SELECT so.ID, so.Date_From, sl.Service_Type, p.Name, slup.Quantity
+FROM ServiceOrder so
+LEFT JOIN Employee e ON so.Service_Advisor_ID = e.ID
+LEFT JOIN ServiceLine sl ON so.ID = sl.Service_Order_ID
+LEFT JOIN ServiceLineUsePart slup ON sl.ID = slup.Service_Line_ID
+LEFT JOIN Part p ON slup.Part_ID = p.ID
+WHERE so.Vehicle_VIN = '9df8f694-0675-446'
+ORDER BY so.Date_From DESC, so.ID DESC;
+
+-- employee/parts/report_shortage
+SELECT ID, Name, Price, Stock
+FROM Part
+WHERE Stock <= 5
+ORDER BY Stock ASC, ID ASC;
+
+-- vehicle/vehicles (first page)
+SELECT v.VIN, v.Make, v.Model, v.Color, v.Year, v.Mileage, v.Price
+FROM Vehicle v
+WHERE v.Is_Available = 1
+ORDER BY v.Make ASC, v.Model ASC, v.Year ASC, v.VIN ASC
+LIMIT 101;
+
+-- vehicle/vehicles/buy/<vin> availability check
+SELECT VIN, Price
+FROM Vehicle
+WHERE VIN = '9df8f694-0675-446' AND Is_Available = 1;
+
+-- auth/login
+SELECT * FROM EmployeeAuth WHERE Username = 'ntrivett14461';
+
+-- manager/reports/employee-performance
+SELECT e.ID, e.Name, SUM(ep.Order_Count), SUM(CASE WHEN ep.City = 'Seattle' THEN ep.Order_Count ELSE 0 END)
+FROM EmployeePerformance ep
+JOIN Employee e ON e.ID = ep.Employee_ID
+WHERE ep.Sales_Date BETWEEN '2024-01-01' AND '2024-12-31'
+GROUP BY e.ID, e.Name;
@@ -0,0 +1,17 @@
+-- Recompute SalesDailyRollup and SalesEmployeeRollup (0005) from SalesOrder.
+-- Run with `python Database/Pipeline/Migrate.py rebuild-rollups` after
+-- loading sales with triggers off or to repair drift. Runs as one
+-- transaction, so the dashboard never sees the tables half-built.
+
+DELETE FROM SalesDailyRollup;
+INSERT INTO SalesDailyRollup (Sales_Date, Total_Sales, Order_Count)
+SELECT Sales_Date, SUM(Price), COUNT(*)
+FROM SalesOrder
+GROUP BY Sales_Date;
+
+DELETE FROM SalesEmployeeRollup;
+INSERT INTO SalesEmployeeRollup (Employee_ID, Total_Sales, Order_Count)
+SELECT Sales_Employee_ID, SUM(Price), COUNT(*)
+FROM SalesOrder
+WHERE Sales_Employee_ID IS NOT NULL
+GROUP BY Sales_Employee_ID;
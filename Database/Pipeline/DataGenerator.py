@@ -1,17 +1,37 @@
 import csv
+import gzip
 import io
 import os
 import random
 import subprocess
 import hashlib
 
+# Rows per multi-row INSERT in the generated scripts
+DEFAULT_ROWS_PER_STATEMENT = 500
+
+
+def sql_literal(val):
+    """A CSV field as a SQL value: NULL for empty/NULL, otherwise a quoted string."""
+    val = val.strip()
+    if val == "" or val.upper() == "NULL":
+        return "NULL"
+    # Remove wrapping single quotes if present
+    if len(val) >= 2 and val.startswith("'") and val.endswith("'"):
+        val = val[1:-1]
+    escaped = val.replace("\\", "\\\\").replace("'", "''")
+    return f"'{escaped}'"
+
+
 class DataGenerator:
-    def __init__(self, db_config, schemas, csv_input_dir, generated_sql_data_dir, mockaroo_api_key=None):
+    def __init__(self, db_config, schemas, csv_input_dir, generated_sql_data_dir, mockaroo_api_key=None,
+                 rows_per_statement=DEFAULT_ROWS_PER_STATEMENT, gzip_output=False):
         self.db_name = db_config['database']
         self.schemas = schemas
         self.csv_input_dir = csv_input_dir
         self.generated_sql_data_dir = generated_sql_data_dir
         self.mockaroo_api_key = mockaroo_api_key
+        self.rows_per_statement = rows_per_statement
+        self.gzip_output = gzip_output
 
 
     def fetch_mockaroo_csv(self, schema_id, count):
@@ -25,35 +45,49 @@ class DataGenerator:
         return result.stdout.decode()
 
 
-    def csv_to_sql(self, csv_content, table_name):
-        sql_lines = [f"USE `{self.db_name}`;\n"]
-        f = io.StringIO(csv_content)
-        reader = csv.reader(f)
-        
-        headers = next(reader)
-        
+    def write_inserts(self, reader, table_name, out):
+        """Write the rows of a csv.reader to `out` as multi-row INSERTs of up
+        to rows_per_statement rows, one row at a time. Returns the row count.
+        """
+        out.write(f"USE `{self.db_name}`;\n\n")
+        headers = next(reader, None)
+        if headers is None:
+            return 0
+
+        prefix = f"INSERT INTO `{table_name}` ({', '.join(headers)}) VALUES\n"
+        rows = 0
+        in_statement = 0
         for row in reader:
-            fixed_values = []
-            for val in row:
-                val = val.strip()
-                if val == "" or val.upper() == "NULL":
-                    fixed_values.append("NULL")
-                else:
-                    # Remove semicolons
-                    val = val.replace(";", "")
-                    # Remove wrapping single quotes if present
-                    if val.startswith("'") and val.endswith("'"):
-                        val = val[1:-1]
-                    # Escape internal single quotes
-                    escaped = val.replace("'", "''")
-                    fixed_values.append(f"'{escaped}'")
-            
-            values = ", ".join(fixed_values)
-            sql_lines.append(f"INSERT INTO `{table_name}` ({', '.join(headers)}) VALUES ({values});")
+            values = "(" + ", ".join(sql_literal(val) for val in row) + ")"
+            out.write((prefix if in_statement == 0 else ",\n") + values)
+            in_statement += 1
+            rows += 1
+            if in_statement >= self.rows_per_statement:
+                out.write(";\n")
+                in_statement = 0
+        if in_statement:
+            out.write(";\n")
+        return rows
 
-        
-        sql_data = "\n".join(sql_lines)
-        return sql_data
+
+    def csv_to_sql(self, csv_content, table_name):
+        out = io.StringIO()
+        self.write_inserts(csv.reader(io.StringIO(csv_content)), table_name, out)
+        return out.getvalue()
+
+
+    def open_sql_output(self, table_name):
+        """Open MOCK_<table>_DATA.sql (or .sql.gz) for writing, removing the
+        other variant so the inserter doesn't load the table twice.
+        """
+        os.makedirs(self.generated_sql_data_dir, exist_ok=True)
+        base_path = os.path.join(self.generated_sql_data_dir, f"MOCK_{table_name}_DATA.sql")
+        path, stale = (base_path + ".gz", base_path) if self.gzip_output else (base_path, base_path + ".gz")
+        if os.path.exists(stale):
+            os.remove(stale)
+        if self.gzip_output:
+            return path, gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        return path, open(path, "w", encoding="utf-8")
 
 
     def inject_foreign_keys(self, csv_data, saved_columns):
@@ -157,10 +191,9 @@ class DataGenerator:
             if fk_cols_to_inject:
                 csv_data = self.inject_foreign_keys(csv_data, {col: fk_sources[col] for col in fk_cols_to_inject})
 
-            sql_data = self.csv_to_sql(csv_data, table_name)
-            file_path = os.path.join(self.generated_sql_data_dir, f"MOCK_{table_name}_DATA.sql")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(sql_data)
+            file_path, out = self.open_sql_output(table_name)
+            with out:
+                self.write_inserts(csv.reader(io.StringIO(csv_data)), table_name, out)
 
             print(f"Saved {table_name} data to {file_path}\n")
         
@@ -190,16 +223,12 @@ class DataGenerator:
         if os.path.exists(input_file_path):
             print(f"Converted data from {filename}...")
 
-            sql_data = None
-            with open(input_file_path, "r", encoding="utf-8") as f:
-                csv_content = f.read()
-                sql_data = self.csv_to_sql(csv_content, table_name)
-
-            output_file_path = os.path.join(self.generated_sql_data_dir, f"MOCK_{table_name}_DATA.sql")
-            with open(output_file_path, "w", encoding="utf-8") as f:
-                f.write(sql_data)
+            # Stream from the CSV to the script; neither is held in memory
+            output_file_path, out = self.open_sql_output(table_name)
+            with open(input_file_path, "r", encoding="utf-8", newline="") as f, out:
+                rows = self.write_inserts(csv.reader(f), table_name, out)
 
-            print(f"Converted {filename} successfully.\n")
+            print(f"Converted {filename} ({rows} rows) to {os.path.basename(output_file_path)} successfully.\n")
         else:
             print(f"Warning: {filename} not found in {self.csv_input_dir}.")
 
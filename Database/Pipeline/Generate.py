@@ -0,0 +1,18 @@
+from SyntheticData import SyntheticGenerator, DEFAULT_SEED
+
+import argparse
+
+synthetic_output_dir = "./Database/Synthetic"
+
+if __name__ == "__main__":
+    # python Database/Pipeline/Generate.py [--scale N] [--seed N] [--output DIR]
+    parser = argparse.ArgumentParser(description="Generate the AutoBase CSVs offline from SyntheticData.SPEC.")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply the row counts in the spec (1 is about 1000 rows per table)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help="the same seed and scale always give the same files")
+    parser.add_argument("--output", default=synthetic_output_dir,
+                        help="directory for <table>.csv, laid out like Database/AutoBase")
+    args = parser.parse_args()
+
+    SyntheticGenerator(args.output, seed=args.seed, scale=args.scale).generate()
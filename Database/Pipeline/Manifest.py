@@ -0,0 +1,165 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from DataInserter import read_csv_batches, DEFAULT_BATCH_SIZE
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_digest(values):
+    """Short hash of a row's values, to tell whether it changed."""
+    text = "\x1f".join("\x00" if v is None else v for v in values)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class TableDiff:
+    """What it takes to turn the last loaded version of a table into the
+    current CSV: rows to upsert (new or changed), spooled to a file, and
+    keys to delete."""
+
+    def __init__(self, headers, key_columns):
+        self.headers = headers
+        self.key_columns = key_columns
+        self.deletes = []
+        self.inserted = 0
+        self.updated = 0
+        self.rows = 0
+        self.rows_path = None
+        self.upserts_path = None
+
+
+    @property
+    def upserts(self):
+        return self.inserted + self.updated
+
+
+    def upsert_batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        """The rows to upsert, batch_size at a time, read back from the spool."""
+        if not self.upserts:
+            return
+        for _, batch in read_csv_batches(self.upserts_path, batch_size):
+            yield batch
+
+
+class Manifest:
+    """Content hash, row count and key of every CSV the last incremental run
+    loaded into `database`, plus a hash of each of its rows by key in
+    <table>.rows.csv next to the manifest. A table is only recorded once
+    its changes are committed, so an interrupted run is simply redone.
+    """
+
+    def __init__(self, state_dir, database):
+        self.state_dir = state_dir
+        self.database = database
+        self.lock = threading.Lock()
+        self.tables = {}
+        path = os.path.join(state_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            # State recorded for another database says nothing about this one
+            if manifest.get("database") == database:
+                self.tables = manifest.get("tables", {})
+
+
+    def file_hash(self, path):
+        return file_sha256(path)
+
+
+    def rows_file(self, table_name):
+        return os.path.join(self.state_dir, f"{table_name}.rows.csv")
+
+
+    def upserts_file(self, table_name):
+        return os.path.join(self.state_dir, f"{table_name}.upserts.csv.tmp")
+
+
+    def unchanged(self, table_name, sha256):
+        entry = self.tables.get(table_name)
+        return entry is not None and entry["sha256"] == sha256
+
+
+    def previous_rows(self, table_name, key_columns):
+        """{key: row hash} as last loaded, or {} when there is no usable record."""
+        entry = self.tables.get(table_name)
+        path = self.rows_file(table_name)
+        if entry is None or entry.get("key") != key_columns or not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return {tuple(row[1:]): row[0] for row in csv.reader(f)}
+
+
+    def diff(self, table_name, csv_path, key_columns, batch_size=DEFAULT_BATCH_SIZE):
+        """Compare csv_path with the last loaded version of the table. New
+        and changed rows are spooled to a temporary file as they are found,
+        so only the previous row hashes are held in memory. Also writes the
+        new row hashes to a temporary file that record() puts in place once
+        the diff has been applied.
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        previous = self.previous_rows(table_name, key_columns)
+        result = None
+        rows_path = self.rows_file(table_name) + ".tmp"
+        upserts_path = self.upserts_file(table_name)
+        with open(rows_path, "w", encoding="utf-8", newline="") as rows_out, \
+                open(upserts_path, "w", encoding="utf-8", newline="") as upserts_out:
+            writer = csv.writer(rows_out, lineterminator="\n")
+            # None is written as an empty field, which read_csv_batches reads back as None
+            upserts = csv.writer(upserts_out, lineterminator="\n")
+            for headers, batch in read_csv_batches(csv_path, batch_size):
+                if result is None:
+                    missing = [k for k in key_columns if k not in headers]
+                    if missing:
+                        raise ValueError(f"{csv_path} has no {', '.join(missing)} column for the {table_name} key")
+                    result = TableDiff(headers, key_columns)
+                    key_indexes = [headers.index(k) for k in key_columns]
+                    upserts.writerow(headers)
+                for row in batch:
+                    key = tuple(row[i] for i in key_indexes)
+                    digest = row_digest(row)
+                    writer.writerow((digest,) + key)
+                    old_digest = previous.pop(key, None)
+                    if old_digest is None:
+                        result.inserted += 1
+                        upserts.writerow(row)
+                    elif old_digest != digest:
+                        result.updated += 1
+                        upserts.writerow(row)
+                result.rows += len(batch)
+        if result is None:
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
+                headers = [h.strip() for h in next(csv.reader(f))]
+            result = TableDiff(headers, key_columns)
+        # Whatever was loaded before and is no longer in the file
+        result.deletes = list(previous)
+        result.rows_path = rows_path
+        result.upserts_path = upserts_path
+        return result
+
+
+    def record(self, table_name, sha256, diff):
+        """Mark the table as loaded from the file with this hash."""
+        with self.lock:
+            os.replace(diff.rows_path, self.rows_file(table_name))
+            os.remove(diff.upserts_path)
+            self.tables[table_name] = {
+                "sha256": sha256,
+                "rows": diff.rows,
+                "key": diff.key_columns,
+                "loaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            path = os.path.join(self.state_dir, MANIFEST_FILE)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"database": self.database, "tables": self.tables}, f, indent=2, sort_keys=True)
+            os.replace(path + ".tmp", path)
@@ -0,0 +1,24 @@
+from Migrator import Migrator
+from Run import db_config, migrations_dir
+
+import sys
+
+explain_checks_file = "./Database/Migrations/explain_checks.sql"
+rebuild_rollups_file = "./Database/Migrations/rebuild_sales_rollups.sql"
+
+if __name__ == "__main__":
+    migrator = Migrator(db_config, migrations_dir)
+
+    # python Database/Pipeline/Migrate.py [status|explain|rebuild-rollups]
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+
+    if command == "status":
+        migrator.status()
+    elif command == "explain":
+        full_scans = migrator.explain_checks(explain_checks_file)
+        sys.exit(1 if full_scans else 0)
+    elif command == "rebuild-rollups":
+        migrator.run_script(rebuild_rollups_file)
+    else:
+        migrator.migrate()
+        migrator.explain_checks(explain_checks_file)
@@ -0,0 +1,240 @@
+import hashlib
+import itertools
+import os
+import re
+import mysql.connector
+from mysql.connector import errorcode
+
+# Errors meaning a statement's change is already in place, e.g. when a
+# migration runs against a database that was patched by hand
+ALREADY_APPLIED_ERRORS = {
+    errorcode.ER_DUP_FIELDNAME,
+    errorcode.ER_DUP_KEYNAME,
+    errorcode.ER_CANT_DROP_FIELD_OR_KEY,
+    errorcode.ER_FK_DUP_NAME,
+    errorcode.ER_TRG_ALREADY_EXISTS,
+    errorcode.ER_MULTIPLE_PRI_KEY,
+}
+
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+def split_sql_statements(sql):
+    """Split a SQL script on semicolons that are outside quotes and
+    comments. Comments are dropped from the returned statements.
+    """
+    return list(iter_sql_statements([sql]))
+
+
+def iter_sql_statements(chunks):
+    """Like split_sql_statements(), over a script arriving as text chunks
+    (e.g. a file read a block at a time). Each statement is yielded as soon
+    as it ends, so only one statement is held in memory.
+    """
+    current = []
+    quote = None
+    comment = None  # "line" or "block" while inside one
+    pending = ""
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        sql = pending + (chunk or "")
+        pending = ""
+        i = 0
+        while i < len(sql):
+            ch = sql[i]
+            nxt = sql[i + 1] if i + 1 < len(sql) else None
+            if nxt is None and not final and ch in "\\'\"`-/*":
+                # What this means depends on the next character; wait for it
+                pending = ch
+                break
+            if comment == "line":
+                if ch == "\n":
+                    comment = None
+                    continue
+            elif comment == "block":
+                if ch == "*" and nxt == "/":
+                    comment = None
+                    i += 1
+            elif quote:
+                current.append(ch)
+                if ch == "\\" and quote != "`" and nxt is not None:
+                    current.append(nxt)
+                    i += 1
+                elif ch == quote:
+                    if nxt == quote:
+                        # Doubled quote is an escaped quote
+                        current.append(nxt)
+                        i += 1
+                    else:
+                        quote = None
+            elif ch in ("'", '"', "`"):
+                quote = ch
+                current.append(ch)
+            elif (ch == "-" and nxt == "-") or ch == "#":
+                comment = "line"
+            elif ch == "/" and nxt == "*":
+                comment = "block"
+                i += 1
+            elif ch == ";":
+                statement = "".join(current).strip()
+                if statement:
+                    yield statement
+                current = []
+            else:
+                current.append(ch)
+            i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        yield statement
+
+
+class Migrator:
+    def __init__(self, db_config, migrations_dir):
+        self.db_config = db_config
+        self.migrations_dir = migrations_dir
+
+
+    def get_migrations(self):
+        migrations = []
+        for entry in sorted(os.listdir(self.migrations_dir)):
+            match = MIGRATION_FILE.match(entry)
+            if not match:
+                continue
+            path = os.path.join(self.migrations_dir, entry)
+            with open(path, "r", encoding="utf-8") as f:
+                sql = f.read()
+            checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+            migrations.append((int(match.group(1)), match.group(2), sql, checksum))
+        return sorted(migrations)
+
+
+    def ensure_migrations_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+
+    def get_applied(self, cursor):
+        cursor.execute("SELECT version, checksum FROM schema_migrations")
+        return {version: checksum for version, checksum in cursor.fetchall()}
+
+
+    def is_already_applied(self, err, statement):
+        if err.errno in ALREADY_APPLIED_ERRORS:
+            return True
+        # A rename whose source column is gone has already happened
+        return err.errno == errorcode.ER_BAD_FIELD_ERROR and "RENAME COLUMN" in statement.upper()
+
+
+    def apply_migration(self, cursor, version, name, sql, checksum):
+        print(f"Applying migration {version:04d}_{name}...")
+        for statement in split_sql_statements(sql):
+            try:
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            except mysql.connector.Error as err:
+                if not self.is_already_applied(err, statement):
+                    raise
+                print(f"  Skipped (already applied): {err.msg}")
+
+        # DDL auto-commits in MySQL, so the version is recorded per migration
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (version, name, checksum)
+        )
+        self.conn.commit()
+        print(f"Applied migration {version:04d}_{name} successfully.\n")
+
+
+    def migrate(self, target=None):
+        self.conn = mysql.connector.connect(**self.db_config)
+        cursor = self.conn.cursor()
+        try:
+            self.ensure_migrations_table(cursor)
+            applied = self.get_applied(cursor)
+
+            for version, name, sql, checksum in self.get_migrations():
+                if target is not None and version > target:
+                    break
+                if version in applied:
+                    if applied[version] != checksum:
+                        print(f"Warning: migration {version:04d}_{name} changed after it was applied.")
+                    continue
+                self.apply_migration(cursor, version, name, sql, checksum)
+        finally:
+            cursor.close()
+            self.conn.close()
+
+
+    def status(self):
+        conn = mysql.connector.connect(**self.db_config)
+        cursor = conn.cursor()
+        try:
+            self.ensure_migrations_table(cursor)
+            applied = self.get_applied(cursor)
+        finally:
+            cursor.close()
+            conn.close()
+
+        for version, name, _, _ in self.get_migrations():
+            state = "applied" if version in applied else "pending"
+            print(f"{version:04d}_{name}: {state}")
+
+
+    def run_script(self, script_file):
+        """Run every statement in script_file as a single transaction,
+        e.g. to rebuild derived tables from their source rows.
+        """
+        with open(script_file, "r", encoding="utf-8") as f:
+            statements = split_sql_statements(f.read())
+
+        conn = mysql.connector.connect(**self.db_config)
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            for statement in statements:
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            conn.commit()
+            print(f"Ran {len(statements)} statements from {os.path.basename(script_file)}.")
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+
+    def explain_checks(self, checks_file):
+        """EXPLAIN every statement in checks_file and report tables read
+        with a full scan (type ALL). Returns a list of (statement, table).
+        """
+        with open(checks_file, "r", encoding="utf-8") as f:
+            statements = split_sql_statements(f.read())
+
+        full_scans = []
+        conn = mysql.connector.connect(**self.db_config)
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for statement in statements:
+                cursor.execute(f"EXPLAIN {statement}")
+                for row in cursor.fetchall():
+                    if row.get("type") == "ALL":
+                        full_scans.append((statement, row.get("table")))
+        finally:
+            cursor.close()
+            conn.close()
+
+        for statement, table in full_scans:
+            first_line = " ".join(statement.split())[:80]
+            print(f"Full scan of {table}: {first_line}...")
+        print(f"Checked {len(statements)} queries, {len(full_scans)} full table scans.")
+        return full_scans
@@ -1,6 +1,9 @@
-from DataGenerator import DataGenerator
-from DataInserter import DataInserter
+from DataGenerator import DataGenerator, DEFAULT_ROWS_PER_STATEMENT
+from DataInserter import DataInserter, BULK_METHODS, DEFAULT_BATCH_SIZE, DEFAULT_WORKERS
+from Manifest import Manifest
+from Migrator import Migrator
 
+import argparse
 import os
 from dotenv import load_dotenv
 
@@ -29,15 +32,51 @@ mockaroo_schemas = {
 
 csv_input_dir = "./Database/AutoBase"
 generated_sql_data_dir = "./Database/MockData"
+migrations_dir = "./Database/Migrations"
+# Manifest of what --incremental loaded last time
+state_dir = "./Database/.pipeline"
 
 if __name__ == "__main__":
-    dg = DataGenerator(db_config, mockaroo_schemas, csv_input_dir, generated_sql_data_dir, mockaroo_api_key=mockaroo_api_key)
+    # python Database/Pipeline/Run.py [--bulk executemany|load-data] [--batch-size N]
+    #                                  [--rows-per-statement N] [--gzip] [--workers N] [--csv-dir DIR]
+    #                                  [--incremental]
+    parser = argparse.ArgumentParser(description="Migrate the schema and load the AutoBase data.")
+    parser.add_argument("--bulk", choices=BULK_METHODS,
+                        help="load the CSVs directly instead of generating and running SQL scripts")
+    parser.add_argument("--incremental", action="store_true",
+                        help="load only what changed in the CSVs since the last incremental run")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="rows per INSERT batch with --bulk executemany")
+    parser.add_argument("--rows-per-statement", type=int, default=DEFAULT_ROWS_PER_STATEMENT,
+                        help="rows per INSERT in the generated SQL scripts")
+    parser.add_argument("--gzip", action="store_true",
+                        help="write the generated SQL scripts as .sql.gz")
+    parser.add_argument("--csv-dir", default=csv_input_dir,
+                        help="CSVs to load, e.g. the output of Generate.py")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="tables loaded at once, each on its own connection")
+    args = parser.parse_args()
+    if args.incremental and args.bulk:
+        parser.error("--incremental and --bulk are separate ways of loading; pick one")
+
+    dg = DataGenerator(db_config, mockaroo_schemas, args.csv_dir, generated_sql_data_dir, mockaroo_api_key=mockaroo_api_key,
+                       rows_per_statement=args.rows_per_statement, gzip_output=args.gzip)
     di = DataInserter(db_config, mockaroo_schemas, generated_sql_data_dir)
+    migrator = Migrator(db_config, migrations_dir)
     
     # Only use 'dg.fetch_all_schemas' if generated from Mockaroo.
     # However, Mockaroo typically generates duplicate data when we need unique data.
     # So we just generate data on Fabricate.tonic.ai and upload it into AutoBase
     # dg.fetch_all_schemas(1000)
 
-    dg.existing_csv_to_sql()
-    di.insert_data()
+    # Bring the schema up to date before loading data into it
+    migrator.migrate()
+
+    if args.incremental:
+        database = f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
+        di.sync(args.csv_dir, Manifest(state_dir, database), batch_size=args.batch_size, workers=args.workers)
+    elif args.bulk:
+        di.bulk_load(args.csv_dir, method=args.bulk, batch_size=args.batch_size, workers=args.workers)
+    else:
+        dg.existing_csv_to_sql()
+        di.insert_data(workers=args.workers)
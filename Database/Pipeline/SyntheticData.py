@@ -0,0 +1,610 @@
+"""Offline, seeded generator for the AutoBase CSVs.
+
+Every table is described in SPEC: how many rows it has and how each column
+is drawn. Columns are sampled a chunk of rows at a time with NumPy, so
+tens of millions of rows take minutes and a bounded amount of memory.
+The same seed and scale always produce the same files.
+
+Keys are unique by construction: IDs count up from 1, and VINs and SSNs
+are bijective functions of the row number. Names are likewise a function
+of the row, so an auth row's username matches the person it belongs to.
+Foreign keys are drawn from the rows of the referenced table, which is
+always generated first:
+
+    python Database/Pipeline/Generate.py --scale 1000 --output Database/Synthetic
+
+NumPy is only needed here: pip install numpy
+"""
+import csv
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # Only the generator needs it; the rest of the pipeline doesn't
+    np = None
+
+DEFAULT_SEED = 475
+
+# Rows sampled and written at a time. Fixed, because the random stream of
+# each chunk depends on where it starts; changing it changes the output.
+CHUNK_ROWS = 100_000
+
+MAKES = {
+    "Chevrolet": ["Silverado 1500", "Malibu", "Impala", "Tahoe", "Camaro", "Equinox"],
+    "Ford": ["F-150", "Mustang", "Explorer", "Focus", "Escape", "Thunderbird"],
+    "GMC": ["Sierra 1500", "Yukon", "Acadia", "Vandura 2500", "Savana 1500"],
+    "Toyota": ["Camry", "Corolla", "RAV4", "Tacoma", "Highlander", "Prius"],
+    "Dodge": ["Ram 1500", "Charger", "Durango", "Grand Caravan", "Dakota"],
+    "Mercedes-Benz": ["C-Class", "E-Class", "S-Class", "GLE-Class", "SL-Class"],
+    "Mazda": ["Mazda3", "Mazda6", "CX-5", "MX-5", "Tribute"],
+    "Honda": ["Accord", "Civic", "CR-V", "Odyssey", "Pilot"],
+    "Volkswagen": ["Jetta", "Passat", "Golf", "Tiguan", "Beetle"],
+    "Nissan": ["Altima", "Sentra", "Rogue", "Frontier", "Maxima"],
+    "BMW": ["3 Series", "5 Series", "X3", "X5", "M3"],
+    "Audi": ["A4", "A6", "Q5", "Q7", "TT"],
+    "Hyundai": ["Elantra", "Sonata", "Tucson", "Santa Fe"],
+    "Lexus": ["ES", "RX", "IS", "GX"],
+    "Porsche": ["911", "944", "Cayenne", "Boxster"],
+    "Subaru": ["Outback", "Forester", "Impreza", "Legacy"],
+}
+COLORS = ["Red", "White", "Black", "Blue", "Gray", "Green", "Brown", "Maroon",
+          "Yellow", "Orange", "Purple", "Teal", "Pink", "Cyan", "Magenta"]
+GENDERS = ["Male", "Female", "Other"]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+               "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Lisa", "Matthew", "Nancy",
+               "Anthony", "Betty", "Mark", "Sandra", "Steven", "Ashley", "Paul", "Emily",
+               "Andrew", "Donna", "Joshua", "Michelle", "Kevin", "Carol", "Brian", "Amanda",
+               "Noellyn", "Gusti", "Dexter", "Jeane", "Dorelle", "Reilley", "Priya", "Kenji"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+              "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson",
+              "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Walker",
+              "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+              "Trivett", "Adamthwaite", "Alstead", "Govinlock", "Kemson", "Milne", "Patel", "Tanaka"]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "live.com", "icloud.com"]
+STREETS = ["Melrose", "Hibiscus", "Ukulele", "Idle", "Palermo", "Maple", "Oak", "Cedar",
+           "Pine", "Elm", "Lakeview", "Sunset", "Hillcrest", "Ridge", "Meadow", "Willow"]
+STREET_SUFFIXES = ["Street", "Avenue", "Court", "Drive", "Place", "Lane", "Road", "Way", "Path"]
+# city, state, first three digits of its ZIP codes
+CITIES = [("Seattle", "Washington", "981"), ("Bothell", "Washington", "980"),
+          ("Tacoma", "Washington", "984"), ("Portland", "Oregon", "972"),
+          ("Sacramento", "California", "958"), ("San Diego", "California", "921"),
+          ("Reno", "Nevada", "895"), ("Phoenix", "Arizona", "850"),
+          ("Denver", "Colorado", "802"), ("Austin", "Texas", "787"),
+          ("Montgomery", "Alabama", "361"), ("Roanoke", "Virginia", "240"),
+          ("Chicago", "Illinois", "606"), ("Boston", "Massachusetts", "021")]
+PART_ADJECTIVES = ["Premium", "Standard", "Heavy Duty", "Performance", "OEM", "Economy", "Ceramic"]
+PART_NOUNS = ["Brake Pad", "Oil Filter", "Air Filter", "Spark Plug", "Wiper Blade", "Battery",
+              "Alternator", "Radiator Hose", "Timing Belt", "Headlight Bulb", "Tire", "Fuel Pump",
+              "Brake Rotor", "Cabin Filter", "Serpentine Belt", "Shock Absorber"]
+SERVICE_TYPES = ["Technical Support", "Performance Optimization", "Installation", "Network Setup",
+                 "Software Development", "System Integration", "Emergency Response", "Maintenance",
+                 "Warranty Service", "Consulting", "Troubleshooting", "Security Assessment", "Upgrade",
+                 "Data Migration", "Remote Assistance", "Training", "Repair", "On-site Service",
+                 "Product Customization", "Customer Service"]
+SERVICE_STATUSES = ["WAITING", "SERVICING", "FINISHED"]
+PASSWORD_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!#&*"
+
+# Tables in generation order; a table can only reference tables above it.
+#
+# "rows" is a count, multiplied by --scale, or ("per", parent, min, max)
+# for min..max rows for each row of parent. Columns are written in the
+# order given, except those starting with "_", which are only used to
+# derive others. Column kinds:
+#
+#   ("serial",)                  1, 2, 3, ...
+#   ("vin",) / ("ssn",)          unique 17-character VIN / 9-digit SSN
+#   ("person",), ("email",), ("username", ref_column)
+#                                this row's name / email, or the username of
+#                                the row ref_column points at
+#   ("phone",), ("address",), ("password",)
+#   ("choice", values[, weights])
+#   ("choice_by", column, {value: choices})   e.g. a model of the row's make
+#   ("words", first_words, second_words)
+#   ("int", low, high), ("money", low, high)   inclusive ranges
+#   ("date", "YYYY-MM-DD", "YYYY-MM-DD")
+#   ("date_after", column, min_days, max_days[, null_share])
+#   ("ref", table)               any row of table
+#   ("ref_unique", table)        a row of table no other row refers to
+#   ("ref_distinct", table)      a row of table not used by a sibling row
+#                                (same parent); for link tables
+#   ("parent",)                  the parent row of a "per" table
+#   ("copy", ref_column, column) column of the row ref_column points at
+#   ("manager", share)           NULL for the first share of rows (the
+#                                managers), else one of them
+SPEC = {
+    "Vehicle": {
+        "rows": 1000,
+        "columns": {
+            "VIN": ("vin",),
+            "Make": ("choice", list(MAKES)),
+            "Model": ("choice_by", "Make", MAKES),
+            "Color": ("choice", COLORS),
+            "Year": ("int", 1985, 2025),
+            "Mileage": ("int", 0, 250000),
+            "Price": ("money", 3000, 90000),
+        },
+    },
+    "Employee": {
+        "rows": 100,
+        "columns": {
+            "ID": ("serial",),
+            "SSN": ("ssn",),
+            "Name": ("person",),
+            "Gender": ("choice", GENDERS, [0.48, 0.48, 0.04]),
+            "Hire_Date": ("date", "2015-01-01", "2025-10-31"),
+            "End_Date": ("date_after", "Hire_Date", 30, 3000, 0.9),
+            "Phone": ("phone",),
+            "Email": ("email",),
+            "Address": ("address",),
+            "Mgr_ID": ("manager", 0.05),
+        },
+    },
+    "Part": {
+        "rows": 1000,
+        "columns": {
+            "ID": ("serial",),
+            "Name": ("words", PART_ADJECTIVES, PART_NOUNS),
+            "Price": ("money", 1, 900),
+            "Stock": ("int", 0, 200),
+        },
+    },
+    "Customer": {
+        "rows": 1000,
+        "columns": {
+            "ID": ("serial",),
+            "Name": ("person",),
+            "Gender": ("choice", GENDERS, [0.48, 0.48, 0.04]),
+            "Registration_Date": ("date", "2015-01-01", "2025-10-31"),
+            "Closure_Date": ("date_after", "Registration_Date", 30, 3000, 0.95),
+            "Phone": ("phone",),
+            "Email": ("email",),
+            "Address": ("address",),
+        },
+    },
+    # Each vehicle is sold at most once; its buyer then owns it
+    "SalesOrder": {
+        "rows": 600,
+        "columns": {
+            "ID": ("serial",),
+            "Customer_ID": ("ref", "Customer"),
+            "Sales_Employee_ID": ("ref", "Employee"),
+            "Vehicle_VIN": ("ref_unique", "Vehicle"),
+            "Sales_Date": ("date", "2020-01-01", "2025-10-31"),
+            "Price": ("money", 3000, 90000),
+        },
+    },
+    "CustomerOwnVehicle": {
+        "rows": ("per", "SalesOrder", 1, 1),
+        "columns": {
+            "_sale": ("parent",),
+            "Customer_ID": ("copy", "_sale", "Customer_ID"),
+            "Vehicle_VIN": ("copy", "_sale", "Vehicle_VIN"),
+        },
+    },
+    # The relationship tables of autobasedb.sql: one row per order or line,
+    # repeating its foreign keys
+    "CustomerPlaceSalesOrder": {
+        "rows": ("per", "SalesOrder", 1, 1),
+        "columns": {
+            "_sale": ("parent",),
+            "Customer_ID": ("copy", "_sale", "Customer_ID"),
+            "Sales_Order_ID": ("parent",),
+        },
+    },
+    "EmployeeHandleSalesOrder": {
+        "rows": ("per", "SalesOrder", 1, 1),
+        "columns": {
+            "_sale": ("parent",),
+            "Employee_ID": ("copy", "_sale", "Sales_Employee_ID"),
+            "Sales_Order_ID": ("parent",),
+        },
+    },
+    "SalesOrderSoldVehicle": {
+        "rows": ("per", "SalesOrder", 1, 1),
+        "columns": {
+            "Sales_Order_ID": ("parent",),
+            "Vehicle_VIN": ("copy", "Sales_Order_ID", "Vehicle_VIN"),
+        },
+    },
+    # Owners bring the vehicles they bought in for service
+    "ServiceOrder": {
+        "rows": 1000,
+        "columns": {
+            "_sale": ("ref", "SalesOrder"),
+            "ID": ("serial",),
+            "Customer_ID": ("copy", "_sale", "Customer_ID"),
+            "Service_Advisor_ID": ("ref", "Employee"),
+            "Vehicle_VIN": ("copy", "_sale", "Vehicle_VIN"),
+            "Date_From": ("date", "2020-01-01", "2025-10-31"),
+            "Date_To": ("date_after", "Date_From", 0, 14),
+            "Service_Status": ("choice", SERVICE_STATUSES),
+            "Price": ("money", 50, 3000),
+        },
+    },
+    "CustomerScheduleServiceOrder": {
+        "rows": ("per", "ServiceOrder", 1, 1),
+        "columns": {
+            "_service": ("parent",),
+            "Customer_ID": ("copy", "_service", "Customer_ID"),
+            "Service_Order_ID": ("parent",),
+        },
+    },
+    "EmployeeAssignServiceOrder": {
+        "rows": ("per", "ServiceOrder", 1, 1),
+        "columns": {
+            "_service": ("parent",),
+            "Employee_ID": ("copy", "_service", "Service_Advisor_ID"),
+            "Service_Order_ID": ("parent",),
+        },
+    },
+    "ServiceOrderServicedVehicle": {
+        "rows": ("per", "ServiceOrder", 1, 1),
+        "columns": {
+            "Service_Order_ID": ("parent",),
+            "Vehicle_VIN": ("copy", "Service_Order_ID", "Vehicle_VIN"),
+        },
+    },
+    "ServiceLine": {
+        "rows": ("per", "ServiceOrder", 1, 3),
+        "columns": {
+            "ID": ("serial",),
+            "Service_Order_ID": ("parent",),
+            "Service_Type": ("choice", SERVICE_TYPES),
+            "Labor_Hours": ("int", 1, 8),
+            "Labor_Rate": ("money", 40, 150),
+        },
+    },
+    "ServiceOrderHasServiceLine": {
+        "rows": ("per", "ServiceLine", 1, 1),
+        "columns": {
+            "_line": ("parent",),
+            "Service_Order_ID": ("copy", "_line", "Service_Order_ID"),
+            "Service_Line_ID": ("parent",),
+        },
+    },
+    "ServiceLineUsePart": {
+        "rows": ("per", "ServiceLine", 0, 3),
+        "columns": {
+            "Service_Line_ID": ("parent",),
+            "Part_ID": ("ref_distinct", "Part"),
+            "Quantity": ("int", 1, 20),
+        },
+    },
+    # Plaintext, like the Fabricate export: the backend hashes each one on
+    # first login (AUTH_ALLOW_PLAINTEXT)
+    "EmployeeAuth": {
+        "rows": ("per", "Employee", 1, 1),
+        "columns": {
+            "Employee_ID": ("parent",),
+            "Username": ("username", "Employee_ID"),
+            "Password_Hash": ("password",),
+        },
+    },
+    "CustomerAuth": {
+        "rows": ("per", "Customer", 1, 1),
+        "columns": {
+            "Customer_ID": ("parent",),
+            "Username": ("username", "Customer_ID"),
+            "Password_Hash": ("password",),
+        },
+    },
+}
+
+_MASK64 = (1 << 64) - 1
+
+
+def _salt(seed, *parts):
+    return (zlib.crc32(":".join(str(p) for p in parts).encode()) | (seed << 32)) & _MASK64
+
+
+def _mix(values, salt):
+    """splitmix64 of each value: a well spread, deterministic hash."""
+    z = values.astype(np.uint64) + np.uint64(salt & _MASK64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _ascii(codes):
+    """Rows of a uint8 (n, width) array of ASCII codes as strings."""
+    codes = np.ascontiguousarray(codes, dtype=np.uint8)
+    return codes.view(f"S{codes.shape[1]}").ravel().astype(f"U{codes.shape[1]}")
+
+
+def _digits(values, width):
+    return np.char.zfill(values.astype(str), width)
+
+
+def _join(*parts):
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+class Column:
+    """A column's values for one chunk, and the table whose rows they index
+    (None for plain values)."""
+
+    def __init__(self, values, ref=None):
+        self.values = values
+        self.ref = ref
+
+
+class SyntheticGenerator:
+    def __init__(self, output_dir, spec=SPEC, seed=DEFAULT_SEED, scale=1.0):
+        if np is None:
+            raise RuntimeError("The synthetic data generator needs NumPy: pip install numpy")
+        self.output_dir = output_dir
+        self.spec = spec
+        self.seed = seed
+        self.scale = scale
+        self.row_counts = {}
+        # Columns of generated tables that later tables copy, whole
+        self.kept = {}
+        self.check_spec()
+
+
+    def check_spec(self):
+        seen = []
+        for table, table_spec in self.spec.items():
+            rows = table_spec["rows"]
+            referenced = [rows[1]] if isinstance(rows, tuple) else []
+            for name, column in table_spec["columns"].items():
+                if column[0] in ("ref", "ref_unique", "ref_distinct"):
+                    referenced.append(column[1])
+                if column[0] in ("parent", "ref_distinct") and not isinstance(rows, tuple):
+                    raise ValueError(f"{table}.{name}: {column[0]} needs a (\"per\", ...) table")
+                if column[0] == "ref_unique" and isinstance(rows, tuple):
+                    raise ValueError(f"{table}.{name}: ref_unique needs a table with a row count")
+            for other in referenced:
+                if other not in seen:
+                    raise ValueError(f"{table} references {other}, which must come before it in the spec")
+            seen.append(table)
+
+
+    def columns_to_keep(self, table):
+        """Columns of `table` that a later table copies."""
+        keep = set()
+        for other_spec in self.spec.values():
+            columns = other_spec["columns"]
+            for column in columns.values():
+                if column[0] == "copy":
+                    via = columns[column[1]]
+                    target = via[1] if via[0] != "parent" else other_spec["rows"][1]
+                    if target == table:
+                        keep.add(column[2])
+        return keep
+
+
+    def key_strings(self, table, rows):
+        """Keys of the given rows of `table` as written to CSV."""
+        kind = next(iter(self.spec[table]["columns"].values()))[0]
+        if kind == "vin":
+            return self.vin(table, rows)
+        return (rows + 1).astype(str)
+
+
+    def vin(self, table, rows):
+        # Multiplying by an odd number and xor-shifting are both one-to-one
+        # on 60-bit values, so distinct rows get distinct VINs
+        mask = np.uint64((1 << 60) - 1)
+        v = (rows.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) & mask
+        v ^= np.uint64(_salt(self.seed, table, "vin") & ((1 << 60) - 1))
+        v ^= v >> np.uint64(29)
+        v = (v * np.uint64(0xD6E8FEB86659FD93)) & mask
+        shifts = np.arange(56, -1, -4, dtype=np.uint64)
+        nibbles = ((v[:, None] >> shifts) & np.uint64(15)).astype(np.uint8)
+        hex_codes = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)[nibbles]
+        dash = np.full((len(rows), 1), ord("-"), dtype=np.uint8)
+        return _ascii(np.hstack([hex_codes[:, :8], dash, hex_codes[:, 8:12], dash, hex_codes[:, 12:]]))
+
+
+    def name_parts(self, table, rows):
+        first = _mix(rows, _salt(self.seed, table, "first")) % np.uint64(len(FIRST_NAMES))
+        last = _mix(rows, _salt(self.seed, table, "last")) % np.uint64(len(LAST_NAMES))
+        return np.array(FIRST_NAMES)[first], np.array(LAST_NAMES)[last]
+
+
+    def column(self, kind, args, ctx):
+        rng, n, rows, table, columns = ctx["rng"], ctx["n"], ctx["rows"], ctx["table"], ctx["columns"]
+
+        if kind == "serial":
+            return Column(rows + 1)
+        if kind == "vin":
+            return Column(self.vin(table, rows))
+        if kind == "ssn":
+            # 3**18 is coprime with 10**9, so this is one-to-one below 10**9 rows
+            offset = _salt(self.seed, table, "ssn") % 10**9
+            return Column(_digits((rows * 387420489 + offset) % 10**9, 9))
+        if kind == "person":
+            first, last = self.name_parts(table, rows)
+            return Column(_join(first, " ", last))
+        if kind == "email":
+            first, last = self.name_parts(table, rows)
+            domains = rng.choice(EMAIL_DOMAINS, n)
+            return Column(np.char.lower(_join(first, ".", last, "@", domains)))
+        if kind == "username":
+            ref = columns[args[0]]
+            first, last = self.name_parts(ref.ref, ref.values)
+            # Letters then the ID: no two people can end up with the same one
+            return Column(np.char.lower(_join(first.astype("U1"), last, (ref.values + 1).astype(str))))
+        if kind == "phone":
+            return Column(_join("(", rng.integers(200, 1000, n).astype(str), ") ",
+                                rng.integers(200, 1000, n).astype(str), "-",
+                                _digits(rng.integers(0, 10000, n), 4)))
+        if kind == "address":
+            city = rng.integers(0, len(CITIES), n)
+            names, states, zips = (np.array(part) for part in zip(*CITIES))
+            return Column(_join(rng.integers(1, 20000, n).astype(str), " ",
+                                rng.choice(STREETS, n), " ", rng.choice(STREET_SUFFIXES, n), ", ",
+                                names[city], ", ", states[city], ", United States, ",
+                                zips[city], _digits(rng.integers(0, 100, n), 2)))
+        if kind == "password":
+            alphabet = np.frombuffer(PASSWORD_ALPHABET.encode(), dtype=np.uint8)
+            return Column(_ascii(alphabet[rng.integers(0, len(alphabet), (n, 12))]))
+        if kind == "choice":
+            values, weights = args[0], (args[1] if len(args) > 1 else None)
+            return Column(np.array(values)[rng.choice(len(values), n, p=weights)])
+        if kind == "choice_by":
+            keys = columns[args[0]].values
+            result = np.empty(n, dtype=object)
+            for key, choices in args[1].items():
+                match = keys == key
+                result[match] = np.array(choices)[rng.integers(0, len(choices), match.sum())]
+            return Column(result)
+        if kind == "words":
+            return Column(_join(rng.choice(args[0], n), " ", rng.choice(args[1], n)))
+        if kind == "int":
+            return Column(rng.integers(args[0], args[1] + 1, n))
+        if kind == "money":
+            cents = rng.integers(args[0] * 100, args[1] * 100 + 1, n)
+            return Column(_join((cents // 100).astype(str), ".", _digits(cents % 100, 2)))
+        if kind == "date":
+            start, end = np.datetime64(args[0]), np.datetime64(args[1])
+            return Column(start + rng.integers(0, (end - start).astype(int) + 1, n))
+        if kind == "date_after":
+            dates = columns[args[0]].values + rng.integers(args[1], args[2] + 1, n)
+            if len(args) > 3:
+                dates = dates.astype(object)
+                dates[rng.random(n) < args[3]] = None
+            return Column(dates)
+        if kind == "ref":
+            return Column(rng.integers(0, self.row_counts[args[0]], n), ref=args[0])
+        if kind == "ref_unique":
+            return Column(ctx["unique"][args[0]][rows], ref=args[0])
+        if kind == "ref_distinct":
+            # Siblings take consecutive rows from a random start, so they differ
+            total = self.row_counts[args[0]]
+            start = rng.integers(0, total, len(ctx["parent_counts"]))
+            return Column((np.repeat(start, ctx["parent_counts"]) + ctx["ordinal"]) % total, ref=args[0])
+        if kind == "parent":
+            return Column(ctx["parent"], ref=ctx["parent_table"])
+        if kind == "copy":
+            via = columns[args[0]]
+            kept_values, kept_ref = self.kept[via.ref][args[1]]
+            return Column(kept_values[via.values], ref=kept_ref)
+        if kind == "manager":
+            managers = max(1, int(self.row_counts[table] * args[0]))
+            ids = (rng.integers(0, managers, n) + 1).astype(object)
+            ids[rows < managers] = None
+            return Column(ids)
+        raise ValueError(f"{table}: unknown column kind {kind}")
+
+
+    def cell_strings(self, column):
+        if column.ref is not None:
+            return self.key_strings(column.ref, column.values).tolist()
+        values = column.values
+        if values.dtype.kind == "M":
+            return np.datetime_as_string(values, unit="D").tolist()
+        if values.dtype == object:
+            return [None if v is None else str(v) for v in values.tolist()]
+        return values.tolist()
+
+
+    def chunks(self, table):
+        """(rows, ctx extras) for each chunk of `table`: the table's row
+        numbers and, for "per" tables, the parent of each row.
+        """
+        rows_spec = self.spec[table]["rows"]
+        if not isinstance(rows_spec, tuple):
+            total = max(1, round(rows_spec * self.scale))
+            self.row_counts[table] = total
+            for index, start in enumerate(range(0, total, CHUNK_ROWS)):
+                yield index, np.arange(start, min(start + CHUNK_ROWS, total)), {}
+            return
+
+        _, parent_table, low, high = rows_spec
+        parent_total = self.row_counts[parent_table]
+        offset = 0
+        for index, start in enumerate(range(0, parent_total, CHUNK_ROWS)):
+            parents = np.arange(start, min(start + CHUNK_ROWS, parent_total))
+            rng = np.random.default_rng([self.seed, zlib.crc32(table.encode()), index, 1])
+            counts = rng.integers(low, high + 1, len(parents))
+            n = int(counts.sum())
+            first_child = np.cumsum(counts) - counts
+            yield index, np.arange(offset, offset + n), {
+                "parent": np.repeat(parents, counts),
+                "parent_table": parent_table,
+                "parent_counts": counts,
+                "ordinal": np.arange(n) - np.repeat(first_child, counts),
+            }
+            offset += n
+        self.row_counts[table] = offset
+
+
+    def generate_table(self, table):
+        columns_spec = self.spec[table]["columns"]
+        rows_spec = self.spec[table]["rows"]
+        table_seed = zlib.crc32(table.encode())
+        table_rng = np.random.default_rng([self.seed, table_seed])
+
+        # Unique references are drawn for the whole table up front
+        unique = {}
+        for name, column in columns_spec.items():
+            if column[0] == "ref_unique":
+                total = max(1, round(rows_spec * self.scale))
+                available = self.row_counts[column[1]]
+                if total > available:
+                    raise ValueError(f"{table}.{name}: {total} rows need distinct {column[1]} rows, "
+                                     f"but there are only {available}")
+                unique[column[1]] = table_rng.choice(available, total, replace=False)
+            if column[0] == "ref_distinct" and rows_spec[3] > self.row_counts[column[1]]:
+                raise ValueError(f"{table}.{name}: up to {rows_spec[3]} distinct {column[1]} rows "
+                                 f"per parent, but there are only {self.row_counts[column[1]]}")
+
+        keep = self.columns_to_keep(table)
+        kept = {name: [] for name in keep}
+        header = [name for name in columns_spec if not name.startswith("_")]
+        path = os.path.join(self.output_dir, f"{table}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            for index, rows, extras in self.chunks(table):
+                ctx = dict(extras, rng=np.random.default_rng([self.seed, table_seed, index]),
+                           n=len(rows), rows=rows, table=table, unique=unique, columns={})
+                for name, column in columns_spec.items():
+                    ctx["columns"][name] = self.column(column[0], column[1:], ctx)
+                for name in keep:
+                    kept[name].append(ctx["columns"][name])
+                writer.writerows(zip(*(self.cell_strings(ctx["columns"][name]) for name in header)))
+
+        self.kept[table] = {
+            name: (np.concatenate([c.values for c in parts]) if parts else np.array([], dtype=np.int64),
+                   parts[0].ref if parts else None)
+            for name, parts in kept.items()
+        }
+        return self.row_counts[table]
+
+
+    def generate(self):
+        """Write <table>.csv for every table in the spec, plus a README.md
+        listing the row counts, and return {table: rows}.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        started = time.perf_counter()
+        for table in self.spec:
+            table_started = time.perf_counter()
+            rows = self.generate_table(table)
+            seconds = time.perf_counter() - table_started
+            print(f"Generated {rows} rows for {table} in {seconds:.2f}s "
+                  f"({rows / seconds if seconds else 0:.0f} rows/s)")
+        elapsed = time.perf_counter() - started
+        total_rows = sum(self.row_counts.values())
+        print(f"Generated {total_rows} rows in {len(self.row_counts)} tables in {elapsed:.2f}s")
+
+        with open(os.path.join(self.output_dir, "README.md"), "w", encoding="utf-8", newline="\n") as f:
+            f.write("# CSV Export\n\n")
+            f.write(f"Generated on {datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S} UTC by SyntheticData "
+                    f"(seed {self.seed}, scale {self.scale:g})\n\n")
+            f.write("## Exported tables\n\n")
+            f.write("This is the list of exported tables, with their corresponding row count and file names:\n\n")
+            for table in sorted(self.row_counts):
+                f.write(f"    {table}: {self.row_counts[table]} rows => {table}.csv\n")
+        return dict(self.row_counts)
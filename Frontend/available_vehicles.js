@@ -1,4 +1,4 @@
-import { BACKEND_URL, escapeHtml, formatCurrency, safeFetchCurrentUser } from "/Frontend/shared.js";
+import { BACKEND_URL, createPager, escapeHtml, formatCurrency, safeFetchCurrentUser, showLoadMore } from "/Frontend/shared.js";
 
 document.addEventListener("DOMContentLoaded", async () => {
   await new Promise(resolve => setTimeout(resolve, 100)); // Small buffer
@@ -13,17 +13,16 @@ async function loadVehicles() {
   try {
     const currentUser = await safeFetchCurrentUser();
 
-    const response = await fetch(`${BACKEND_URL}/api/vehicle/vehicles`, {
-      method: "GET",
-      credentials: "include"
-    });
+    const pager = createPager(`${BACKEND_URL}/api/vehicle/vehicles`, "vehicle");
+    const vehicles = await pager.more();
 
-    const data = await response.json();
-    
     if (loading) loading.style.display = "none";
-    if (!response.ok) throw new Error(data.error || "Failed to load vehicles");
 
-    renderVehicles(data.vehicle, currentUser, container);
+    renderVehicles(vehicles, currentUser, container);
+    // Later pages only when asked for
+    showLoadMore(container, pager, more => {
+      container.querySelector("tbody").insertAdjacentHTML("beforeend", vehicleRows(more, currentUser));
+    });
 
   } catch (err) {
     console.error("Error loading vehicles:", err);
@@ -59,6 +58,21 @@ function renderVehicles(vehicles, currentUser, container) {
       <tbody>
   `;
 
+  html += vehicleRows(vehicles, currentUser);
+  html += `</tbody></table>`;
+  container.innerHTML = html;
+
+  // One listener for the table, so rows added by "Load more" work too
+  if (currentUser?.user_type === "customer") {
+    container.onclick = event => {
+      const btn = event.target.closest(".buyBtn");
+      if (btn) buyVehicle(btn.getAttribute("data-vin"), btn.getAttribute("data-price"));
+    };
+  }
+}
+
+function vehicleRows(vehicles, currentUser) {
+  let html = "";
   vehicles.forEach(vehicle => {
     html += `
       <tr>
@@ -75,18 +89,7 @@ function renderVehicles(vehicles, currentUser, container) {
       </tr>
     `;
   });
-
-  html += `</tbody></table>`;
-  container.innerHTML = html;
-
-  // Attach listeners
-  if (currentUser?.user_type === "customer") {
-    container.querySelectorAll(".buyBtn").forEach(btn => {
-      btn.addEventListener("click", () => {
-        buyVehicle(btn.getAttribute("data-vin"), btn.getAttribute("data-price"));
-      });
-    });
-  }
+  return html;
 }
 
 async function buyVehicle(vin, price) {
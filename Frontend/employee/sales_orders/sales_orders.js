@@ -1,17 +1,22 @@
 import {
   BACKEND_URL,
+  createPager,
   escapeHtml,
+  fillSelect,
   formatCurrency,
   formatDate,
+  hideLoadMore,
   showLoading,
   hideLoading,
-  safeFetchCurrentUser
+  safeFetchCurrentUser,
+  showLoadMore
 } from "/Frontend/shared.js";
 
 // Global state
-let allOrders = [];
-let allEmployees = [];
+let loadedOrders = [];
+let ordersPager = null;
 let selectedOrderId = null;
+let filterTimer = null;
 
 // =========================
 // Page Initialization
@@ -40,18 +45,29 @@ document.addEventListener("DOMContentLoaded", async () => {
 // Data Loading
 // =========================
 async function loadEmployees() {
+  const employeeSelect = document.getElementById("employeeSelect");
+  if (!employeeSelect) return;
+  employeeSelect.innerHTML = '<option value="">-- Select Employee --</option>';
   try {
-    const response = await fetch(`${BACKEND_URL}/api/employee/employees`, {
-      method: "GET",
-      credentials: "include"
-    });
-    const data = await response.json();
-    if (response.ok) allEmployees = data.employees || data || [];
+    // First page now, more from the list's last option
+    await fillSelect([employeeSelect], createPager(`${BACKEND_URL}/api/employee/employees`, "employees"),
+      emp => [emp.ID, (emp.Name || emp.name || `Employee #${emp.ID}`).trim()]);
   } catch (error) {
     console.error("Error loading employees:", error);
   }
 }
 
+// Filters run on the server, so they cover every order, not just the loaded pages
+function salesOrdersUrl() {
+  const params = new URLSearchParams();
+  const customer = document.getElementById("customerFilter")?.value.trim() || "";
+  const orderId = document.getElementById("orderIdFilter")?.value.trim() || "";
+  if (customer) params.set(/^\d+$/.test(customer) ? "customer_id" : "customer_name", customer);
+  if (orderId) params.set("order_id", orderId);
+  const query = params.toString();
+  return `${BACKEND_URL}/api/employee/sales_orders${query ? `?${query}` : ""}`;
+}
+
 async function loadSalesOrders() {
   const loadingMessage = document.getElementById("loadingMessage");
   const errorMessage = document.getElementById("errorMessage");
@@ -60,26 +76,27 @@ async function loadSalesOrders() {
   showLoading(loadingMessage);
   if (errorMessage) errorMessage.style.display = "none";
   if (ordersContainer) ordersContainer.innerHTML = "";
+  hideLoadMore(ordersContainer);
 
   try {
-    const response = await fetch(`${BACKEND_URL}/api/employee/sales_orders`, {
-      method: "GET",
-      credentials: "include"
-    });
-
-    const data = await response.json();
+    const pager = ordersPager = createPager(salesOrdersUrl(), "sales_orders");
+    const orders = await pager.more();
+    // A newer filter started its own load meanwhile
+    if (pager !== ordersPager) return;
+    loadedOrders = orders;
     hideLoading(loadingMessage);
 
-    if (!response.ok) throw new Error(data.error || `HTTP ${response.status}`);
-
-    allOrders = data.sales_orders || data || [];
-
-    if (allOrders.length === 0) {
+    if (loadedOrders.length === 0) {
       ordersContainer.innerHTML = `<div class="no-orders"><p>No orders match your current filters.</p></div>`;
     } else {
-      displayOrdersTable(allOrders, ordersContainer);
-      updateStatistics(allOrders);
+      displayOrdersTable(loadedOrders, ordersContainer);
     }
+    updateStatistics(loadedOrders);
+    showLoadMore(ordersContainer, pager, more => {
+      loadedOrders = loadedOrders.concat(more);
+      ordersContainer.querySelector("tbody").insertAdjacentHTML("beforeend", orderRows(more));
+      updateStatistics(loadedOrders);
+    });
   } catch (error) {
     hideLoading(loadingMessage);
     console.error(error);
@@ -113,6 +130,19 @@ function displayOrdersTable(orders, container) {
       <tbody>
   `;
 
+  html += orderRows(orders);
+  html += `</tbody></table>`;
+  container.innerHTML = html;
+
+  // One listener for the table, so rows added by "Load more" work too
+  container.onclick = event => {
+    const btn = event.target.closest(".assignBtn");
+    if (btn) openAssignModal(btn.getAttribute("data-order-id"), btn.getAttribute("data-customer"));
+  };
+}
+
+function orderRows(orders) {
+  let html = "";
   orders.forEach(order => {
     // Resolve Customer Name
     const customerName = order.Customer_Name || `Customer #${order.Customer_ID}`;
@@ -121,17 +151,7 @@ function displayOrdersTable(orders, container) {
     let employeeName = "Not Assigned";
     if (order.Sales_Employee_ID) {
       // First try Sales_Employee_Name from the query
-      if (order.Sales_Employee_Name) {
-        employeeName = order.Sales_Employee_Name;
-      } else {
-        // Fallback to matching from employee list
-        const matchedEmp = allEmployees.find(e => e.ID == order.Sales_Employee_ID);
-        if (matchedEmp) {
-          employeeName = matchedEmp.Name || matchedEmp.name || `Employee #${order.Sales_Employee_ID}`;
-        } else {
-          employeeName = `Employee #${order.Sales_Employee_ID}`;
-        }
-      }
+      employeeName = order.Sales_Employee_Name || `Employee #${order.Sales_Employee_ID}`;
     }
 
     // Use .btn-primary from style.css, add 'assignBtn' for event targeting
@@ -154,15 +174,7 @@ function displayOrdersTable(orders, container) {
     `;
   });
 
-  html += `</tbody></table>`;
-  container.innerHTML = html;
-
-  // Attach Listeners
-  document.querySelectorAll(".assignBtn").forEach(btn => {
-    btn.addEventListener("click", () => {
-      openAssignModal(btn.getAttribute("data-order-id"), btn.getAttribute("data-customer"));
-    });
-  });
+  return html;
 }
 
 // =========================
@@ -176,14 +188,7 @@ function openAssignModal(orderId, customerName) {
 
   if (modalOrderInfo) modalOrderInfo.textContent = `Order #${orderId} - ${customerName}`;
 
-  if (employeeSelect) {
-    let optionsHtml = '<option value="">-- Select Employee --</option>';
-    allEmployees.forEach(emp => {
-      const empName = (emp.Name || emp.name || `Employee #${emp.ID}`).trim();
-      optionsHtml += `<option value="${emp.ID}">${escapeHtml(empName)}</option>`;
-    });
-    employeeSelect.innerHTML = optionsHtml;
-  }
+  if (employeeSelect) employeeSelect.value = "";
 
   if (modal) modal.style.display = "block";
 }
@@ -241,18 +246,9 @@ function setupModalListeners() {
 }
 
 function applyFilters() {
-  const custVal = document.getElementById("customerFilter")?.value.toLowerCase() || "";
-  const idVal = document.getElementById("orderIdFilter")?.value.toLowerCase() || "";
-
-  const filtered = allOrders.filter(order => {
-    const matchCust = (order.Customer_Name || '').toLowerCase().includes(custVal) ||
-                      (order.Customer_ID || '').toString().includes(custVal);
-    const matchId = (order.ID || '').toString().includes(idVal);
-    return matchCust && matchId;
-  });
-
-  displayOrdersTable(filtered, document.getElementById("ordersContainer"));
-  updateStatistics(filtered);
+  // Wait for a pause in typing before asking the server
+  clearTimeout(filterTimer);
+  filterTimer = setTimeout(loadSalesOrders, 300);
 }
 
 function clearFilters() {
@@ -260,12 +256,14 @@ function clearFilters() {
   const iFilter = document.getElementById("orderIdFilter");
   if (cFilter) cFilter.value = "";
   if (iFilter) iFilter.value = "";
-  displayOrdersTable(allOrders, document.getElementById("ordersContainer"));
-  updateStatistics(allOrders);
+  clearTimeout(filterTimer);
+  loadSalesOrders();
 }
 
+// Totals of the loaded orders; "+" while more pages are left
 function updateStatistics(orders) {
   const revenue = orders.reduce((sum, o) => sum + (parseFloat(o.Price) || 0), 0);
-  document.getElementById("totalOrders").textContent = orders.length;
-  document.getElementById("totalRevenue").textContent = formatCurrency(revenue);
+  const more = ordersPager && !ordersPager.done ? "+" : "";
+  document.getElementById("totalOrders").textContent = `${orders.length}${more}`;
+  document.getElementById("totalRevenue").textContent = `${formatCurrency(revenue)}${more}`;
 }
\ No newline at end of file
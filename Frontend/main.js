@@ -1,4 +1,4 @@
-import { BACKEND_URL, safeFetchCurrentUser } from "/Frontend/shared.js";
+import { BACKEND_URL, clearEtagCache, safeFetchCurrentUser } from "/Frontend/shared.js";
 
 // =========================
 // Initialization
@@ -78,6 +78,7 @@ async function handleLogin() {
 async function handleLogout() {
   try {
     await fetch(`${BACKEND_URL}/api/auth/logout`, { method: "POST", credentials: "include" });
+    clearEtagCache();
     alert("Logged out successfully!");
     window.location.href = "/Frontend/index.html";
   } catch (err) {
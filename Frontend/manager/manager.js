@@ -1,10 +1,11 @@
-import { BACKEND_URL, formatCurrency, formatDate } from "/Frontend/shared.js";
+import { BACKEND_URL, createPager, fetchJson, fillSelect, formatCurrency, formatDate, hideLoadMore, showLoadMore } from "/Frontend/shared.js";
 
 async function apiGet(path){
   const url = path.startsWith('http') ? path : (BACKEND_URL + path);
-  const res = await fetch(url, {credentials: 'include'});
+  // Unchanged reports come back as 304 and are served from fetchJson's cache
+  const res = await fetchJson(url);
   if(!res.ok) throw new Error('API error '+res.status);
-  return res.json();
+  return res.data;
 }
 
 async function apiPost(path, body){
@@ -233,57 +234,59 @@ function renderPartsTable(containerId, items){
   table.appendChild(thead);
   
   const tbody = document.createElement('tbody');
-  items.forEach(item => {
-    const tr = document.createElement('tr');
-    
-    // ID
-    const tdId = document.createElement('td');
-    tdId.textContent = item.ID || item.id || '';
-    tr.appendChild(tdId);
-    
-    // Name
-    const tdName = document.createElement('td');
-    tdName.textContent = item.Name || item.name || '';
-    tr.appendChild(tdName);
-    
-    // Price
-    const tdPrice = document.createElement('td');
-    tdPrice.textContent = formatCurrency(item.Price || item.price || 0);
-    tr.appendChild(tdPrice);
-    
-    // Stock
-    const tdStock = document.createElement('td');
-    tdStock.textContent = item.Stock || item.stock || 0;
-    tr.appendChild(tdStock);
-    
-    // Times Used
-    const tdUsed = document.createElement('td');
-    tdUsed.textContent = item.times_used || 0;
-    tr.appendChild(tdUsed);
-    
-    // Actions
-    const tdActions = document.createElement('td');
-    const editBtn = document.createElement('button');
-    editBtn.textContent = 'Edit';
-    editBtn.className = 'btn-secondary';
-    editBtn.style.marginRight = '0.5rem';
-    editBtn.onclick = () => openEditPartModal(item);
-    
-    const deleteBtn = document.createElement('button');
-    deleteBtn.textContent = 'Delete';
-    deleteBtn.className = 'btn-danger';
-    deleteBtn.onclick = () => deletePart(item.ID || item.id);
-    
-    tdActions.appendChild(editBtn);
-    tdActions.appendChild(deleteBtn);
-    tr.appendChild(tdActions);
-    
-    tbody.appendChild(tr);
-  });
+  items.forEach(item => tbody.appendChild(partsRow(item)));
   table.appendChild(tbody);
   container.appendChild(table);
 }
 
+function partsRow(item){
+  const tr = document.createElement('tr');
+  
+  // ID
+  const tdId = document.createElement('td');
+  tdId.textContent = item.ID || item.id || '';
+  tr.appendChild(tdId);
+  
+  // Name
+  const tdName = document.createElement('td');
+  tdName.textContent = item.Name || item.name || '';
+  tr.appendChild(tdName);
+  
+  // Price
+  const tdPrice = document.createElement('td');
+  tdPrice.textContent = formatCurrency(item.Price || item.price || 0);
+  tr.appendChild(tdPrice);
+  
+  // Stock
+  const tdStock = document.createElement('td');
+  tdStock.textContent = item.Stock || item.stock || 0;
+  tr.appendChild(tdStock);
+  
+  // Times Used
+  const tdUsed = document.createElement('td');
+  tdUsed.textContent = item.times_used || 0;
+  tr.appendChild(tdUsed);
+  
+  // Actions
+  const tdActions = document.createElement('td');
+  const editBtn = document.createElement('button');
+  editBtn.textContent = 'Edit';
+  editBtn.className = 'btn-secondary';
+  editBtn.style.marginRight = '0.5rem';
+  editBtn.onclick = () => openEditPartModal(item);
+  
+  const deleteBtn = document.createElement('button');
+  deleteBtn.textContent = 'Delete';
+  deleteBtn.className = 'btn-danger';
+  deleteBtn.onclick = () => deletePart(item.ID || item.id);
+  
+  tdActions.appendChild(editBtn);
+  tdActions.appendChild(deleteBtn);
+  tr.appendChild(tdActions);
+  
+  return tr;
+}
+
 // ============================================
 // Utility Functions
 // ============================================
@@ -295,23 +298,18 @@ function parseDateSafe(s){
 
 async function fetchAndPopulateEmployees(){
   try{
-    const res = await apiGet('/api/employee/employees');
-    const employees = res.employees || res || [];
-    const selSales = document.getElementById('salesEmployeeSelect');
-    const selService = document.getElementById('serviceEmployeeSelect');
+    const selects = [
+      document.getElementById('salesEmployeeSelect'),
+      document.getElementById('serviceEmployeeSelect')
+    ].filter(Boolean);
     
-    [selSales, selService].forEach(sel => {
-      if(!sel) return;
+    selects.forEach(sel => {
       sel.innerHTML = '<option value="">All Employees</option>';
     });
     
-    employees.forEach(e => {
-      const opt = document.createElement('option');
-      opt.value = e.ID || e.id;
-      opt.textContent = e.Name || e.name || (`Employee ${e.ID}`);
-      if(selSales) selSales.appendChild(opt.cloneNode(true));
-      if(selService) selService.appendChild(opt.cloneNode(true));
-    });
+    // First page now, more from the list's last option
+    await fillSelect(selects, createPager(BACKEND_URL + '/api/employee/employees', 'employees'),
+      e => [e.ID || e.id, e.Name || e.name || (`Employee ${e.ID}`)]);
   } catch(err) {
     console.warn('Could not fetch employees for filters', err);
   }
@@ -402,12 +400,18 @@ async function refreshService(){
 // ============================================
 async function refreshParts(){
   try{
-    const data = await apiGet('/api/manager/parts/usage');
-    const items = data.data || data || [];
+    const pager = createPager(BACKEND_URL + '/api/manager/parts/usage', 'data');
+    const items = await pager.more();
     renderPartsTable('partsResults', items);
+    const container = document.getElementById('partsResults');
+    showLoadMore(container, pager, more => {
+      const tbody = container.querySelector('tbody');
+      more.forEach(item => tbody.appendChild(partsRow(item)));
+    });
   } catch(e) {
     console.error(e);
     document.getElementById('partsResults').innerHTML = '<div class="empty-message">Error loading parts data</div>';
+    hideLoadMore(document.getElementById('partsResults'));
   }
 }
 
@@ -510,10 +514,19 @@ async function runEmployeePerformance(){
   container.innerHTML = '<div class="loading">Loading...</div>';
   
   try{
-    const data = await apiGet('/api/manager/reports/employee-performance');
+    // Empty dates fall back to the current year on the server
+    const params = new URLSearchParams();
+    const start = document.getElementById('performanceStartDate').value;
+    const end = document.getElementById('performanceEndDate').value;
+    const city = document.getElementById('performanceCity').value.trim();
+    if(start) params.set('date_from', start);
+    if(end) params.set('date_to', end);
+    if(city) params.set('city', city);
+
+    const data = await apiGet('/api/manager/reports/employee-performance?' + params.toString());
     const items = data.data || data || [];
     renderFullTable('employeePerformanceResults', items,
-      ['Employee ID', 'Employee Name', 'Vehicle Sold', 'Seattle Customer']
+      ['Employee ID', 'Employee Name', 'Vehicle Sold', 'City Customers']
     );
   } catch(e) {
     console.error(e);
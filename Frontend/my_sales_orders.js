@@ -3,6 +3,7 @@ import {
   escapeHtml,
   formatCurrency,
   formatDate,
+  fetchJson,
   safeFetchCurrentUser,
   showLoading,
   hideLoading
@@ -11,6 +12,13 @@ import {
 // Global state
 let userRole = null;
 
+// Details for the rows on screen, keyed by VIN / ID, loaded with one batch
+// request per kind instead of one request per row
+const BATCH_SIZE = 200; // API_MAX_BATCH on the backend
+let vehiclesByVin = new Map();
+let customersById = new Map();
+let employeesById = new Map();
+
 // =========================
 // Page Initialization
 // =========================
@@ -63,6 +71,7 @@ async function loadMyOrders() {
     const orders = data.sales_orders || data || [];
     
     updateStatistics(orders);
+    await loadOrderDetails(orders);
     
     if (orders.length === 0) {
       container.innerHTML = `<div class="no-orders"><p>No orders found.</p></div>`;
@@ -80,6 +89,47 @@ async function loadMyOrders() {
   }
 }
 
+// =========================
+// Batch Detail Lookups
+// =========================
+async function fetchDetailsBatch(path, param, key, idField, ids) {
+  const unique = [...new Set(ids.filter(id => id !== null && id !== undefined).map(String))];
+  const byId = new Map();
+
+  for (let i = 0; i < unique.length; i += BATCH_SIZE) {
+    const chunk = unique.slice(i, i + BATCH_SIZE);
+    const url = `${BACKEND_URL}${path}?${param}=${chunk.map(encodeURIComponent).join(",")}`;
+    const { ok, data } = await fetchJson(url);
+    if (!ok) throw new Error(data.error || `Failed to load ${key}`);
+    (data[key] || []).forEach(row => byId.set(String(row[idField]), row));
+  }
+  return byId;
+}
+
+async function loadOrderDetails(orders) {
+  try {
+    const vehicles = fetchDetailsBatch("/api/employee/vehicles", "vin", "vehicles", "VIN",
+      orders.map(o => o.Vehicle_VIN));
+
+    if (userRole === "customer") {
+      [vehiclesByVin, employeesById] = await Promise.all([
+        vehicles,
+        fetchDetailsBatch("/api/customer/employees", "id", "employees", "ID",
+          orders.map(o => o.Sales_Employee_ID))
+      ]);
+    } else {
+      [vehiclesByVin, customersById] = await Promise.all([
+        vehicles,
+        fetchDetailsBatch("/api/employee/customers", "id", "customers", "ID",
+          orders.map(o => o.Customer_ID))
+      ]);
+    }
+  } catch (err) {
+    // Not fatal: the detail buttons fall back to fetching one record
+    console.error("Error loading order details:", err);
+  }
+}
+
 // =========================
 // Render & Event Listeners
 // =========================
@@ -113,7 +163,7 @@ function renderOrdersTable(orders, container) {
       : `<td>${formatDate(date)}</td>`;
       
     const col5 = userRole === "customer"
-      ? `<td>${escapeHtml(String(order.Employee_Name || "Not Assigned"))}</td>`
+      ? `<td>${escapeHtml(String(order.Sales_Employee_Name || employeesById.get(String(order.Sales_Employee_ID))?.Name || "Not Assigned"))}</td>`
       : `<td>${formatCurrency(price)}</td>`;
 
     // Action Buttons Logic
@@ -167,6 +217,10 @@ function renderOrdersTable(orders, container) {
 // View Details Actions
 // =========================
 async function viewVehicleDetails(vin) {
+  if (vehiclesByVin.has(vin)) {
+    showDetailsModal("Vehicle Details", formatVehicleDetails(vehiclesByVin.get(vin)));
+    return;
+  }
   try {
     // Note: Using employee endpoint as per original code; 
     // ensure backend allows customer access or update this path if needed.
@@ -186,6 +240,10 @@ async function viewVehicleDetails(vin) {
 }
 
 async function viewEmployeeDetails(id) {
+  if (employeesById.has(id)) {
+    showDetailsModal("Employee Details", formatEmployeeDetails(employeesById.get(id)));
+    return;
+  }
   try {
     const response = await fetch(`${BACKEND_URL}/api/customer/employee/${id}`, {
       method: "GET",
@@ -202,6 +260,10 @@ async function viewEmployeeDetails(id) {
 }
 
 async function viewCustomerDetails(id) {
+  if (customersById.has(id)) {
+    showDetailsModal("Customer Details", formatCustomerDetails(customersById.get(id)));
+    return;
+  }
   try {
     const response = await fetch(`${BACKEND_URL}/api/employee/customer/${id}`, {
       method: "GET",
@@ -81,6 +81,154 @@ export async function safeFetchCurrentUser() {
   }
 }
 
+// =========================
+// Conditional GET
+// =========================
+// Remembers each URL's last ETag and body (in sessionStorage, so it
+// survives moving between pages). The server answers a repeat request for
+// unchanged data with 304 and no body, and the stored body is returned
+// instead.
+const ETAG_PREFIX = "etag:";
+
+const etagCache = {
+  get(url) {
+    try {
+      return JSON.parse(sessionStorage.getItem(ETAG_PREFIX + url));
+    } catch {
+      return null;
+    }
+  },
+  set(url, entry) {
+    try {
+      sessionStorage.setItem(ETAG_PREFIX + url, JSON.stringify(entry));
+    } catch {
+      // Over quota: just don't cache this one
+      sessionStorage.removeItem(ETAG_PREFIX + url);
+    }
+  },
+  delete(url) {
+    sessionStorage.removeItem(ETAG_PREFIX + url);
+  }
+};
+
+export function clearEtagCache() {
+  for (const key of Object.keys(sessionStorage)) {
+    if (key.startsWith(ETAG_PREFIX)) sessionStorage.removeItem(key);
+  }
+}
+
+export async function fetchJson(url) {
+  const cached = etagCache.get(url);
+  const headers = cached ? { "If-None-Match": cached.etag } : {};
+  const response = await fetch(url, {
+    method: "GET",
+    credentials: "include",
+    // Revalidation is handled here, not by the browser cache
+    cache: "no-store",
+    headers
+  });
+
+  if (response.status === 304 && cached) {
+    return { ok: true, status: 200, data: cached.data };
+  }
+
+  const data = await response.json();
+  const etag = response.headers.get("ETag");
+  if (response.ok && etag) {
+    etagCache.set(url, { etag, data });
+  } else {
+    etagCache.delete(url);
+  }
+  return { ok: response.ok, status: response.status, data };
+}
+
+// =========================
+// Pagination Utilities
+// =========================
+// List endpoints return one page at a time plus a `next` cursor.
+// A pager fetches one page per call to more(), so a list shows its first
+// rows right away and only loads the rest when the user asks for them.
+export function createPager(url, key) {
+  let cursor = null;
+  const pager = {
+    done: false,
+    async more() {
+      if (pager.done) return [];
+      const sep = url.includes("?") ? "&" : "?";
+      const pageUrl = cursor ? `${url}${sep}cursor=${encodeURIComponent(cursor)}` : url;
+      const response = await fetchJson(pageUrl);
+      const data = response.data;
+      if (!response.ok) throw new Error(data.error || `HTTP ${response.status}`);
+      cursor = data.next;
+      pager.done = !cursor;
+      return data[key] || [];
+    }
+  };
+  return pager;
+}
+
+// "Load more" button placed after `container` while the pager has pages
+// left. Each click fetches the next page and passes its items to onItems.
+export function showLoadMore(container, pager, onItems) {
+  let button = container.nextElementSibling;
+  if (!button || !button.classList.contains("load-more")) {
+    button = document.createElement("button");
+    button.className = "btn-secondary load-more";
+    button.textContent = "Load more";
+    container.after(button);
+  }
+  button.onclick = async () => {
+    button.disabled = true;
+    try {
+      onItems(await pager.more());
+    } catch (error) {
+      console.error("Error loading more:", error);
+    } finally {
+      button.disabled = false;
+      button.style.display = pager.done ? "none" : "";
+    }
+  };
+  button.style.display = pager.done ? "none" : "";
+}
+
+export function hideLoadMore(container) {
+  const button = container?.nextElementSibling;
+  if (button?.classList.contains("load-more")) button.style.display = "none";
+}
+
+// Fills <select> elements with the first page of a pager. While pages are
+// left, a last option loads the next one when chosen.
+export async function fillSelect(selects, pager, toOption) {
+  const addPage = async () => {
+    const items = await pager.more();
+    for (const select of selects) {
+      select.querySelector("option.load-more")?.remove();
+      items.forEach(item => {
+        const [value, label] = toOption(item);
+        select.appendChild(new Option(label, value));
+      });
+      if (!pager.done) {
+        const more = new Option("Load more…", "");
+        more.className = "load-more";
+        select.appendChild(more);
+      }
+    }
+  };
+
+  for (const select of selects) {
+    let previous = select.value;
+    select.addEventListener("change", async () => {
+      if (select.selectedOptions[0]?.classList.contains("load-more")) {
+        select.value = previous;
+        await addPage();
+      } else {
+        previous = select.value;
+      }
+    });
+  }
+  await addPage();
+}
+
 // =========================
 // UI State Utilities
 // =========================